@@ -0,0 +1,229 @@
+# bulk_import.py
+# ----------------------------------------------------------------
+# 批量导入体重数据（智能体重秤 / 健康类App 导出的 CSV 或 JSON）。
+# 流程：流式读取 -> 分批校验并换算单位（kg/斤）-> 批量计算BMI
+#       -> 通过 DataHandler 的日期索引去重 -> 一次性写入文件。
+# ----------------------------------------------------------------
+import csv
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+BATCH_SIZE = 5000
+
+# 与界面输入框保持一致的合法范围
+WEIGHT_RANGE_KG = (20.0, 300.0)
+HEIGHT_RANGE_CM = (100.0, 250.0)
+
+# 各种导出文件里常见的列名
+COLUMN_ALIASES = {
+    "date": ("date", "time", "datetime", "timestamp", "日期", "时间", "测量时间", "记录时间"),
+    "weight": ("weight", "weight_kg", "体重", "体重(kg)", "体重(斤)"),
+    "height": ("height", "height_cm", "身高", "身高(cm)"),
+    "unit": ("unit", "weight_unit", "单位"),
+}
+JIN_UNITS = {"斤", "jin"}
+KG_UNITS = {"kg", "公斤", "千克", ""}
+DATE_INPUT_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M",
+                      "%Y-%m-%d", "%Y/%m/%d")
+
+
+class ImportResult:
+    """一次导入的统计结果"""
+
+    def __init__(self):
+        self.added = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.saved = True
+
+    def summary(self):
+        return f"成功导入 {self.added} 条，重复跳过 {self.duplicates} 条，无效 {self.invalid} 条。"
+
+
+def iter_rows(path):
+    """流式读取导出文件，逐行返回 dict。支持 CSV、JSON 数组和 JSON Lines。"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        # utf-8-sig 兼容 Excel 导出的 BOM
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+        return
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from json.load(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _column_map(row):
+    """根据第一行的列名找出日期/体重/身高/单位分别对应哪一列"""
+    normalized = {str(key).strip().lower(): key for key in row}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias.lower() in normalized:
+                mapping[field] = normalized[alias.lower()]
+                break
+    return mapping
+
+
+def _header_unit(header):
+    """体重列名里写明了单位时（如 "体重(斤)"）返回该单位，否则返回 None"""
+    name = str(header).strip().lower()
+    # 先判断公斤，"公斤" 里也含有 "斤"
+    if any(unit in name for unit in ("kg", "公斤", "千克")):
+        return "kg"
+    if any(unit in name for unit in JIN_UNITS):
+        return "斤"
+    return None
+
+
+def _parse_timestamp(value):
+    """把时间戳（秒，毫秒级的也兼容）转换为本地时间的日期字符串，超出范围时返回 None"""
+    seconds = value / 1000 if value > 1e11 else value
+    try:
+        return datetime.fromtimestamp(seconds).strftime(DATE_FORMAT)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _parse_date(value):
+    """把各种常见时间写法统一成应用内部的日期字符串，无法识别返回 None"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return _parse_timestamp(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        # CSV 里的数字也是文本，纯数字按时间戳处理
+        return _parse_timestamp(float(text))
+    except ValueError:
+        pass
+    if len(text) == 19 and text[4] == '-' and text[10] == ' ':
+        # 已经是内部格式，直接校验后使用（最常见的情况，走快速路径）
+        try:
+            datetime.strptime(text, DATE_FORMAT)
+            return text
+        except ValueError:
+            return None
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    else:
+        if parsed.tzinfo is not None:
+            # 带时区的时间（如 ...Z）换算成本地时间，否则可能记到错误的日期上
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed.strftime(DATE_FORMAT)
+    for fmt in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime(DATE_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def _to_float_array(values):
+    """把一列文本/数字转换为浮点数组，无法转换的位置为 nan"""
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _convert_batch(rows, mapping, default_unit, default_height):
+    """
+    校验并转换一批原始行，返回 (dates, weights_kg, heights, bmis, invalid_count)。
+    数值校验、单位换算和BMI计算都以数组方式整批完成。
+    """
+    dates = [_parse_date(row.get(mapping["date"])) for row in rows]
+    weights = _to_float_array([row.get(mapping["weight"]) for row in rows])
+
+    if "height" in mapping:
+        heights = _to_float_array([row.get(mapping["height"]) for row in rows])
+        heights = np.where(np.isnan(heights), default_height, heights)
+    else:
+        heights = np.full(len(rows), float(default_height))
+
+    if "unit" in mapping:
+        units = [str(row.get(mapping["unit"]) or default_unit).strip().lower() for row in rows]
+    else:
+        units = [default_unit] * len(rows)
+    is_jin = np.array([unit in JIN_UNITS for unit in units], dtype=bool)
+    known_unit = is_jin | np.array([unit in KG_UNITS for unit in units], dtype=bool)
+    weights = np.where(is_jin, weights / 2, weights)
+
+    valid = (
+        np.array([date is not None for date in dates], dtype=bool)
+        & known_unit
+        & (weights >= WEIGHT_RANGE_KG[0]) & (weights <= WEIGHT_RANGE_KG[1])
+        & (heights >= HEIGHT_RANGE_CM[0]) & (heights <= HEIGHT_RANGE_CM[1])
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bmis = np.round(weights / (heights / 100) ** 2, 1)
+
+    index = np.nonzero(valid)[0]
+    return ([dates[i] for i in index], weights[index], heights[index], bmis[index],
+            len(rows) - len(index))
+
+
+def import_records(path, data_handler, default_unit='kg', default_height=170.0, batch_size=BATCH_SIZE):
+    """
+    从文件批量导入记录到 data_handler。
+    default_unit: 文件中没有单位列、体重列名也没有写明单位时使用的单位（'kg' 或 'jin'）
+    default_height: 文件中没有身高时使用的身高（cm）
+    """
+    default_unit = "斤" if default_unit == 'jin' else "kg"
+    result = ImportResult()
+    new_records = []
+    seen_dates = set()
+    mapping = None
+    batch = []
+
+    def flush(batch):
+        dates, weights, heights, bmis, invalid = _convert_batch(batch, mapping, default_unit, default_height)
+        result.invalid += invalid
+        for date, weight, height, bmi in zip(dates, weights.tolist(), heights.tolist(), bmis.tolist()):
+            if data_handler.has_record_at(date) or date in seen_dates:
+                result.duplicates += 1
+                continue
+            seen_dates.add(date)
+            new_records.append({"date": date, "weight": weight, "height": height, "bmi": bmi})
+
+    for row in iter_rows(path):
+        if not isinstance(row, dict):
+            result.invalid += 1
+            continue
+        if mapping is None:
+            mapping = _column_map(row)
+            if "date" not in mapping or "weight" not in mapping:
+                raise ValueError("文件中没有找到日期或体重列")
+            # 列名写明了单位（如 "体重(斤)"）时以列名为准，界面当前单位只用于没写单位的列
+            default_unit = _header_unit(mapping["weight"]) or default_unit
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    result.saved = data_handler.add_records(new_records)
+    result.added = len(new_records) if result.saved else 0
+    return result
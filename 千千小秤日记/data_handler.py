@@ -2,6 +2,7 @@
 # ----------------------------------------------------------------
 # 负责数据的读取、存储、修改和删除。
 # 新增功能：保存和加载用户最后输入的身高体重。
+# 新增功能：按日期建立索引，支持批量导入时去重并一次性写入。
 # ----------------------------------------------------------------
 import json
 import os
@@ -13,6 +14,8 @@ class DataHandler:
         self.records_filename = records_filename
         self.settings_filename = settings_filename
         self.records = self.load_records()
+        # 记录日期索引，用于快速判断某个时间点是否已有记录
+        self.date_index = {record['date'] for record in self.records}
 
     # --- 用户设置相关 ---
     def save_last_input(self, height, weight_kg):
@@ -59,7 +62,7 @@ class DataHandler:
             return []
 
     def save_record(self, weight_kg, height_cm, bmi):
-        """保存一条新的记录"""
+        """保存一条新的记录，成功时返回这条记录，失败时返回 None"""
         new_record = {
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "weight": weight_kg,
@@ -67,13 +70,27 @@ class DataHandler:
             "bmi": bmi
         }
         self.records.insert(0, new_record)
+        self.date_index.add(new_record['date'])
+        return new_record if self._save_to_file() else None
+
+    def add_records(self, new_records):
+        """批量添加记录（调用方负责去重），只写一次文件"""
+        if not new_records:
+            return True
+        self.records.extend(new_records)
+        self.date_index.update(record['date'] for record in new_records)
         return self._save_to_file()
 
+    def has_record_at(self, record_date):
+        """判断某个时间点是否已有记录"""
+        return record_date in self.date_index
+
     def update_record(self, original_record_date, new_record_data):
         """根据原始日期更新一条记录的全部内容"""
         for i, record in enumerate(self.records):
             if record['date'] == original_record_date:
                 self.records[i] = new_record_data
+                self.date_index = {rec['date'] for rec in self.records}
                 return self._save_to_file()
         return False
 
@@ -83,9 +100,23 @@ class DataHandler:
         self.records = [rec for rec in self.records if rec['date'] != record_date]
 
         if len(self.records) < original_length:
+            self.date_index.discard(record_date)
             return self._save_to_file()
         return False
 
+    def update_record_at(self, index, new_record_data):
+        """按位置（get_all_records 中的下标）更新一条记录；同一时间有多条记录时也只改这一条"""
+        self.records[index] = new_record_data
+        self.date_index = {rec['date'] for rec in self.records}
+        return self._save_to_file()
+
+    def delete_record_at(self, index):
+        """按位置删除一条记录"""
+        record = self.records.pop(index)
+        if not any(rec['date'] == record['date'] for rec in self.records):
+            self.date_index.discard(record['date'])
+        return self._save_to_file()
+
     def get_all_records(self):
         """获取所有记录"""
         return self.records
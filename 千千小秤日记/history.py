@@ -2,16 +2,21 @@
 # ----------------------------------------------------------------
 # 历史记录标签页。
 # 新增功能：支持显示不同重量单位（kg/斤）。
+# 新增功能：改用 模型/视图 + 自绘代理，只绘制可见的行，修改单条记录只刷新相关的行。
 # ----------------------------------------------------------------
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QScrollArea, QLabel, QFrame, QHBoxLayout,
-                             QPushButton, QMessageBox, QDialog, QFormLayout, QDoubleSpinBox,
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QHBoxLayout, QListView, QStyledItemDelegate,
+                             QStyle, QMessageBox, QDialog, QFormLayout, QDoubleSpinBox,
                              QDialogButtonBox, QDateTimeEdit)
-from PyQt6.QtCore import Qt, QDateTime
-from PyQt6.QtGui import QMouseEvent
-from datetime import datetime
+from PyQt6.QtCore import Qt, QDateTime, QAbstractListModel, QModelIndex, QRectF, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPen
 from config import Config
 from bmi_calculator import get_bmi_category_key, calculate_bmi
 
+# 每一列的宽度比例，与表头保持一致
+COLUMN_PROPORTIONS = [3, 2, 2, 2, 2]
+# 50 像素的行高 + 8 像素的行间距
+ROW_HEIGHT = 58
+
 
 class EditRecordDialog(QDialog):
     def __init__(self, record, unit, parent=None):
@@ -71,127 +76,202 @@ class EditRecordDialog(QDialog):
         }
 
 
-class RecordRow(QFrame):
-    def __init__(self, record, previous_record, data_handler, parent_tab, unit):
-        super().__init__()
-        self.record = record
-        self.previous_record = previous_record
+class RecordListModel(QAbstractListModel):
+    """
+    直接以 DataHandler 中的记录列表（按时间倒序）作为数据源。
+    第 i 行的"上一条记录"就是第 i + 1 行，箭头在绘制时现算。
+    """
+    RecordRole = Qt.ItemDataRole.UserRole
+    PreviousRecordRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, data_handler, parent=None):
+        super().__init__(parent)
         self.data_handler = data_handler
-        self.parent_tab = parent_tab
+        self.unit = 'kg'
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.data_handler.get_all_records())
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        records = self.data_handler.get_all_records()
+        row = index.row()
+        if role == self.RecordRole:
+            return records[row]
+        if role == self.PreviousRecordRole:
+            return records[row + 1] if row + 1 < len(records) else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "双击修改或删除"
+        return None
+
+    def set_unit(self, unit):
+        if unit == self.unit:
+            return
         self.unit = unit
-        self.init_ui()
+        self._emit_rows_changed(0, self.rowCount() - 1)
 
-    def init_ui(self):
-        self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setFixedHeight(50)
-
-        category_key = get_bmi_category_key(self.record['bmi'])
-        colors = Config.BMI_COLORS.get(category_key, {"border": "#E0E0E0", "background": "#FFFFFF"})
-        self.setStyleSheet(f"""
-            RecordRow {{
-                background-color: {colors['background']};
-                border: 1px solid {colors['border']};
-                border-radius: 6px;
-            }}
-            RecordRow:hover {{
-                background-color: #E8F5E9;
-            }}
-        """)
-
-        main_layout = QHBoxLayout(self)
-        main_layout.setContentsMargins(10, 5, 10, 5)
-
-        date_obj = datetime.strptime(self.record['date'], "%Y-%m-%d %H:%M:%S")
-        date_label = QLabel(date_obj.strftime('%Y-%m-%d %H:%M'))
-        date_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        display_weight = self.record['weight']
+    def reload(self):
+        """记录整体发生变化（例如新增记录）时调用"""
+        self.beginResetModel()
+        self.endResetModel()
+
+    def _emit_rows_changed(self, first, last):
+        first = max(first, 0)
+        last = min(last, self.rowCount() - 1)
+        if first <= last:
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+    def update_row(self, row, new_record):
+        """修改一条记录；位置不变时只刷新这一行和依赖它的较新一行"""
+        records = self.data_handler.get_all_records()
+        new_date = new_record['date']
+        newer_ok = row == 0 or records[row - 1]['date'] >= new_date
+        older_ok = row + 1 >= len(records) or records[row + 1]['date'] <= new_date
+        if newer_ok and older_ok:
+            if not self.data_handler.update_record_at(row, new_record):
+                return False
+            self._emit_rows_changed(row - 1, row)
+            return True
+
+        # 时间被改到了别处，行的顺序会变化：按记录对象把选中项、当前项等持久索引移到新的行
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_records = [records[index.row()] for index in old_indexes]
+        edited = records[row]
+        ok = self.data_handler.update_record_at(row, new_record)
+        new_rows = {id(record): i for i, record in enumerate(self.data_handler.get_all_records())}
+        new_indexes = []
+        for record in old_records:
+            new_row = new_rows.get(id(new_record if record is edited else record))
+            new_indexes.append(self.index(new_row) if new_row is not None else QModelIndex())
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+        return ok
+
+    def delete_row(self, row):
+        # 按位置删除，同一时间有多条记录时也只删除这一行
+        self.beginRemoveRows(QModelIndex(), row, row)
+        ok = self.data_handler.delete_record_at(row)
+        self.endRemoveRows()
+        # 较新的一行现在和新的"上一条"比较，箭头需要重画
+        self._emit_rows_changed(row - 1, row - 1)
+        return ok
+
+
+class RecordDelegate(QStyledItemDelegate):
+    """直接用 QPainter 绘制每一行，不再为每条记录创建控件和样式表"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._colors = {
+            key: (QColor(value['border']), QColor(value['background']))
+            for key, value in Config.BMI_COLORS.items()
+        }
+        self._hover_color = QColor("#E8F5E9")
+        self._arrow_colors = {"↑": QColor("red"), "↓": QColor("green"), "-": QColor("#888")}
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        record = index.data(RecordListModel.RecordRole)
+        if record is None:
+            return
+        previous_record = index.data(RecordListModel.PreviousRecordRole)
+        unit = index.model().unit
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        category_key = get_bmi_category_key(record['bmi'])
+        border, background = self._colors.get(category_key, (QColor("#E0E0E0"), QColor("#FFFFFF")))
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            background = self._hover_color
+        frame = QRectF(option.rect).adjusted(0.5, 0.5, -0.5, -8.5)
+        painter.setPen(QPen(border, 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(frame, 6, 6)
+
+        # 按比例把内容区域切成五列
+        content = frame.adjusted(10, 5, -10, -5)
+        total = sum(COLUMN_PROPORTIONS)
+        cells = []
+        x = content.left()
+        for proportion in COLUMN_PROPORTIONS:
+            width = content.width() * proportion / total
+            cells.append(QRectF(x, content.top(), width, content.height()))
+            x += width
+
+        painter.setPen(QColor("#333333"))
+        center = Qt.AlignmentFlag.AlignCenter
+        painter.drawText(cells[0], center, record['date'][:16])
+
+        display_weight = record['weight']
         display_unit = 'kg'
-        prev_display_weight = self.previous_record['weight'] if self.previous_record else None
-        if self.unit == 'jin':
+        prev_display_weight = previous_record['weight'] if previous_record else None
+        if unit == 'jin':
             display_weight *= 2
             display_unit = '斤'
             if prev_display_weight is not None:
                 prev_display_weight *= 2
-        weight_widget = self.create_value_with_arrow_widget(
-            round(display_weight, 1), display_unit, prev_display_weight
-        )
-
-        bmi_widget = self.create_value_with_arrow_widget(
-            self.record['bmi'], '', self.previous_record and self.previous_record['bmi']
-        )
-
-        height_label = QLabel(f"{self.record['height']} cm")
-        height_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        category_label = QLabel(Config.BMI_STANDARDS_CHINA[category_key]['label'])
-        category_label.setStyleSheet("font-weight: bold;")
-        category_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        main_layout.addWidget(date_label, 3)
-        main_layout.addWidget(weight_widget, 2)
-        main_layout.addWidget(bmi_widget, 2)
-        main_layout.addWidget(height_label, 2)
-        main_layout.addWidget(category_label, 2)
-
-    def create_value_with_arrow_widget(self, value, unit, previous_value):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        value_label = QLabel(f"<b>{value}</b> {unit}")
-        arrow_label = QLabel()
-        arrow_label.setFixedWidth(15)
-        arrow_label.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self._draw_value_with_arrow(painter, option, cells[1], round(display_weight, 1),
+                                    display_unit, prev_display_weight)
+        self._draw_value_with_arrow(painter, option, cells[2], record['bmi'], '',
+                                    previous_record and previous_record['bmi'])
 
+        painter.drawText(cells[3], center, f"{record['height']} cm")
+
+        bold_font = QFont(option.font)
+        bold_font.setBold(True)
+        painter.setFont(bold_font)
+        painter.drawText(cells[4], center, Config.BMI_STANDARDS_CHINA[category_key]['label'])
+
+        painter.restore()
+
+    def _draw_value_with_arrow(self, painter, option, cell, value, unit, previous_value):
+        bold_font = QFont(option.font)
+        bold_font.setBold(True)
+        arrow_font = QFont(bold_font)
+        arrow_font.setPixelSize(16)
+
+        value_text = f"{value}"
+        unit_text = f" {unit}" if unit else ""
+        arrow_text = ""
         if previous_value is not None:
             if value > previous_value:
-                arrow_label.setText("<span style='color:red;'>↑</span>")
+                arrow_text = "↑"
             elif value < previous_value:
-                arrow_label.setText("<span style='color:green;'>↓</span>")
-            else:
-                arrow_label.setText("<span style='color:#888;'>-</span>")
-
-        layout.addWidget(value_label)
-        layout.addWidget(arrow_label)
-        return widget
-
-    def mouseDoubleClickEvent(self, event: QMouseEvent):
-        dialog = EditRecordDialog(self.record, self.unit, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            if dialog.delete_requested:
-                self._delete_record()
+                arrow_text = "↓"
             else:
-                original_date = self.record['date']
-                new_data = dialog.get_data()
-                new_bmi = calculate_bmi(new_data['weight_kg'], new_data['height'])
-
-                updated_record_data = {
-                    "date": new_data['date'],
-                    "weight": new_data['weight_kg'],
-                    "height": new_data['height'],
-                    "bmi": new_bmi
-                }
-                self.data_handler.update_record(original_date, updated_record_data)
-                self.parent_tab.refresh_data(self.unit)
-
-    def _delete_record(self):
-        reply = QMessageBox()
-        reply.setWindowTitle('确认删除')
-        reply.setText(f"您确定要删除 {self.record['date']} 的这条记录吗？")
-        reply.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        reply.button(QMessageBox.StandardButton.Yes).setText('确认')
-        reply.button(QMessageBox.StandardButton.No).setText('取消')
-        reply.setIcon(QMessageBox.Icon.Question)
-        reply.setDefaultButton(reply.button(QMessageBox.StandardButton.No))
-
-        if reply.exec() == QMessageBox.StandardButton.Yes:
-            self.data_handler.delete_record(self.record['date'])
-            self.parent_tab.refresh_data(self.unit)
+                arrow_text = "-"
+
+        value_width = QFontMetrics(bold_font).horizontalAdvance(value_text)
+        unit_width = QFontMetrics(option.font).horizontalAdvance(unit_text)
+        arrow_width = 15
+        x = cell.left() + (cell.width() - value_width - unit_width - arrow_width) / 2
+        middle = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        painter.setPen(QColor("#333333"))
+        painter.setFont(bold_font)
+        painter.drawText(QRectF(x, cell.top(), value_width, cell.height()), middle, value_text)
+        x += value_width
+        painter.setFont(option.font)
+        painter.drawText(QRectF(x, cell.top(), unit_width, cell.height()), middle, unit_text)
+        x += unit_width
+        if arrow_text:
+            painter.setPen(self._arrow_colors[arrow_text])
+            painter.setFont(arrow_font)
+            painter.drawText(QRectF(x, cell.top(), arrow_width, cell.height()), Qt.AlignmentFlag.AlignCenter,
+                             arrow_text)
 
 
 class HistoryTab(QWidget):
+    record_updated = pyqtSignal(dict, dict)
+    record_deleted = pyqtSignal(dict)
+
     def __init__(self, data_handler):
         super().__init__()
         self.data_handler = data_handler
@@ -206,19 +286,26 @@ class HistoryTab(QWidget):
         header = self.create_header()
         main_layout.addWidget(header)
 
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("QScrollArea { border: none; }")
-
-        scroll_content = QWidget()
-        self.records_layout = QVBoxLayout(scroll_content)
-        self.records_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.records_layout.setSpacing(8)
-        self.records_layout.setContentsMargins(0, 0, 0, 0)
-
-        scroll_area.setWidget(scroll_content)
-        main_layout.addWidget(scroll_area)
+        self.model = RecordListModel(self.data_handler, self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(RecordDelegate(self.list_view))
+        # 每行高度相同，视图无需逐行测量，只绘制可见区域
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.list_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.list_view.setStyleSheet("QListView { border: none; background-color: #FFFFFF; }")
+        self.list_view.doubleClicked.connect(self.edit_record)
+        main_layout.addWidget(self.list_view, 1)
+
+        self.no_record_label = QLabel("暂无记录，快去测量第一次吧！")
+        self.no_record_label.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+        self.no_record_label.setStyleSheet("color: #999; margin-top: 50px;")
+        main_layout.addWidget(self.no_record_label, 1)
+        self._update_empty_state()
 
     def create_header(self):
         header_widget = QWidget()
@@ -227,9 +314,8 @@ class HistoryTab(QWidget):
 
         style = "font-weight: bold; color: #333;"
         headers = ["时间", "体重", "BMI", "身高", "结果"]
-        proportions = [3, 2, 2, 2, 2]
 
-        for text, prop in zip(headers, proportions):
+        for text, prop in zip(headers, COLUMN_PROPORTIONS):
             label = QLabel(text)
             label.setStyleSheet(style)
             label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -237,22 +323,54 @@ class HistoryTab(QWidget):
 
         return header_widget
 
+    def _update_empty_state(self):
+        has_records = self.model.rowCount() > 0
+        self.list_view.setVisible(has_records)
+        self.no_record_label.setVisible(not has_records)
+
     def refresh_data(self, unit='kg'):
         self.current_unit = unit
-        while self.records_layout.count():
-            child = self.records_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.model.unit = unit
+        self.model.reload()
+        self._update_empty_state()
 
-        records = self.data_handler.get_all_records()
-        if not records:
-            no_record_label = QLabel("暂无记录，快去测量第一次吧！")
-            no_record_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_record_label.setStyleSheet("color: #999; margin-top: 50px;")
-            self.records_layout.addWidget(no_record_label)
+    def set_unit(self, unit):
+        """只切换单位时无需重置模型，重画即可"""
+        self.current_unit = unit
+        self.model.set_unit(unit)
+
+    def edit_record(self, index):
+        row = index.row()
+        record = index.data(RecordListModel.RecordRole)
+        dialog = EditRecordDialog(record, self.current_unit, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
             return
+        if dialog.delete_requested:
+            self._delete_record(row, record)
+            return
+
+        new_data = dialog.get_data()
+        new_bmi = calculate_bmi(new_data['weight_kg'], new_data['height'])
+        updated_record_data = {
+            "date": new_data['date'],
+            "weight": new_data['weight_kg'],
+            "height": new_data['height'],
+            "bmi": new_bmi
+        }
+        if self.model.update_row(row, updated_record_data):
+            self.record_updated.emit(record, updated_record_data)
+
+    def _delete_record(self, row, record):
+        reply = QMessageBox()
+        reply.setWindowTitle('确认删除')
+        reply.setText(f"您确定要删除 {record['date']} 的这条记录吗？")
+        reply.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        reply.button(QMessageBox.StandardButton.Yes).setText('确认')
+        reply.button(QMessageBox.StandardButton.No).setText('取消')
+        reply.setIcon(QMessageBox.Icon.Question)
+        reply.setDefaultButton(reply.button(QMessageBox.StandardButton.No))
 
-        for i, record in enumerate(records):
-            previous_record = records[i + 1] if i + 1 < len(records) else None
-            record_row = RecordRow(record, previous_record, self.data_handler, self, self.current_unit)
-            self.records_layout.addWidget(record_row)
\ No newline at end of file
+        if reply.exec() == QMessageBox.StandardButton.Yes:
+            if self.model.delete_row(row):
+                self.record_deleted.emit(record)
+            self._update_empty_state()
@@ -0,0 +1,229 @@
+# lod_series.py
+# ----------------------------------------------------------------
+# 多分辨率体重序列（Level of Detail）。
+# 把原始记录按 日 / 周 / 月 预先聚合成桶，每个桶保存
+# 首点、末点、最小点、最大点（M4 降采样）以及均值所需的累加值。
+# 图表根据当前可见的时间范围和像素宽度挑选合适的分辨率，
+# 这样即使有好几年的数据，画到屏幕上的像素也和原始数据一致。
+# ----------------------------------------------------------------
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 分辨率从细到粗排列
+LEVELS = ("raw", "day", "week", "month")
+
+
+def record_timestamp(record):
+    """把记录里的日期字符串转换为本地时间戳（与 time.mktime 结果一致）"""
+    return datetime.strptime(record['date'], DATE_FORMAT).timestamp()
+
+
+def _record_point(record):
+    """记录在序列中的表示：(时间戳, 体重kg, BMI, 身高cm)"""
+    return record_timestamp(record), record['weight'], record['bmi'], record['height']
+
+
+def _bucket_key(level, timestamp):
+    """返回时间戳在指定分辨率下所属桶的键"""
+    dt = datetime.fromtimestamp(timestamp)
+    if level == "day":
+        return dt.toordinal()
+    if level == "week":
+        # 公元1年1月1日是星期一，所以 (ordinal - 1) // 7 正好按周一分周
+        return (dt.toordinal() - 1) // 7
+    return dt.year * 12 + dt.month - 1
+
+
+class _Bucket:
+    """一个时间桶内的聚合值（M4：首/末/最小/最大 + 均值）"""
+    __slots__ = ("count", "sum_t", "sum_w", "sum_bmi",
+                 "first", "last", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.sum_t = 0.0
+        self.sum_w = 0.0
+        self.sum_bmi = 0.0
+        self.first = None
+        self.last = None
+        self.min = None
+        self.max = None
+
+    def add(self, point):
+        t, w, bmi = point[:3]
+        self.count += 1
+        self.sum_t += t
+        self.sum_w += w
+        self.sum_bmi += bmi
+        if self.first is None or t < self.first[0]:
+            self.first = point
+        if self.last is None or t >= self.last[0]:
+            self.last = point
+        if self.min is None or w < self.min[1]:
+            self.min = point
+        if self.max is None or w > self.max[1]:
+            self.max = point
+
+    def mean(self):
+        return self.sum_t / self.count, self.sum_w / self.count, self.sum_bmi / self.count
+
+    def line_points(self):
+        """按时间顺序返回该桶需要连线的点（去重）"""
+        points = sorted({self.first, self.last, self.min, self.max})
+        return points
+
+
+class LodSeries:
+    """预先计算好的多分辨率体重序列，支持增量增删记录"""
+
+    def __init__(self, records=None):
+        self.rebuild(records or [])
+
+    def rebuild(self, records):
+        """根据全部记录重新构建所有分辨率"""
+        self.points = sorted(_record_point(r) for r in records)
+        self.buckets = {level: {} for level in LEVELS[1:]}
+        self.bucket_keys = {level: [] for level in LEVELS[1:]}
+        for point in self.points:
+            self._add_to_buckets(point)
+
+    def __len__(self):
+        return len(self.points)
+
+    # --- 增量更新 ---
+    def add_record(self, record):
+        """新增一条记录，只更新它所在的桶"""
+        point = _record_point(record)
+        insort(self.points, point)
+        self._add_to_buckets(point)
+
+    def remove_record(self, record):
+        """删除一条记录，只重算它所在的桶"""
+        point = _record_point(record)
+        index = bisect_left(self.points, point)
+        if index >= len(self.points) or self.points[index] != point:
+            return False
+        del self.points[index]
+        for level in LEVELS[1:]:
+            self._rebuild_bucket(level, _bucket_key(level, point[0]))
+        return True
+
+    def _add_to_buckets(self, point):
+        for level in LEVELS[1:]:
+            key = _bucket_key(level, point[0])
+            buckets = self.buckets[level]
+            if key not in buckets:
+                buckets[key] = _Bucket()
+                insort(self.bucket_keys[level], key)
+            buckets[key].add(point)
+
+    def _rebuild_bucket(self, level, key):
+        """最小/最大值无法直接"减去"，所以删除时用该桶内剩余的原始点重算"""
+        buckets = self.buckets[level]
+        keys = self.bucket_keys[level]
+        if key not in buckets:
+            return
+        bucket = _Bucket()
+        for point in self._points_between(*self._bucket_span(level, key)):
+            if _bucket_key(level, point[0]) == key:
+                bucket.add(point)
+        if bucket.count:
+            buckets[key] = bucket
+        else:
+            del buckets[key]
+            del keys[bisect_left(keys, key)]
+
+    def _bucket_span(self, level, key):
+        """返回桶的大致时间范围（左右各放宽一天，避免夏令时等边界问题）"""
+        day = 24 * 3600
+        if level == "day":
+            start = datetime.fromordinal(key)
+            end_ordinal = key + 1
+        elif level == "week":
+            start = datetime.fromordinal(key * 7 + 1)
+            end_ordinal = key * 7 + 8
+        else:
+            year, month = divmod(key, 12)
+            start = datetime(year, month + 1, 1)
+            year, month = divmod(key + 1, 12)
+            end_ordinal = datetime(year, month + 1, 1).toordinal()
+        end = datetime.fromordinal(end_ordinal)
+        return start.timestamp() - day, end.timestamp() + day
+
+    def _clamp(self, x):
+        """把可见范围的端点限制在数据范围内；缩得很小时视图范围可能是负数或超出 datetime 能表示的年份"""
+        return min(max(x, self.points[0][0]), self.points[-1][0])
+
+    def _points_between(self, x_min, x_max):
+        lo = bisect_left(self.points, (x_min,))
+        hi = bisect_right(self.points, (x_max, float('inf')))
+        return self.points[lo:hi]
+
+    # --- 查询 ---
+    def endpoints(self, x_min=None):
+        """返回从 x_min 起最早和最新的点，用于统计开始值/当前值；没有数据时返回 None"""
+        lo = 0 if x_min is None else bisect_left(self.points, (x_min,))
+        if lo >= len(self.points):
+            return None
+        return self.points[lo], self.points[-1]
+
+    def count_in_range(self, level, x_min, x_max):
+        """统计可见范围内某一分辨率下的点数（原始点数或桶数）"""
+        if level == "raw":
+            return len(self._points_between(x_min, x_max))
+        if not self.points:
+            return 0
+        x_min, x_max = self._clamp(x_min), self._clamp(x_max)
+        keys = self.bucket_keys[level]
+        lo = bisect_left(keys, _bucket_key(level, x_min))
+        hi = bisect_right(keys, _bucket_key(level, x_max))
+        return hi - lo
+
+    def choose_level(self, x_min, x_max, pixel_width):
+        """挑选最细的、点数不超过可用像素的分辨率"""
+        # M4 每个桶最多画 4 个点，原始数据每个点占 1 个
+        budget = max(int(pixel_width), 1)
+        if self.count_in_range("raw", x_min, x_max) <= budget:
+            return "raw"
+        for level in LEVELS[1:]:
+            if self.count_in_range(level, x_min, x_max) * 4 <= budget:
+                return level
+        return LEVELS[-1]
+
+    def query(self, level, x_min=None, x_max=None):
+        """
+        返回 (line_x, line_y, dot_x, dot_y, dot_bmi)。
+        line_* 用于画折线，dot_* 用于画散点；单位为 kg。
+        可见范围左右各多取一个点/桶，保证折线能延伸出画面边缘。
+        """
+        if not self.points:
+            return [], [], [], [], []
+        x_min = self.points[0][0] if x_min is None else self._clamp(x_min)
+        x_max = self.points[-1][0] if x_max is None else self._clamp(x_max)
+
+        if level == "raw":
+            lo = max(bisect_left(self.points, (x_min,)) - 1, 0)
+            hi = bisect_right(self.points, (x_max, float('inf'))) + 1
+            points = self.points[lo:hi]
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            bmis = [p[2] for p in points]
+            return xs, ys, xs, ys, bmis
+
+        keys = self.bucket_keys[level]
+        buckets = self.buckets[level]
+        lo = max(bisect_left(keys, _bucket_key(level, x_min)) - 1, 0)
+        hi = bisect_right(keys, _bucket_key(level, x_max)) + 1
+        line_x, line_y, dot_x, dot_y, dot_bmi = [], [], [], [], []
+        for key in keys[lo:hi]:
+            bucket = buckets[key]
+            for t, w, *_ in bucket.line_points():
+                line_x.append(t)
+                line_y.append(w)
+            mean_t, mean_w, mean_bmi = bucket.mean()
+            dot_x.append(mean_t)
+            dot_y.append(mean_w)
+            dot_bmi.append(mean_bmi)
+        return line_x, line_y, dot_x, dot_y, dot_bmi
@@ -6,7 +6,8 @@
 import sys
 import os
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QLabel,
-                             QDoubleSpinBox, QPushButton, QGroupBox, QMessageBox, QFrame, QGridLayout)
+                             QDoubleSpinBox, QPushButton, QGroupBox, QMessageBox, QFrame, QGridLayout,
+                             QFileDialog, QApplication)
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, pyqtSignal
 from config import Config
@@ -14,6 +15,7 @@ from bmi_calculator import calculate_bmi, get_bmi_info
 from data_handler import DataHandler
 from visualization import VisualizationTab
 from history import HistoryTab
+from bulk_import import import_records
 
 
 def resource_path(relative_path):
@@ -65,6 +67,10 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.history_tab, "历史数据")
         self.tabs.addTab(self.visualization_tab, "可视化图表")
 
+        # 历史页修改/删除记录后，图表只更新受影响的点
+        self.history_tab.record_updated.connect(self.visualization_tab.update_record)
+        self.history_tab.record_deleted.connect(self.visualization_tab.delete_record)
+
         self.tabs.currentChanged.connect(self.on_tab_changed)
         self.on_tab_changed(0)
 
@@ -105,6 +111,10 @@ class MainWindow(QMainWindow):
         self.calculate_button.clicked.connect(self.calculate_and_save)
         layout.addWidget(self.calculate_button)
 
+        self.import_button = QPushButton("批量导入数据 (CSV/JSON)")
+        self.import_button.clicked.connect(self.import_from_file)
+        layout.addWidget(self.import_button)
+
         result_group = ClickableGroupBox("测量结果")
         result_group.doubleClicked.connect(self.toggle_unit)
         result_layout = QVBoxLayout(result_group)
@@ -214,7 +224,7 @@ class MainWindow(QMainWindow):
             self.weight_input.setRange(20.0, 300.0)
             self.weight_input.setValue(current_value / 2)
 
-        self.history_tab.refresh_data(self.unit)
+        self.history_tab.set_unit(self.unit)
         self.visualization_tab.refresh_data(self.unit)
 
     def calculate_and_save(self):
@@ -239,18 +249,44 @@ class MainWindow(QMainWindow):
             self.bmi_category_label.setStyleSheet(f"font-size: 28px; font-weight: bold; color: {status_color};")
             self.bmi_suggestion_label.setText(bmi_info["suggestion"])
 
-            if self.data_handler.save_record(weight_kg, height_cm, bmi):
+            new_record = self.data_handler.save_record(weight_kg, height_cm, bmi)
+            if new_record:
                 # --- 新增：保存当前输入的身高和体重 ---
                 self.data_handler.save_last_input(height_cm, weight_kg)
                 print("记录已保存，用户配置已更新")
                 self.history_tab.refresh_data(self.unit)
-                self.visualization_tab.refresh_data(self.unit)
+                self.visualization_tab.add_record(new_record)
             else:
                 QMessageBox.critical(self, "保存失败", "无法将记录写入文件！")
 
         except Exception as e:
             QMessageBox.critical(self, "发生错误", f"计算时出现问题: {e}")
 
+    def import_from_file(self):
+        """从体重秤或健康App导出的文件批量导入记录"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择导出文件", "", "数据文件 (*.csv *.json *.jsonl);;所有文件 (*)")
+        if not file_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            result = import_records(file_path, self.data_handler,
+                                    default_unit=self.unit, default_height=self.height_input.value())
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "导入失败", f"读取文件时出现问题: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+
+        if not result.saved:
+            QMessageBox.critical(self, "保存失败", "无法将记录写入文件！")
+            return
+        if result.added:
+            self.history_tab.refresh_data(self.unit)
+            self.visualization_tab.reload_records()
+        QMessageBox.information(self, "导入完成", result.summary())
+
     def on_tab_changed(self, index):
         if index == 1:
             self.history_tab.refresh_data(self.unit)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_import
+
+
+class FakeDataHandler:
+    def __init__(self):
+        self.records = []
+
+    def has_record_at(self, date):
+        return False
+
+    def add_records(self, records):
+        self.records.extend(records)
+        return True
+
+
+def test_csv_epoch_seconds_and_milliseconds(tmp_path):
+    path = tmp_path / "scale.csv"
+    path.write_text("timestamp,weight\n1704067200,60\n1704153600000,61\n", encoding="utf-8")
+    handler = FakeDataHandler()
+    result = bulk_import.import_records(str(path), handler)
+    assert (result.added, result.invalid) == (2, 0)
+    assert [r["weight"] for r in handler.records] == [60.0, 61.0]
+
+
+def test_jin_header_ignores_ui_unit(tmp_path):
+    path = tmp_path / "scale.csv"
+    path.write_text("日期,体重(斤)\n2024-01-01 08:00:00,120\n", encoding="utf-8")
+    handler = FakeDataHandler()
+    bulk_import.import_records(str(path), handler, default_unit='kg')
+    assert handler.records[0]["weight"] == 60.0
+
+
+def test_utc_time_converted_to_local():
+    expected = bulk_import._parse_timestamp(1704151800)  # 2024-01-01T23:30:00Z
+    assert bulk_import._parse_date("2024-01-01T23:30:00Z") == expected
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_handler import DataHandler
+
+
+def make_handler(tmp_path, dates):
+    handler = DataHandler(str(tmp_path / "records.json"), str(tmp_path / "settings.json"))
+    handler.add_records([{"date": date, "weight": 60.0 + i, "height": 170.0, "bmi": 20.0}
+                         for i, date in enumerate(dates)])
+    return handler
+
+
+def test_delete_record_at_removes_only_one_duplicate(tmp_path):
+    handler = make_handler(tmp_path, ["2024-01-02 08:00:00", "2024-01-01 08:00:00", "2024-01-01 08:00:00"])
+    assert handler.delete_record_at(1)
+    assert len(handler.get_all_records()) == 2
+    assert handler.has_record_at("2024-01-01 08:00:00")
+
+    assert handler.delete_record_at(1)
+    assert not handler.has_record_at("2024-01-01 08:00:00")
+
+
+def test_update_record_at_keeps_duplicates_and_resorts(tmp_path):
+    handler = make_handler(tmp_path, ["2024-01-02 08:00:00", "2024-01-01 08:00:00", "2024-01-01 08:00:00"])
+    new_record = {"date": "2024-01-03 08:00:00", "weight": 70.0, "height": 170.0, "bmi": 24.2}
+    assert handler.update_record_at(2, new_record)
+    records = handler.get_all_records()
+    assert records[0] is new_record
+    assert [r["date"] for r in records] == ["2024-01-03 08:00:00", "2024-01-02 08:00:00", "2024-01-01 08:00:00"]
@@ -0,0 +1,24 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lod_series import LodSeries, DATE_FORMAT, LEVELS
+
+
+def make_records(count):
+    start = datetime(2020, 1, 1, 8, 0, 0)
+    return [{'date': (start + timedelta(days=i)).strftime(DATE_FORMAT),
+             'weight': 60 + i % 7, 'bmi': 20.0, 'height': 170} for i in range(count)]
+
+
+def test_view_range_wider_than_data():
+    series = LodSeries(make_records(3000))
+    level = series.choose_level(-1e12, 1e12, 800)
+    assert level in LEVELS
+
+    full = series.query(level)
+    assert series.query(level, -1e12, 1e12) == full
+    for level in LEVELS[1:]:
+        assert series.count_in_range(level, -1e12, 1e12) == len(series.bucket_keys[level])
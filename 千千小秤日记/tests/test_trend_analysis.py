@@ -0,0 +1,91 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lod_series import DATE_FORMAT
+from trend_analysis import TrendAnalyzer, SECONDS_PER_DAY
+
+
+def make_records(count, start=datetime(2024, 1, 1, 8, 0, 0)):
+    return [{'date': (start + timedelta(hours=13 * i)).strftime(DATE_FORMAT),
+             'weight': 80 - 0.05 * i + np.sin(i), 'height': 175} for i in range(count)]
+
+
+def test_incremental_matches_rebuild():
+    records = make_records(200)
+    incremental = TrendAnalyzer(records[:3])
+    for record in records[3:]:
+        assert incremental.add_record(record)
+    rebuilt = TrendAnalyzer(records)
+
+    assert len(incremental) == len(rebuilt) == 200
+    np.testing.assert_allclose(incremental.t, rebuilt.t)
+    np.testing.assert_allclose(incremental.ewma(), rebuilt.ewma())
+    np.testing.assert_allclose(incremental.rolling_regression()[0], rebuilt.rolling_regression()[0])
+    np.testing.assert_allclose(incremental.latest_fit(), rebuilt.latest_fit())
+    assert incremental.projected_date() == rebuilt.projected_date()
+
+
+def test_add_record_before_latest_requires_rebuild():
+    records = make_records(5)
+    analyzer = TrendAnalyzer(records[2:])
+    assert not analyzer.add_record(records[0])
+    assert len(analyzer) == 3
+
+
+def test_ewma_decays_with_time():
+    records = make_records(50)
+    analyzer = TrendAnalyzer(records, ewma_days=3.0)
+    t, w = analyzer.t, analyzer.w
+    weights = np.exp(-(t[-1] - t) / 3.0)
+    assert np.isclose(analyzer.ewma()[-1], np.sum(weights * w) / np.sum(weights))
+
+
+def test_latest_fit_matches_polyfit():
+    analyzer = TrendAnalyzer(make_records(200), window_days=28.0)
+    t, w = analyzer.t, analyzer.w
+    window = t > t[-1] - 28.0
+    slope, intercept = np.polyfit(t[window], w[window], 1)
+    np.testing.assert_allclose(analyzer.latest_fit(), (slope, intercept))
+
+    slopes, intercepts = analyzer.rolling_regression()
+    np.testing.assert_allclose((slopes[-1], intercepts[-1]), (slope, intercept))
+    assert np.isclose(analyzer.weekly_rate(), slope * 7)
+
+
+def test_trend_line_clipped_to_floor():
+    analyzer = TrendAnalyzer(make_records(200), window_days=28.0)
+    latest = analyzer.timestamps()[-1]
+    full_x, _ = analyzer.trend_line()
+    assert np.isclose(latest - full_x[0], 28 * SECONDS_PER_DAY)
+
+    floor = latest - 7 * SECONDS_PER_DAY
+    xs, ys = analyzer.trend_line(floor)
+    assert np.isclose(xs[0], floor)
+    slope, intercept = analyzer.latest_fit()
+    t0 = (floor - analyzer.origin) / SECONDS_PER_DAY
+    assert np.isclose(ys[0], intercept + slope * t0)
+    assert analyzer.trend_line(latest + 1) == ([], [])
+
+
+def test_projection_reaches_target():
+    analyzer = TrendAnalyzer(make_records(100))
+    target = analyzer.default_target_bmi()
+    assert target is not None
+    projected = analyzer.projected_date()
+    latest = datetime.fromtimestamp(analyzer.timestamps()[-1])
+    assert projected > latest
+
+    slope, intercept = analyzer.latest_fit()
+    height_m = analyzer.latest_height / 100
+
+    def fitted_bmi(when):
+        t = (when.timestamp() - analyzer.origin) / SECONDS_PER_DAY
+        return round((intercept + slope * t) / height_m ** 2, 1)
+
+    assert fitted_bmi(projected) <= target
+    assert fitted_bmi(projected - timedelta(days=1)) > target
@@ -0,0 +1,239 @@
+# trend_analysis.py
+# ----------------------------------------------------------------
+# 体重趋势分析模块。
+# 在 DataHandler 的记录之上计算：
+#   1. 按时间衰减的指数加权移动平均（EWMA）
+#   2. 滚动时间窗口内的线性回归（趋势斜率）
+#   3. 每周变化率
+#   4. 按当前趋势达到目标 BMI 的预计日期
+# 计算全部基于 numpy 向量化完成；新记录追加在末尾时只做增量更新。
+# ----------------------------------------------------------------
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bmi_calculator import calculate_bmi
+from config import Config
+from lod_series import record_timestamp
+
+SECONDS_PER_DAY = 24 * 3600
+# 分块计算衰减累加时，单块跨度不超过多少个时间常数（避免 exp 溢出）
+_MAX_DECAY_SPAN = 500
+# 预测达标日期时最多向后看多少天
+PROJECTION_HORIZON_DAYS = 3 * 365
+
+
+class TrendAnalyzer:
+    def __init__(self, records=None, ewma_days=7.0, window_days=28.0):
+        # ewma_days: EWMA 的时间常数（天）；window_days: 回归窗口长度（天）
+        self.ewma_days = ewma_days
+        self.window_days = window_days
+        self.rebuild(records or [])
+
+    def rebuild(self, records):
+        """根据全部记录重新计算"""
+        points = sorted((record_timestamp(r), r['weight'], r['height']) for r in records)
+        self.origin = points[0][0] if points else 0.0
+        self.latest_height = points[-1][2] if points else None
+        t = np.array([(p[0] - self.origin) / SECONDS_PER_DAY for p in points], dtype=float)
+        w = np.array([p[1] for p in points], dtype=float)
+
+        # 数据存放在预留了空间的缓冲区里，追加时按倍数扩容，均摊 O(1)；
+        # self.t / self.w 等是缓冲区前 n 项的视图
+        n = len(t)
+        capacity = max(16, 2 * n)
+        self._n = n
+        self._t_buf = np.empty(capacity)
+        self._w_buf = np.empty(capacity)
+        self._t_buf[:n] = t
+        self._w_buf[:n] = w
+
+        # 回归所需的前缀和：[1, t, w, t*t, t*w]
+        columns = np.vstack([np.ones_like(t), t, w, t * t, t * w])
+        self._prefix_buf = np.empty((5, capacity + 1))
+        self._prefix_buf[:, 0] = 0.0
+        self._prefix_buf[:, 1:n + 1] = np.cumsum(columns, axis=1)
+
+        self._ewma_num_buf = np.empty(capacity)
+        self._ewma_den_buf = np.empty(capacity)
+        self._ewma_num_buf[:n] = _decayed_cumsum(t, w, self.ewma_days)
+        self._ewma_den_buf[:n] = _decayed_cumsum(t, np.ones_like(t), self.ewma_days)
+        self._update_views()
+        self._slopes = None
+
+    def _update_views(self):
+        n = self._n
+        self.t = self._t_buf[:n]
+        self.w = self._w_buf[:n]
+        self._prefix = self._prefix_buf[:, :n + 1]
+        self._ewma_num = self._ewma_num_buf[:n]
+        self._ewma_den = self._ewma_den_buf[:n]
+
+    def _grow(self):
+        """缓冲区已满时容量翻倍"""
+        capacity = 2 * len(self._t_buf)
+        for name in ("_t_buf", "_w_buf", "_ewma_num_buf", "_ewma_den_buf"):
+            old = getattr(self, name)
+            new = np.empty(capacity)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+        prefix = np.empty((5, capacity + 1))
+        prefix[:, :self._n + 1] = self._prefix_buf[:, :self._n + 1]
+        self._prefix_buf = prefix
+
+    def __len__(self):
+        return len(self.t)
+
+    def add_record(self, record):
+        """
+        在末尾追加一条记录并增量更新，成功返回 True。
+        记录早于已有的最新记录时返回 False，此时需要调用 rebuild。
+        """
+        timestamp = record_timestamp(record)
+        if not len(self.t):
+            self.rebuild([record])
+            return True
+        t = (timestamp - self.origin) / SECONDS_PER_DAY
+        if t < self.t[-1]:
+            return False
+
+        w = float(record['weight'])
+        decay = np.exp(-(t - self.t[-1]) / self.ewma_days)
+        n = self._n
+        if n == len(self._t_buf):
+            self._grow()
+        self._ewma_num_buf[n] = self._ewma_num_buf[n - 1] * decay + w
+        self._ewma_den_buf[n] = self._ewma_den_buf[n - 1] * decay + 1.0
+        self._prefix_buf[:, n + 1] = self._prefix_buf[:, n] + (1.0, t, w, t * t, t * w)
+        self._t_buf[n] = t
+        self._w_buf[n] = w
+        self._n = n + 1
+        self._update_views()
+        self.latest_height = record['height']
+        self._slopes = None
+        return True
+
+    # --- 查询 ---
+    def timestamps(self):
+        """所有点的时间戳（秒），与图表横轴一致"""
+        return self.t * SECONDS_PER_DAY + self.origin
+
+    def ewma(self):
+        """返回每个点处的 EWMA 体重（kg）"""
+        if not len(self.t):
+            return np.empty(0)
+        return self._ewma_num / self._ewma_den
+
+    def rolling_regression(self):
+        """
+        返回每个点处、以它为结尾的时间窗口内的回归 (斜率 kg/天, 截距 kg)。
+        点数不足或时间全部相同时，斜率为 nan。
+        """
+        if self._slopes is None:
+            lo = np.searchsorted(self.t, self.t - self.window_days, side='right')
+            hi = np.arange(1, len(self.t) + 1)
+            n, st, sw, stt, stw = self._prefix[:, hi] - self._prefix[:, lo]
+            denom = n * stt - st * st
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slopes = np.where(denom > 1e-9, (n * stw - st * sw) / denom, np.nan)
+                intercepts = (sw - slopes * st) / n
+            self._slopes = (slopes, intercepts)
+        return self._slopes
+
+    def latest_fit(self):
+        """最新窗口的回归结果 (斜率 kg/天, 截距 kg)，无法拟合时返回 None"""
+        n = len(self.t)
+        if n < 2:
+            return None
+        # 只需要最后一个窗口：一次二分查找 + 前缀和相减，不必计算整个滚动序列
+        lo = int(np.searchsorted(self.t, self.t[-1] - self.window_days, side='right'))
+        count, st, sw, stt, stw = self._prefix[:, n] - self._prefix[:, lo]
+        denom = count * stt - st * st
+        if not denom > 1e-9:
+            return None
+        slope = (count * stw - st * sw) / denom
+        return slope, (sw - slope * st) / count
+
+    def weekly_rate(self):
+        """按最新趋势计算的每周体重变化（kg/周）"""
+        fit = self.latest_fit()
+        return None if fit is None else fit[0] * 7
+
+    def trend_line(self, x_floor=None):
+        """
+        最新窗口的趋势线端点 ([x0, x1], [y0, y1])，横轴为时间戳。
+        x_floor: 图表只显示该时间戳之后的数据时，趋势线也从这里开始
+        """
+        fit = self.latest_fit()
+        if fit is None:
+            return [], []
+        slope, intercept = fit
+        t1 = self.t[-1]
+        t0 = max(self.t[0], t1 - self.window_days)
+        if x_floor is not None:
+            t0 = max(t0, (x_floor - self.origin) / SECONDS_PER_DAY)
+            if t0 >= t1:
+                return [], []
+        xs = [t0 * SECONDS_PER_DAY + self.origin, t1 * SECONDS_PER_DAY + self.origin]
+        return xs, [intercept + slope * t0, intercept + slope * t1]
+
+    def default_target_bmi(self):
+        """当前在正常范围外时，以最近的正常边界作为目标；已正常则返回 None"""
+        if not len(self.t):
+            return None
+        current_bmi = calculate_bmi(self.ewma()[-1], self.latest_height)
+        normal = Config.BMI_STANDARDS_CHINA['normal']
+        if current_bmi > normal['max']:
+            return normal['max']
+        if current_bmi < normal['min']:
+            return normal['min']
+        return None
+
+    def projected_date(self, target_bmi=None):
+        """按最新趋势外推，返回 BMI 达到目标的预计日期；趋势方向不对或太远时返回 None"""
+        if target_bmi is None:
+            target_bmi = self.default_target_bmi()
+        fit = self.latest_fit()
+        if target_bmi is None or fit is None:
+            return None
+        slope, intercept = fit
+        if slope == 0:
+            return None
+
+        t_last = self.t[-1]
+        fitted_now = intercept + slope * t_last
+        losing = calculate_bmi(fitted_now, self.latest_height) > target_bmi
+        target_weight = target_bmi * (self.latest_height / 100) ** 2
+        days = (target_weight - fitted_now) / slope
+        if days < 0 or days > PROJECTION_HORIZON_DAYS:
+            return None
+
+        # calculate_bmi 会保留一位小数，按界面上的取整规则确定具体是哪一天达标
+        def reached(day):
+            bmi = calculate_bmi(intercept + slope * (t_last + day), self.latest_height)
+            return bmi <= target_bmi if losing else bmi >= target_bmi
+
+        day = int(np.ceil(days))
+        while day > 0 and reached(day - 1):
+            day -= 1
+        latest = datetime.fromtimestamp(t_last * SECONDS_PER_DAY + self.origin)
+        return latest + timedelta(days=day)
+
+
+def _decayed_cumsum(t, x, tau):
+    """
+    计算 S_i = sum_{j<=i} exp(-(t_i - t_j) / tau) * x_j。
+    用 exp(t/tau) 的累加和向量化实现；为避免溢出，按时间跨度分块，块与块之间传递衰减后的结果。
+    """
+    out = np.empty_like(x, dtype=float)
+    carry, carry_t = 0.0, None
+    start, n = 0, len(t)
+    while start < n:
+        t0 = t[start]
+        end = max(int(np.searchsorted(t, t0 + _MAX_DECAY_SPAN * tau, side='right')), start + 1)
+        growth = np.exp((t[start:end] - t0) / tau)
+        head = 0.0 if carry_t is None else carry * np.exp(-(t0 - carry_t) / tau)
+        out[start:end] = (np.cumsum(growth * x[start:end]) + head) / growth
+        carry, carry_t = out[end - 1], t[end - 1]
+        start = end
+    return out
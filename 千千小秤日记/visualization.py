@@ -2,6 +2,9 @@
 # ----------------------------------------------------------------
 # 可视化图表模块。
 # 新增功能：支持显示不同重量单位（kg/斤）。
+# 新增功能：按可见范围自动选择 日/周/月 分辨率，长历史也能流畅缩放。
+# 新增功能：图表元素常驻，增删改记录时只更新受影响的部分。
+# 新增功能：叠加移动平均线和趋势线，并显示每周变化率与预计达标日期。
 # ----------------------------------------------------------------
 import pyqtgraph as pg
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QGroupBox
@@ -10,6 +13,8 @@ import time
 from datetime import datetime
 from bmi_calculator import get_bmi_info
 from config import Config
+from lod_series import LodSeries, record_timestamp
+from trend_analysis import TrendAnalyzer
 
 
 class ChineseDateAxis(pg.DateAxisItem):
@@ -49,7 +54,15 @@ class VisualizationTab(QWidget):
         self.show_colored_dots = False
         self.current_days_filter = None
         self.unit = 'kg'
+        self.lod_series = LodSeries(data_handler.get_all_records())
+        self.trend = TrendAnalyzer(data_handler.get_all_records())
+        self.x_floor = None
+        self.line_item = None
+        self.scatter_item = None
+        self._rendering = False
+        self._brush_cache = {}
         self.init_ui()
+        self.update_plot(self.current_days_filter)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -88,6 +101,25 @@ class VisualizationTab(QWidget):
         self.plot_widget.setLabel("left", "体重 (kg)", **styles)
         self.plot_widget.setLabel("bottom", "日期", **styles)
 
+        # 折线和散点只创建一次，之后通过 setData 更新
+        pen = pg.mkPen(color='#87CEEB', width=3)
+        self.line_item = self.plot_widget.plot([], [], pen=pen, symbol=None)
+        self.scatter_item = pg.ScatterPlotItem()
+        self.plot_widget.addItem(self.scatter_item)
+
+        # 趋势叠加层：移动平均线交给 pyqtgraph 按视图自动裁剪和降采样
+        ewma_pen = pg.mkPen(color='#FFA500', width=2, style=Qt.PenStyle.DashLine)
+        self.ewma_item = self.plot_widget.plot([], [], pen=ewma_pen, symbol=None)
+        self.ewma_item.setClipToView(True)
+        self.ewma_item.setDownsampling(auto=True, method='peak')
+        trend_pen = pg.mkPen(color='#2E8B57', width=2, style=Qt.PenStyle.DashDotLine)
+        self.trend_item = self.plot_widget.plot([], [], pen=trend_pen, symbol=None)
+
+        # 缩放、平移或改变窗口大小时重新挑选分辨率
+        view_box = self.plot_widget.getPlotItem().getViewBox()
+        view_box.sigXRangeChanged.connect(self.on_view_range_changed)
+        view_box.sigResized.connect(self.on_view_range_changed)
+
         layout.addWidget(self.plot_widget, 1)
 
         stats_group = QGroupBox("数据总览")
@@ -101,12 +133,16 @@ class VisualizationTab(QWidget):
         self.bmi_result_widget = self.create_stats_label("当前状态", "-")
         self.advice_widget = self.create_stats_label("健康建议", "-", font_size=16)
         self.advice_widget.value_label.setWordWrap(True)
+        self.weekly_rate_widget = self.create_stats_label("每周变化", "-", font_size=16)
+        self.projection_widget = self.create_stats_label("预计达标", "-", font_size=16)
 
         stats_layout.addWidget(self.start_label_widget)
         stats_layout.addWidget(self.current_label_widget)
         stats_layout.addWidget(self.change_label_widget)
         stats_layout.addWidget(self.bmi_result_widget)
         stats_layout.addWidget(self.advice_widget)
+        stats_layout.addWidget(self.weekly_rate_widget)
+        stats_layout.addWidget(self.projection_widget)
 
         layout.addWidget(stats_group)
 
@@ -127,68 +163,159 @@ class VisualizationTab(QWidget):
 
     def toggle_colored_dots(self):
         self.show_colored_dots = not self.show_colored_dots
-        self.update_plot(self.current_days_filter)
+        self.on_view_range_changed()
 
     def refresh_data(self, unit='kg'):
+        """切换单位或切换到本页时调用，序列本身已是最新，只需重画"""
         self.unit = unit
+        unit_str = "斤" if self.unit == 'jin' else "kg"
+        self.plot_widget.setLabel("left", f"体重 ({unit_str})")
+        self.update_stats_info()
+        self.update_trend_overlays()
+        self.on_view_range_changed()
+
+    def reload_records(self):
+        """记录被整体替换（例如批量导入）后重新预计算"""
+        records = self.data_handler.get_all_records()
+        self.lod_series.rebuild(records)
+        self.trend.rebuild(records)
         self.update_plot(self.current_days_filter)
 
+    # --- 记录变化时的增量更新 ---
+    def add_record(self, record):
+        self.lod_series.add_record(record)
+        if not self.trend.add_record(record):
+            self.trend.rebuild(self.data_handler.get_all_records())
+        self._after_records_changed(record_timestamp(record))
+
+    def update_record(self, old_record, new_record):
+        self.lod_series.remove_record(old_record)
+        self.lod_series.add_record(new_record)
+        # 中间的记录变化会影响其后所有的移动平均值，直接重算
+        self.trend.rebuild(self.data_handler.get_all_records())
+        self._after_records_changed(record_timestamp(new_record))
+
+    def delete_record(self, record):
+        self.lod_series.remove_record(record)
+        self.trend.rebuild(self.data_handler.get_all_records())
+        self._after_records_changed(None)
+
+    def _after_records_changed(self, changed_x):
+        self.update_stats_info()
+        self.update_trend_overlays()
+        x_min, x_max = self.plot_widget.getPlotItem().getViewBox().viewRange()[0]
+        if changed_x is not None and not x_min <= changed_x <= x_max:
+            # 新的点落在视图之外，重新适配范围
+            self.fit_view()
+        else:
+            self.on_view_range_changed()
+
     def update_plot(self, days=None):
         self.current_days_filter = days
-
-        all_records = self.data_handler.get_all_records()
-        if not all_records:
-            self.plot_widget.clear()
-            self.update_stats_info(None)
-            return
-
         if days is not None:
-            now = time.time()
-            seconds_in_period = days * 24 * 3600
-            filtered_records = [r for r in all_records if
-                                now - time.mktime(time.strptime(r['date'], "%Y-%m-%d %H:%M:%S")) <= seconds_in_period]
+            self.x_floor = time.time() - days * 24 * 3600
         else:
-            filtered_records = all_records
+            self.x_floor = None
+        self.update_stats_info()
+        self.update_trend_overlays()
+        self.fit_view()
+
+    def fit_view(self):
+        """先按整个筛选范围画一遍，再根据实际视图范围细化"""
+        points = self.lod_series.points
+        if not points:
+            self.render_lod(0, 0)
+            return
+        x_min = points[0][0] if self.x_floor is None else max(points[0][0], self.x_floor)
+        self.render_lod(x_min, points[-1][0])
+        self._rendering = True
+        try:
+            self.plot_widget.autoRange()
+        finally:
+            self._rendering = False
+        self.on_view_range_changed()
+
+    def on_view_range_changed(self, *args):
+        if self._rendering:
+            return
+        x_min, x_max = self.plot_widget.getPlotItem().getViewBox().viewRange()[0]
+        self.render_lod(x_min, x_max)
+
+    def render_lod(self, x_min, x_max):
+        """按可见范围挑选分辨率，并把对应的点交给折线和散点"""
+        if self.x_floor is not None:
+            x_min = max(x_min, self.x_floor)
+        pixel_width = self.plot_widget.getPlotItem().getViewBox().width()
+        level = self.lod_series.choose_level(x_min, x_max, pixel_width)
+        line_x, line_y, dot_x, dot_y, dot_bmi = self.lod_series.query(level, x_min, x_max)
+
+        if self.x_floor is not None:
+            line = [(x, y) for x, y in zip(line_x, line_y) if x >= self.x_floor]
+            line_x = [x for x, _ in line]
+            line_y = [y for _, y in line]
+            dots = [d for d in zip(dot_x, dot_y, dot_bmi) if d[0] >= self.x_floor]
+            dot_x = [d[0] for d in dots]
+            dot_y = [d[1] for d in dots]
+            dot_bmi = [d[2] for d in dots]
 
+        multiplier = 2 if self.unit == 'jin' else 1
+        brushes = [self._point_brush(bmi) for bmi in dot_bmi]
+        # 聚合后的点画小一些，提示这是一段时间的平均值
+        size = 10 if level == "raw" else 7
+
+        self._rendering = True
+        try:
+            self.line_item.setData(line_x, [y * multiplier for y in line_y])
+            self.scatter_item.setData(x=dot_x, y=[y * multiplier for y in dot_y],
+                                      brush=brushes, size=size, pen=None)
+        finally:
+            self._rendering = False
+
+    def _point_brush(self, bmi):
+        if self.show_colored_dots:
+            category_key = get_bmi_info(bmi)['key']
+            point_color = Config.BMI_COLORS[category_key]["border"]
+        else:
+            point_color = '#6495ED'
+        brush = self._brush_cache.get(point_color)
+        if brush is None:
+            brush = self._brush_cache[point_color] = pg.mkBrush(point_color)
+        return brush
+
+    def update_trend_overlays(self):
+        """更新移动平均线和最新窗口的趋势线"""
+        multiplier = 2 if self.unit == 'jin' else 1
+        xs = self.trend.timestamps()
+        ys = self.trend.ewma() * multiplier
+        if self.x_floor is not None:
+            keep = xs >= self.x_floor
+            xs, ys = xs[keep], ys[keep]
+        self.ewma_item.setData(xs, ys)
+
+        trend_x, trend_y = self.trend.trend_line(self.x_floor)
+        self.trend_item.setData(trend_x, [y * multiplier for y in trend_y])
+
+    def update_trend_info(self):
+        """每周变化率和按当前趋势达到正常 BMI 的预计日期"""
+        weekly_label = self.weekly_rate_widget.value_label
+        projection_label = self.projection_widget.value_label
         multiplier = 2 if self.unit == 'jin' else 1
         unit_str = "斤" if self.unit == 'jin' else "kg"
-        self.plot_widget.setLabel("left", f"体重 ({unit_str})")
-        self.update_stats_info(filtered_records)
-        self.plot_widget.clear()
-
-        if not filtered_records:
-            return
-
-        plot_data = sorted(filtered_records, key=lambda x: x['date'])
-
-        dates = [time.mktime(time.strptime(r['date'], "%Y-%m-%d %H:%M:%S")) for r in plot_data]
-        weights = [r['weight'] * multiplier for r in plot_data]
-
-        pen = pg.mkPen(color='#87CEEB', width=3)
-        self.plot_widget.plot(dates, weights, pen=pen, symbol=None)
-
-        spots = []
-        for record in plot_data:
-            date = time.mktime(time.strptime(record['date'], "%Y-%m-%d %H:%M:%S"))
-            weight = record['weight'] * multiplier
-
-            if self.show_colored_dots:
-                bmi_info = get_bmi_info(record['bmi'])
-                category_key = bmi_info['key']
-                point_color = Config.BMI_COLORS[category_key]["border"]
-            else:
-                point_color = '#6495ED'
-
-            spots.append({'pos': (date, weight), 'size': 10, 'brush': pg.mkBrush(point_color), 'pen': None})
 
-        scatter = pg.ScatterPlotItem()
-        scatter.setData(spots)
-        self.plot_widget.addItem(scatter)
+        weekly_rate = self.trend.weekly_rate()
+        if weekly_rate is None:
+            weekly_label.setText("-")
+        else:
+            weekly_label.setText(f"{weekly_rate * multiplier:+.2f} {unit_str}/周")
 
-        self.plot_widget.autoRange()
+        if self.trend.default_target_bmi() is None:
+            projection_label.setText("-" if not len(self.trend) else "已在正常范围")
+            return
+        projected = self.trend.projected_date()
+        projection_label.setText(projected.strftime('%Y-%m-%d') if projected else "按当前趋势难以达到")
 
-    def update_stats_info(self, records_in_period):
-        # ... (rest of the function needs to be updated for units)
+    def update_stats_info(self):
+        """开始值/当前值直接从有序序列中取，不再遍历筛选后的记录"""
         start_value_label = self.start_label_widget.value_label
         current_value_label = self.current_label_widget.value_label
         change_value_label = self.change_label_widget.value_label
@@ -198,7 +325,8 @@ class VisualizationTab(QWidget):
         multiplier = 2 if self.unit == 'jin' else 1
         unit_str = "斤" if self.unit == 'jin' else "kg"
 
-        if not records_in_period:
+        endpoints = self.lod_series.endpoints(self.x_floor)
+        if endpoints is None:
             start_value_label.setText("-")
             current_value_label.setText("-")
             change_value_label.setText("-")
@@ -208,11 +336,13 @@ class VisualizationTab(QWidget):
             change_value_label.setStyleSheet(default_style)
             bmi_result_label.setStyleSheet(default_style)
             advice_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #87CEEB;")
+            self.update_trend_info()
             return
 
-        latest_record = records_in_period[0]
-        start_weight = records_in_period[-1]['weight'] * multiplier
-        current_weight = latest_record['weight'] * multiplier
+        start_point, latest_point = endpoints
+        _, latest_weight_kg, latest_bmi, latest_height = latest_point
+        start_weight = start_point[1] * multiplier
+        current_weight = latest_weight_kg * multiplier
         change = current_weight - start_weight
 
         start_value_label.setText(f"{start_weight:.1f} {unit_str}")
@@ -230,19 +360,19 @@ class VisualizationTab(QWidget):
         change_value_label.setText(
             f"{change_text} <span style='color:{arrow_color}; font-size: 20px;'>{arrow_text}</span>")
 
-        bmi_info = get_bmi_info(latest_record['bmi'])
+        bmi_info = get_bmi_info(latest_bmi)
         bmi_result_label.setText(bmi_info['label'])
         category_key = bmi_info['key']
 
         status_color = Config.BMI_COLORS[category_key]["border"]
 
-        height_m = latest_record['height'] / 100
+        height_m = latest_height / 100
         normal_range = Config.BMI_STANDARDS_CHINA['normal']
         target_low_kg = normal_range['min'] * (height_m ** 2)
         target_high_kg = normal_range['max'] * (height_m ** 2)
 
         advice_text = "非常棒, 请保持!"
-        current_weight_kg = latest_record['weight']
+        current_weight_kg = latest_weight_kg
         if current_weight_kg < target_low_kg:
             advice_text = f"需增重 {(target_low_kg - current_weight_kg) * multiplier:.1f} {unit_str}"
         elif current_weight_kg > target_high_kg:
@@ -252,3 +382,5 @@ class VisualizationTab(QWidget):
 
         advice_label.setStyleSheet(f"font-size: 16px; font-weight: bold; color: {status_color};")
         bmi_result_label.setStyleSheet(f"font-size: 20px; font-weight: bold; color: {status_color};")
+
+        self.update_trend_info()
@@ -0,0 +1,349 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+DB_FILE = "achievement.db"
+
+# 旧版本使用的 JSON 文件，第一次打开数据库时自动导入（原文件保留不动）
+LEGACY_CONFIG_FILE = "config.json"
+LEGACY_WEALTH_LOG_FILE = "wealth_log.json"
+LEGACY_RULES_FILE = "rules.json"
+LEGACY_REWARDS_FILE = "qianqian_rewards.json"
+
+# 树形列表的名称
+TREE_RULES_NORMAL = "rules.normal"
+TREE_RULES_SPECIAL = "rules.special"
+TREE_REWARDS_DAILY = "rewards.daily"
+TREE_REWARDS_CURRENT = "rewards.current"
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def _legacy_text(value):
+    """旧文件中的文字字段：None 为空字符串，数字等其他类型转为字符串"""
+    return "" if value is None else str(value)
+
+
+class AchievementDatabase:
+    """
+    成就软件的数据库：日志、等级、样式设置、规则树和奖励树都保存在同一个 SQLite 文件中。
+    每次修改只写入变化的那几行；树形数据用 parent_id 表示上下级，删除父项时子项随之级联删除。
+    """
+
+    def __init__(self, db_name=DB_FILE):
+        self.conn = sqlite3.connect(db_name)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("PRAGMA foreign_keys = ON")
+        self._batch_depth = 0
+        self._level_rows = None  # 位置 -> 已保存的 JSON，用于只写入有变化的等级
+        self._style_rows = None  # 键 -> 已保存的 JSON
+        self.migration_errors = []  # 无法导入的旧文件
+        self.migration_warnings = []  # 部分内容无法识别、已跳过的旧文件
+        self.create_tables()
+        self.migrate_legacy_files()
+
+    def create_tables(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        # id 即录入顺序，日期相同的记录按它排列
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS wealth_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                wealth INTEGER NOT NULL DEFAULT 0,
+                description TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS levels (
+                position INTEGER PRIMARY KEY,
+                data TEXT NOT NULL
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS styles (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tree_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tree TEXT NOT NULL,
+                parent_id INTEGER REFERENCES tree_items(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL DEFAULT 0,
+                plan TEXT NOT NULL DEFAULT '',
+                reward_text TEXT NOT NULL DEFAULT '',
+                reward TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tree_items_parent ON tree_items(tree, parent_id, position)")
+        self.conn.commit()
+
+    # --- 事务 ---
+    def _commit(self):
+        if self._batch_depth == 0:
+            self.conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """把多次写入合并为一个事务，出错时整体回滚"""
+        self._batch_depth += 1
+        try:
+            yield
+        except Exception:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.rollback()
+            raise
+        self._batch_depth -= 1
+        self._commit()
+
+    def get_meta(self, key, default=None):
+        self.cursor.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        row = self.cursor.fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+        self._commit()
+
+    # --- 日志 ---
+    def load_log(self):
+        """按录入顺序返回 [{id, date, wealth, description}]"""
+        self.cursor.execute("SELECT id, date, wealth, description FROM wealth_log ORDER BY id")
+        return [{"id": entry_id, "date": date, "wealth": wealth, "description": description}
+                for entry_id, date, wealth, description in self.cursor.fetchall()]
+
+    def add_log_entry(self, date, wealth, description=""):
+        """添加一条记录，返回它的 id"""
+        self.cursor.execute("INSERT INTO wealth_log (date, wealth, description) VALUES (?, ?, ?)",
+                            (str(date), int(wealth), description or ""))
+        self._commit()
+        return self.cursor.lastrowid
+
+    def add_log_entries(self, entries):
+        with self.batch():
+            self.cursor.executemany(
+                "INSERT INTO wealth_log (date, wealth, description) VALUES (?, ?, ?)",
+                ((str(e.get("date", "1970-01-01")), int(e.get("wealth", 0)), e.get("description") or "")
+                 for e in entries))
+
+    def update_log_entry(self, entry_id, date, wealth, description):
+        self.cursor.execute("UPDATE wealth_log SET date = ?, wealth = ?, description = ? WHERE id = ?",
+                            (str(date), int(wealth), description or "", entry_id))
+        self._commit()
+
+    def delete_log_entry(self, entry_id):
+        self.cursor.execute("DELETE FROM wealth_log WHERE id = ?", (entry_id,))
+        self._commit()
+
+    # --- 等级与样式 ---
+    def load_app_config(self):
+        """返回 (等级列表, 样式字典)；从未保存过的部分为 None"""
+        self.cursor.execute("SELECT position, data FROM levels ORDER BY position")
+        self._level_rows = dict(self.cursor.fetchall())
+        self.cursor.execute("SELECT key, value FROM styles")
+        self._style_rows = dict(self.cursor.fetchall())
+
+        levels = styles = None
+        if self.get_meta("levels_saved"):
+            levels = [json.loads(data) for _, data in sorted(self._level_rows.items())]
+        if self.get_meta("styles_saved"):
+            styles = {key: json.loads(value) for key, value in self._style_rows.items()}
+        return levels, styles
+
+    def save_app_config(self, levels, styles):
+        """与上次保存的内容比较，只写入新增、修改或删除的等级和样式项"""
+        if self._level_rows is None:
+            self.load_app_config()
+        with self.batch():
+            if levels is not None:
+                self._save_levels(levels)
+            if styles is not None:
+                self._save_styles(styles)
+
+    def _save_levels(self, levels):
+        rows = {position: _dump(level) for position, level in enumerate(levels)}
+        changed = [(position, data) for position, data in rows.items() if self._level_rows.get(position) != data]
+        self.cursor.executemany("INSERT OR REPLACE INTO levels (position, data) VALUES (?, ?)", changed)
+        self.cursor.execute("DELETE FROM levels WHERE position >= ?", (len(levels),))
+        self._level_rows = rows
+        if not self.get_meta("levels_saved"):
+            self.set_meta("levels_saved", 1)
+
+    def _save_styles(self, styles):
+        rows = {key: _dump(value) for key, value in styles.items()}
+        changed = [(key, value) for key, value in rows.items() if self._style_rows.get(key) != value]
+        removed = [(key,) for key in self._style_rows if key not in rows]
+        self.cursor.executemany("INSERT OR REPLACE INTO styles (key, value) VALUES (?, ?)", changed)
+        self.cursor.executemany("DELETE FROM styles WHERE key = ?", removed)
+        self._style_rows = rows
+        if not self.get_meta("styles_saved"):
+            self.set_meta("styles_saved", 1)
+
+    # --- 规则树与奖励树 ---
+    def load_tree(self, tree):
+        """返回嵌套列表 [{id, plan, reward_text, reward, children}]"""
+        self.cursor.execute("""
+            SELECT id, parent_id, plan, reward_text, reward FROM tree_items
+            WHERE tree = ? ORDER BY position, id
+        """, (tree,))
+        children = {}
+        for item_id, parent_id, plan, reward_text, reward in self.cursor.fetchall():
+            item = {"id": item_id, "plan": plan, "reward_text": reward_text, "reward": reward, "children": []}
+            children.setdefault(parent_id, []).append(item)
+        for siblings in children.values():
+            for item in siblings:
+                item["children"] = children.get(item["id"], [])
+        return children.get(None, [])
+
+    def add_tree_item(self, tree, parent_id, plan, reward_text="", reward=""):
+        """在 parent_id（None 为顶层）的子项末尾添加一项，返回它的 id"""
+        self.cursor.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM tree_items WHERE tree = ? AND parent_id IS ?",
+            (tree, parent_id))
+        position = self.cursor.fetchone()[0]
+        self.cursor.execute("""
+            INSERT INTO tree_items (tree, parent_id, position, plan, reward_text, reward)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (tree, parent_id, position, plan or "", reward_text or "", str(reward or "")))
+        self._commit()
+        return self.cursor.lastrowid
+
+    def add_tree_items(self, tree, items, parent_id=None):
+        """在一个事务中添加嵌套列表 [{plan, reward_text, reward, children}]"""
+        with self.batch():
+            for item in items:
+                item_id = self.add_tree_item(tree, parent_id, item.get("plan", ""),
+                                             item.get("reward_text", ""), item.get("reward", ""))
+                self.add_tree_items(tree, item.get("children", []), item_id)
+
+    def update_tree_item(self, item_id, plan, reward_text, reward):
+        self.cursor.execute("UPDATE tree_items SET plan = ?, reward_text = ?, reward = ? WHERE id = ?",
+                            (plan or "", reward_text or "", str(reward or ""), item_id))
+        self._commit()
+
+    def delete_tree_item(self, item_id):
+        """删除一项及其所有子项"""
+        self.cursor.execute("DELETE FROM tree_items WHERE id = ?", (item_id,))
+        self._commit()
+
+    def clear_tree(self, tree):
+        self.cursor.execute("DELETE FROM tree_items WHERE tree = ?", (tree,))
+        self._commit()
+
+    # --- 旧数据迁移 ---
+    def _read_legacy(self, file_name):
+        """读取旧 JSON 文件；不存在时返回 None，损坏时记入 migration_errors"""
+        if not os.path.exists(file_name):
+            return None
+        try:
+            with open(file_name, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            self.migration_errors.append(file_name)
+            return None
+
+    def migrate_legacy_files(self):
+        """第一次打开数据库时导入旧版本的 JSON 文件，之后不再读取"""
+        if self.get_meta("legacy_migrated"):
+            return
+        with self.batch():
+            data = self._read_legacy(LEGACY_CONFIG_FILE)
+            levels, styles = (data, None) if isinstance(data, list) else (
+                (data.get("levels"), data.get("styles")) if isinstance(data, dict) else (None, None))
+            skipped = 0
+            if levels is not None:
+                if isinstance(levels, list):
+                    skipped += sum(1 for level in levels if not isinstance(level, dict))
+                    levels = [level for level in levels if isinstance(level, dict)]
+                else:
+                    skipped, levels = skipped + 1, None
+            if styles is not None and not isinstance(styles, dict):
+                skipped, styles = skipped + 1, None
+            self._warn_skipped(LEGACY_CONFIG_FILE, skipped)
+            if levels is not None or styles is not None:
+                self.save_app_config(levels, styles)
+
+            data = self._read_legacy(LEGACY_WEALTH_LOG_FILE)
+            if isinstance(data, list):
+                entries = [entry for entry in data if self._is_valid_legacy_log_entry(entry)]
+                self._warn_skipped(LEGACY_WEALTH_LOG_FILE, len(data) - len(entries))
+                self.add_log_entries(entries)
+
+            data = self._read_legacy(LEGACY_RULES_FILE)
+            if isinstance(data, dict):
+                skipped = 0
+                for key, tree in (("normal", TREE_RULES_NORMAL), ("special", TREE_RULES_SPECIAL)):
+                    items, count = self._legacy_tree_items(data.get(key, []), self._legacy_rule_item)
+                    self.add_tree_items(tree, items)
+                    skipped += count
+                self._warn_skipped(LEGACY_RULES_FILE, skipped)
+            if data is not None or LEGACY_RULES_FILE in self.migration_errors:
+                # 旧规则文件存在时不再生成默认规则
+                self.set_meta("rules_initialized", 1)
+
+            data = self._read_legacy(LEGACY_REWARDS_FILE)
+            if isinstance(data, dict):
+                skipped = 0
+                for key, tree in (("daily", TREE_REWARDS_DAILY), ("current", TREE_REWARDS_CURRENT)):
+                    items, count = self._legacy_tree_items(data.get(key, []), self._legacy_reward_item)
+                    self.add_tree_items(tree, items)
+                    skipped += count
+                self._warn_skipped(LEGACY_REWARDS_FILE, skipped)
+
+            self.set_meta("legacy_migrated", 1)
+
+    def _warn_skipped(self, file_name, count):
+        if count:
+            self.migration_warnings.append(f"{file_name}：{count} 条记录无法识别，已跳过")
+
+    @staticmethod
+    def _is_valid_legacy_log_entry(entry):
+        """旧日志中的一条记录能否导入（财富值必须是整数）"""
+        if not isinstance(entry, dict):
+            return False
+        try:
+            int(entry.get("wealth", 0))
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    def _legacy_tree_items(self, items, convert):
+        """
+        把旧文件中的嵌套列表转换为 add_tree_items 的格式，返回 (条目列表, 跳过的条数)。
+        不是字典的条目（连同无法识别的 children）会被跳过，不会中断整个迁移。
+        """
+        if not isinstance(items, list):
+            return [], 1 if items else 0
+        converted, skipped = [], 0
+        for item in items:
+            if not isinstance(item, dict):
+                skipped += 1
+                continue
+            children, count = self._legacy_tree_items(item.get("children", []), convert)
+            converted.append(dict(convert(item), children=children))
+            skipped += count
+        return converted, skipped
+
+    @staticmethod
+    def _legacy_rule_item(item):
+        return {"plan": _legacy_text(item.get("plan")), "reward_text": _legacy_text(item.get("reward_text")),
+                "reward": _legacy_text(item.get("reward"))}
+
+    @staticmethod
+    def _legacy_reward_item(item):
+        # 奖励树的"对应奖励"是文字，保存在 reward_text 列
+        return {"plan": _legacy_text(item.get("plan")), "reward_text": _legacy_text(item.get("reward"))}
+
+    def close(self):
+        self.conn.close()
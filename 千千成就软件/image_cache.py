@@ -0,0 +1,121 @@
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QSize, pyqtSignal
+from PyQt6.QtGui import QPixmap
+
+from image_loader import ImageLoader, read_image_size
+
+# 缓存的图片总共最多占用的内存（按 宽 x 高 x 4 字节估算）
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+class ImageCache(QObject):
+    """
+    解码好的图片缓存，键为 (路径, 修改时间, 目标宽, 目标高, 旋转角度)。
+    没有缓存时交给 ImageLoader 在后台解码，完成后发出 image_ready；超过内存上限时淘汰最久未使用的。
+    文件的修改时间只在第一次用到时读取，之后由 QFileSystemWatcher 通知变化。
+    """
+    image_ready = pyqtSignal(str)
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, loader=None, parent=None):
+        super().__init__(parent)
+        self.budget_bytes = budget_bytes
+        self._pixmaps = OrderedDict()  # 键 -> QPixmap，按最近使用排序
+        self._bytes = 0
+        self._failed = set()  # 解码失败的键，避免反复重试
+        self._pending = {}  # 请求编号 -> 键
+        self._pending_keys = set()
+        self._mtimes = {}  # 路径 -> 修改时间
+        self._sizes = {}  # (路径, 修改时间) -> 原图尺寸
+
+        self.loader = loader if loader is not None else ImageLoader(self)
+        self.loader.image_loaded.connect(self._on_decoded)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.invalidate)
+
+    def _mtime(self, path):
+        """文件的修改时间；文件不存在时返回 None（不缓存，下次重新检查）"""
+        mtime = self._mtimes.get(path)
+        if mtime is not None:
+            return mtime
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        self._mtimes[path] = mtime
+        if path not in self._watcher.files():
+            self._watcher.addPath(path)
+        return mtime
+
+    def file_exists(self, path):
+        return bool(path) and self._mtime(path) is not None
+
+    def image_size(self, path):
+        """原图尺寸（只读文件头，结果会缓存）；文件不存在或无法识别时返回无效的 QSize"""
+        mtime = self._mtime(path) if path else None
+        if mtime is None:
+            return QSize()
+        size = self._sizes.get((path, mtime))
+        if size is None:
+            size = self._sizes[(path, mtime)] = read_image_size(path)
+        return size
+
+    def pixmap(self, path, size=None, rotation=0):
+        """
+        取得图片，size 不为空时等比缩放到刚好放进该尺寸。
+        已缓存时直接返回；正在后台解码时返回 None（完成后发出 image_ready）；文件不存在或无法解码时返回空 QPixmap。
+        """
+        mtime = self._mtime(path) if path else None
+        if mtime is None:
+            return QPixmap()
+        width, height = (size.width(), size.height()) if size is not None else (0, 0)
+        key = (path, mtime, width, height, rotation % 360)
+
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        if key in self._failed:
+            return QPixmap()
+        if key not in self._pending_keys:
+            self._pending_keys.add(key)
+            request_id = self.loader.load(path, size, rotation)
+            self._pending[request_id] = key
+        return None
+
+    def _on_decoded(self, request_id, image):
+        key = self._pending.pop(request_id, None)
+        if key is None:
+            return  # 其它使用同一个 loader 的请求
+        self._pending_keys.discard(key)
+        path, mtime = key[0], key[1]
+        if self._mtimes.get(path) != mtime:
+            return  # 解码期间文件已经变化，结果作废
+        if image.isNull():
+            self._failed.add(key)
+        else:
+            pixmap = QPixmap.fromImage(image)
+            self._pixmaps[key] = pixmap
+            self._bytes += self._cost(pixmap)
+            self._evict()
+        self.image_ready.emit(path)
+
+    @staticmethod
+    def _cost(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+    def _evict(self):
+        # 最后一个是刚解码、马上要用的，不淘汰
+        while self._bytes > self.budget_bytes and len(self._pixmaps) > 1:
+            _key, pixmap = self._pixmaps.popitem(last=False)
+            self._bytes -= self._cost(pixmap)
+
+    def invalidate(self, path):
+        """文件被修改或删除后，丢弃它的所有缓存并通知界面重新取图"""
+        self._mtimes.pop(path, None)
+        for key in [key for key in self._pixmaps if key[0] == path]:
+            self._bytes -= self._cost(self._pixmaps.pop(key))
+        self._failed = {key for key in self._failed if key[0] != path}
+        self._sizes = {key: size for key, size in self._sizes.items() if key[0] != path}
+        self.image_ready.emit(path)
@@ -0,0 +1,64 @@
+from itertools import count
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QTransform
+
+# 同时解码的图片数量，留出 CPU 给界面线程
+MAX_DECODE_THREADS = 2
+
+
+def read_image_size(path):
+    """只读取文件头得到原图尺寸，不解码像素；无法识别时返回无效的 QSize"""
+    return QImageReader(path).size()
+
+
+class _LoadSignals(QObject):
+    finished = pyqtSignal(int, QImage)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, request_id, path, size, rotation, signals):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.size = size
+        self.rotation = rotation
+        self.signals = signals
+
+    def run(self):
+        reader = QImageReader(self.path)
+        if self.size is not None and reader.size().isValid():
+            # 解码时直接缩放（JPEG 等格式缩小时可以跳过大部分像素），只得到需要的分辨率
+            scaled = reader.size().scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio)
+            if scaled != reader.size():
+                reader.setScaledSize(scaled)
+        image = reader.read()
+        if not image.isNull() and self.rotation % 360:
+            image = image.transformed(QTransform().rotate(self.rotation), Qt.TransformationMode.SmoothTransformation)
+        self.signals.finished.emit(self.request_id, image)
+
+
+class ImageLoader(QObject):
+    """
+    后台图片解码：load() 立即返回请求编号，解码完成后通过 image_loaded(编号, QImage) 返回结果，
+    失败时 QImage 为空。只在子线程中使用 QImage，QPixmap 由接收方在界面线程中创建。
+    """
+    image_loaded = pyqtSignal(int, QImage)
+
+    def __init__(self, parent=None, max_threads=MAX_DECODE_THREADS):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._ids = count(1)
+        self._signals = _LoadSignals(self)
+        self._signals.finished.connect(self.image_loaded)
+
+    def load(self, path, size=None, rotation=0):
+        """
+        :param size: 不为空时等比缩放到刚好放进该尺寸
+        :param rotation: 解码后顺时针旋转的角度
+        """
+        request_id = next(self._ids)
+        self._pool.start(_LoadTask(request_id, path, QSize(size) if size is not None else None,
+                                   rotation, self._signals))
+        return request_id
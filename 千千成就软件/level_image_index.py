@@ -0,0 +1,83 @@
+import os
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+LEVEL_IMAGE_EXTENSIONS = ('.jpg', '.png')  # 同一等级两种都有时优先使用前面的
+# 文件夹变化后等待多久再重新扫描（复制大量图片时会连续触发很多次）
+RESCAN_DELAY_MS = 300
+
+
+class LevelImageIndex(QObject):
+    """
+    等级图片文件夹的索引：等级编号（文件名，如 "3"）-> 图片路径。
+    只在切换文件夹和文件夹内容变化时扫描一次目录，刷新界面时直接查字典。
+    文件夹不存在时改为监视它的上级目录，文件夹之后被创建（或删除后重建）时也能自动加载。
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.folder = None
+        self.paths = {}
+        self.conflicts = []  # 同时存在 .jpg 和 .png 的等级编号，按数字排序
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_rescan)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self.rescan)
+
+    def set_folder(self, folder):
+        """切换到新的文件夹；与当前相同时什么也不做"""
+        if folder == self.folder:
+            return
+        self.folder = folder
+        self.rescan()
+
+    def _schedule_rescan(self, _path=None):
+        self._rescan_timer.start()
+
+    def _update_watch(self):
+        """文件夹存在时监视它本身，不存在时监视上级目录等它出现"""
+        watched = []
+        if self.folder:
+            if os.path.isdir(self.folder):
+                watched.append(self.folder)
+            else:
+                parent = os.path.dirname(os.path.abspath(self.folder))
+                if os.path.isdir(parent):
+                    watched.append(parent)
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        if watched:
+            self._watcher.addPaths(watched)
+
+    def rescan(self):
+        self._update_watch()
+        found = {}  # 编号 -> {扩展名: 文件名}
+        if self.folder and os.path.isdir(self.folder):
+            try:
+                with os.scandir(self.folder) as it:
+                    for entry in it:
+                        name, ext = os.path.splitext(entry.name)
+                        ext_lower = ext.lower()
+                        if ext_lower in LEVEL_IMAGE_EXTENSIONS and name.isdigit() and entry.is_file():
+                            found.setdefault(name, {})[ext_lower] = entry.name
+            except OSError:
+                found = {}
+
+        paths = {}
+        for name, files in found.items():
+            file_name = next(files[ext] for ext in LEVEL_IMAGE_EXTENSIONS if ext in files)
+            paths[name] = os.path.join(self.folder, file_name)
+        conflicts = sorted((name for name, files in found.items() if len(files) > 1), key=int)
+
+        if paths != self.paths or conflicts != self.conflicts:
+            self.paths = paths
+            self.conflicts = conflicts
+            self.changed.emit()
+
+    def path_for(self, level_num):
+        """等级对应的图片路径，没有图片时返回 None"""
+        return self.paths.get(str(level_num))
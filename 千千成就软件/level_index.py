@@ -0,0 +1,39 @@
+from bisect import bisect_right
+
+
+class LevelIndex:
+    """
+    等级查询索引：等级配置变化时排序一次，保存升序的门槛数组，
+    之后按财富值查等级只需一次二分查找。主界面和日志页共用同一个实例。
+    """
+
+    def __init__(self, level_config=()):
+        self.levels = []
+        self.thresholds = []
+        self.rebuild(level_config)
+
+    def rebuild(self, level_config):
+        # sorted 是稳定排序，门槛相同的等级保持配置中的先后顺序，与逐个比较的结果一致
+        self.levels = sorted(level_config, key=lambda x: x.get('wealth_threshold', 0))
+        self.thresholds = [level.get('wealth_threshold', 0) for level in self.levels]
+
+    def index_for(self, wealth):
+        """已达到的最高等级在 levels 中的下标，一个都没达到时为 -1"""
+        return bisect_right(self.thresholds, wealth) - 1
+
+    def level_for(self, wealth):
+        index = self.index_for(wealth)
+        return self.levels[index] if index >= 0 else None
+
+    def lookup(self, wealth):
+        """返回 (当前等级, 下一等级, 当前等级下标)，不存在的为 None / -1"""
+        index = self.index_for(wealth)
+        current_level_data = self.levels[index] if index >= 0 else None
+        next_level_data = self.levels[index + 1] if index + 1 < len(self.levels) else None
+        return current_level_data, next_level_data, index
+
+    def level_name_for(self, wealth):
+        level_data = self.level_for(wealth)
+        if level_data:
+            return level_data.get("level_name", f"等级 {level_data['level']}")
+        return "未定级"
@@ -1,6 +1,5 @@
 import sys
 import os
-import json
 import logging
 import traceback
 from datetime import datetime
@@ -19,15 +18,21 @@ from style_settings_dialog import StyleSettingsDialog
 from qianqian_rewards_tab import RewardsTab
 from wealth_rules_tab import WealthRulesTab
 from about_tab import AboutTab
+from level_index import LevelIndex
+from achievement_db import AchievementDatabase
+from image_cache import ImageCache
+from level_image_index import LevelImageIndex
+from refresh_scheduler import RefreshScheduler
 
 # --- 全局配置 ---
 APP_TITLE = "千千成就软件"
 WINDOW_WIDTH = 900
 WINDOW_HEIGHT = 750
-CONFIG_FILE = "config.json"
-WEALTH_LOG_FILE = "wealth_log.json"
 ERROR_LOG_FILE = "app_errors.log"
 REWARDS_DIR = "rewards"
+# 主界面可以分别刷新的部分
+REFRESH_MAIN_TAB = "main_tab"
+REFRESH_REWARD_IMAGE = "reward_image"
 
 
 # --- 日志记录设置 ---
@@ -218,62 +223,123 @@ class ClickableLabel(QLabel):
 
 
 class CroppedPreviewLabel(ClickableLabel):
+    # 显示区域变大后，当前解码的分辨率已经不够用
+    resolution_needed = pyqtSignal()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.pixmap_to_draw = None
         self.image_settings = {}
+        self.source_size = QSize()
+        # 合成好的最终画面，只有图片设置或显示区域变化时才重新生成
+        self._rendered = None
+        self._rendered_key = None
 
-    def set_view(self, pixmap, settings):
+    def set_view(self, pixmap, settings, source_size=None):
         self.pixmap_to_draw = pixmap
         self.image_settings = settings
+        # 图片可能是缩小解码的，设置中的坐标仍以原图尺寸为准
+        self.source_size = source_size if source_size is not None and source_size.isValid() else pixmap.size()
         self.update()
 
     def clear_view(self):
         self.pixmap_to_draw = None
         self.image_settings = {}
+        self.source_size = QSize()
+        self._rendered = None
+        self._rendered_key = None
         self.setPixmap(QPixmap())
         self.update()
 
-    def paintEvent(self, event):
-        if not self.pixmap_to_draw or self.pixmap_to_draw.isNull():
-            super().paintEvent(event)
-            return
+    @staticmethod
+    def _is_default(settings, source_w, source_h):
+        return (
+                abs(settings.get("zoom", 1.0) - 1.0) < 1e-6 and
+                settings.get("rotation", 0) % 360 == 0 and
+                abs(settings.get("pos_x", source_w / 2) - source_w / 2) < 1e-6 and
+                abs(settings.get("pos_y", source_h / 2) - source_h / 2) < 1e-6
+        )
 
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-        view_rect = self.contentsRect()
+    @classmethod
+    def decode_scale(cls, source_size, settings, view_size):
+        """
+        解码时可以缩小到原图的几分之一（1、1/2、1/4、1/8）而不影响显示效果。
+        按档位取值，窗口大小稍有变化时不必重新解码。
+        """
+        if not source_size.isValid() or view_size.isEmpty():
+            return 1.0
+        if cls._is_default(settings, source_size.width(), source_size.height()):
+            rotated = QTransform().rotate(settings.get("rotation", 0)).mapRect(QRectF(0, 0, source_size.width(),
+                                                                                     source_size.height()))
+            needed = max(view_size.width() / rotated.width(), view_size.height() / rotated.height())
+        else:
+            needed = settings.get("zoom", 1.0)
+        scale = 1.0
+        while scale > 1 / 8 and scale / 2 >= needed:
+            scale /= 2
+        return scale
+
+    def _view_transform(self, view_size, zoom, rotation, center_x, center_y):
+        """解码图坐标 -> 显示区域坐标：换算到原图、旋转、缩放、平移合成一个变换，只需绘制一次"""
+        pixmap = self.pixmap_to_draw
+        source_w, source_h = self.source_size.width(), self.source_size.height()
+        to_source = QTransform.fromScale(source_w / pixmap.width(), source_h / pixmap.height())
+        # 与 QPixmap.transformed 相同：旋转后把外接矩形移到原点
+        rotate = QPixmap.trueMatrix(QTransform().rotate(rotation), source_w, source_h)
+        rotated_rect = rotate.mapRect(QRectF(0, 0, source_w, source_h))
+
+        if self._is_default(self.image_settings, source_w, source_h):
+            # 等比放大到铺满显示区域，然后居中裁剪
+            scale = max(view_size.width() / rotated_rect.width(), view_size.height() / rotated_rect.height())
+            offset_x = (rotated_rect.width() * scale - view_size.width()) / 2
+            offset_y = (rotated_rect.height() * scale - view_size.height()) / 2
+        else:
+            # 以 (center_x, center_y) 为中心、按 zoom 缩放
+            scale = zoom
+            offset_x = (center_x - view_size.width() / zoom / 2) * zoom
+            offset_y = (center_y - view_size.height() / zoom / 2) * zoom
+        return to_source * rotate * QTransform.fromScale(scale, scale) * QTransform.fromTranslate(-offset_x, -offset_y)
 
+    def _render(self, view_size):
         zoom = self.image_settings.get("zoom", 1.0)
         rotation = self.image_settings.get("rotation", 0)
-        center_x = self.image_settings.get("pos_x", self.pixmap_to_draw.width() / 2)
-        center_y = self.image_settings.get("pos_y", self.pixmap_to_draw.height() / 2)
-
-        is_default = (
-                abs(zoom - 1.0) < 1e-6 and
-                rotation % 360 == 0 and
-                abs(center_x - self.pixmap_to_draw.width() / 2) < 1e-6 and
-                abs(center_y - self.pixmap_to_draw.height() / 2) < 1e-6
-        )
+        center_x = self.image_settings.get("pos_x", self.source_size.width() / 2)
+        center_y = self.image_settings.get("pos_y", self.source_size.height() / 2)
 
-        transform = QTransform().rotate(rotation)
-        rotated_pixmap = self.pixmap_to_draw.transformed(transform, Qt.TransformationMode.SmoothTransformation)
+        key = (self.pixmap_to_draw.cacheKey(), self.source_size.width(), self.source_size.height(),
+               zoom, rotation, center_x, center_y, view_size.width(), view_size.height())
+        if key == self._rendered_key:
+            return self._rendered
 
-        if is_default:
-            scaled_pix = rotated_pixmap.scaled(view_rect.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                                               Qt.TransformationMode.SmoothTransformation)  # 修复
-            crop_x = (scaled_pix.width() - view_rect.width()) / 2
-            crop_y = (scaled_pix.height() - view_rect.height()) / 2
-            cropped_final = scaled_pix.copy(int(crop_x), int(crop_y), view_rect.width(), view_rect.height())
-            painter.drawPixmap(view_rect.topLeft(), cropped_final)
-        else:
-            src_view_w = view_rect.width() / zoom
-            src_view_h = view_rect.height() / zoom
-            src_top_left_x = center_x - (src_view_w / 2)
-            src_top_left_y = center_y - (src_view_h / 2)
+        rendered = QPixmap(view_size)
+        rendered.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(rendered)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.setTransform(self._view_transform(view_size, zoom, rotation, center_x, center_y))
+        painter.drawPixmap(0, 0, self.pixmap_to_draw)
+        painter.end()
 
-            source_rect = QRectF(src_top_left_x, src_top_left_y, src_view_w, src_view_h)
-            painter.drawPixmap(QRectF(view_rect), rotated_pixmap, source_rect)
+        self._rendered, self._rendered_key = rendered, key
+        return rendered
+
+    def paintEvent(self, event):
+        if not self.pixmap_to_draw or self.pixmap_to_draw.isNull():
+            super().paintEvent(event)
+            return
+
+        view_rect = self.contentsRect()
+        if view_rect.isEmpty():
+            return
+        painter = QPainter(self)
+        painter.drawPixmap(view_rect.topLeft(), self._render(view_rect.size()))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.pixmap_to_draw and not self.pixmap_to_draw.isNull():
+            scale = self.decode_scale(self.source_size, self.image_settings, self.contentsRect().size())
+            if self.pixmap_to_draw.width() < int(self.source_size.width() * scale):
+                self.resolution_needed.emit()
 
 
 class MainWindow(QMainWindow):
@@ -289,8 +355,20 @@ class MainWindow(QMainWindow):
 
         self.style_config = {}
         self.level_config_data = []
+        # 日志、等级、样式、规则和奖励都保存在同一个数据库中，首次打开时自动导入旧的 JSON 文件
+        self.db = AchievementDatabase()
+        # 等级图标和奖励图片的缓存，后台解码完成后再刷新一次主界面
+        self.image_cache = ImageCache(parent=self)
+        # 等级图片文件夹的索引，文件夹内容变化时自动更新
+        self.level_images = LevelImageIndex(self)
+        # 各标签页共用的等级索引，等级配置变化时重建
+        self.level_index = LevelIndex()
         self.current_reward_level_data = None
-        self._is_refreshing = False
+        self._shown_reward_image = None  # 侧边栏当前显示的图片路径
+        # 主界面分为两部分刷新，多个信号同时触发时在下一轮事件循环里只刷新一次
+        self.refresh_scheduler = RefreshScheduler(self)
+        self.refresh_scheduler.register(REFRESH_MAIN_TAB, self.update_main_tab_display)
+        self.refresh_scheduler.register(REFRESH_REWARD_IMAGE, self.update_reward_image_display)
 
         self.setStyleSheet(STYLESHEET)
         self.init_ui()
@@ -300,7 +378,7 @@ class MainWindow(QMainWindow):
         self.scan_for_image_conflicts()
 
         self.settings_tab.load_from_data(self.level_config_data)
-        self.wealth_log_tab.update_level_config(self.level_config_data)
+        self.update_level_index()
 
         self.apply_all_settings()
 
@@ -322,11 +400,11 @@ class MainWindow(QMainWindow):
         self.main_layout.setSpacing(0)
 
         self.tabs = QTabWidget()
-        self.main_tab = MainTab()
+        self.main_tab = MainTab(image_cache=self.image_cache, level_images=self.level_images)
         self.settings_tab = SettingsTab()
-        self.wealth_log_tab = WealthLogTab()
-        self.rewards_tab = RewardsTab()
-        self.wealth_rules_tab = WealthRulesTab()
+        self.wealth_log_tab = WealthLogTab(db=self.db, level_index=self.level_index)
+        self.rewards_tab = RewardsTab(db=self.db)
+        self.wealth_rules_tab = WealthRulesTab(db=self.db)
         self.about_tab = AboutTab()
         self.tabs.addTab(self.main_tab, "🏆 主界面")
         self.tabs.addTab(self.settings_tab, "🚀 等级设置")
@@ -380,7 +458,8 @@ class MainWindow(QMainWindow):
         if not image_settings or not image_settings.get("path") or not os.path.exists(image_settings.get("path")):
             return
 
-        dialog = ImagePreviewDialog(image_settings, self, initial_size=self.reward_image_display.size())
+        dialog = ImagePreviewDialog(image_settings, self, initial_size=self.reward_image_display.size(),
+                                    loader=self.image_cache.loader)
         if dialog.exec():
             new_settings = dialog.get_settings()
             self.current_reward_level_data["reward_image"] = new_settings
@@ -392,30 +471,15 @@ class MainWindow(QMainWindow):
 
             self.save_app_config()
             self.settings_tab.load_from_data(self.level_config_data)
+            self.update_level_index()
             self.refresh_main_display()
 
     def scan_for_image_conflicts(self):
-        folder = self.style_config.get("level_image_folder", "level")
-        if not os.path.isdir(folder):
-            return
-
-        files = os.listdir(folder)
-        conflicts = set()
-        stems = {}
-        for f in files:
-            name, ext = os.path.splitext(f)
-            ext_lower = ext.lower()
-            if ext_lower in ['.jpg', '.png'] and name.isdigit():
-                if name in stems:
-                    if stems[name] != ext_lower:
-                        conflicts.add(name)
-                else:
-                    stems[name] = ext_lower
-
-        if conflicts:
-            sorted_conflicts = sorted(list(conflicts), key=int)
+        """切换到设置中的等级图片文件夹（扫描一次并开始监视），并提示冲突的图片"""
+        self.level_images.set_folder(self.style_config.get("level_image_folder", "level"))
+        if self.level_images.conflicts:
             message = "发现以下等级同时存在 .jpg 和 .png 图片：\n\n"
-            message += ", ".join(sorted_conflicts)
+            message += ", ".join(self.level_images.conflicts)
             message += "\n\n程序将优先使用 .jpg 图片。"
             QMessageBox.information(self, "图片冲突提示", message)
 
@@ -448,52 +512,44 @@ class MainWindow(QMainWindow):
             {"level": 3, "level_name": "崭露头角", "wealth_threshold": 10000, "reward_text": "奖励【铜质徽章】一枚",
              "reward_image": {"path": ""}},
         ]
-        if not os.path.exists(CONFIG_FILE):
-            self.level_config_data = default_levels
-            self.style_config = default_styles
-            self.save_app_config()
-            return
+        if self.db.migration_errors:
+            QMessageBox.warning(self, "加载错误", "以下旧数据文件已损坏，未能导入，将使用默认数据：\n"
+                                + "\n".join(self.db.migration_errors))
+        if self.db.migration_warnings:
+            QMessageBox.warning(self, "加载提示", "导入旧数据时跳过了部分内容：\n"
+                                + "\n".join(self.db.migration_warnings))
+
+        levels, styles = self.db.load_app_config()
+        self.level_config_data = levels if levels is not None else default_levels
+        self.style_config = styles if styles is not None else default_styles
+
+        # 迁移旧的 "planText" 配置
+        if "planText" in self.style_config:
+            if "planTitle" not in self.style_config:
+                self.style_config["planTitle"] = self.style_config["planText"]
+            if "planContent" not in self.style_config:
+                self.style_config["planContent"] = self.style_config["planText"]
+            del self.style_config["planText"]
+
+        for level in self.level_config_data:
+            reward_image = level.get("reward_image")
+            if isinstance(reward_image, str):
+                level["reward_image"] = {"path": reward_image, "zoom": 1.0, "rotation": 0, "pos_x": 0, "pos_y": 0}
+            elif not isinstance(reward_image, dict):
+                level["reward_image"] = {"path": "", "zoom": 1.0, "rotation": 0, "pos_x": 0, "pos_y": 0}
+
+        for key, value in default_styles.items():
+            if key not in self.style_config: self.style_config[key] = value
 
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if isinstance(data, list):
-                self.level_config_data = data
-                self.style_config = default_styles
-            elif isinstance(data, dict):
-                self.level_config_data = data.get("levels", default_levels)
-                self.style_config = data.get("styles", default_styles)
-
-            # 迁移旧的 "planText" 配置
-            if "planText" in self.style_config:
-                if "planTitle" not in self.style_config:
-                    self.style_config["planTitle"] = self.style_config["planText"]
-                if "planContent" not in self.style_config:
-                    self.style_config["planContent"] = self.style_config["planText"]
-                del self.style_config["planText"]
-
-            for level in self.level_config_data:
-                reward_image = level.get("reward_image")
-                if isinstance(reward_image, str):
-                    level["reward_image"] = {"path": reward_image, "zoom": 1.0, "rotation": 0, "pos_x": 0, "pos_y": 0}
-                elif not isinstance(reward_image, dict):
-                    level["reward_image"] = {"path": "", "zoom": 1.0, "rotation": 0, "pos_x": 0, "pos_y": 0}
-
-            for key, value in default_styles.items():
-                if key not in self.style_config: self.style_config[key] = value
-
-            self.save_app_config()
+        self.save_app_config()
 
-        except (json.JSONDecodeError, FileNotFoundError):
-            QMessageBox.warning(self, "加载错误", "配置文件损坏或不存在，将创建新的默认配置。")
-            self.level_config_data = default_levels;
-            self.style_config = default_styles;
-            self.save_app_config()
+    def update_level_index(self):
+        """等级配置变化后重建共用的等级索引"""
+        self.level_index.rebuild(self.settings_tab.config_data)
 
     def save_app_config(self):
-        combined_config = {"levels": self.level_config_data, "styles": self.style_config}
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f: json.dump(combined_config, f, ensure_ascii=False, indent=4)
+        # 数据库只写入有变化的等级和样式项
+        self.db.save_app_config(self.level_config_data, self.style_config)
 
     def apply_styles(self):
         ln_style = self.style_config.get("levelName")
@@ -552,11 +608,11 @@ class MainWindow(QMainWindow):
         if dialog.exec():
             self.style_config.update(dialog.get_settings())
             self.save_app_config()
-            self.apply_all_settings()
 
             new_folder = self.style_config.get("level_image_folder", "level")
             if old_folder != new_folder:
                 self.scan_for_image_conflicts()
+            self.apply_all_settings()
 
     def toggle_reward_panel(self):
         self.set_panel_visibility(not self.side_panel_container.isVisible())
@@ -568,8 +624,13 @@ class MainWindow(QMainWindow):
 
     def post_init_connect(self):
         self.wealth_log_tab.wealth_updated.connect(self.refresh_main_display)
+        self.image_cache.image_ready.connect(self.refresh_main_display)
+        self.level_images.changed.connect(lambda: self.refresh_scheduler.mark_dirty(REFRESH_MAIN_TAB))
+        self.reward_image_display.resolution_needed.connect(
+            lambda: self.refresh_scheduler.mark_dirty(REFRESH_REWARD_IMAGE))
         self.settings_tab.settings_button.clicked.connect(self.open_style_settings_dialog)
-        self.tabs.currentChanged.connect(self.refresh_main_display)
+        # 侧边栏图片只在主界面标签页显示
+        self.tabs.currentChanged.connect(lambda _: self.refresh_scheduler.mark_dirty(REFRESH_REWARD_IMAGE))
         self.main_tab.comparison_changed.connect(self.refresh_main_display)
         self.main_tab.countdown_date_changed.connect(self.on_countdown_date_changed)
         self.main_tab.countdown_visibility_changed.connect(self.on_countdown_visibility_changed)
@@ -578,7 +639,7 @@ class MainWindow(QMainWindow):
         def on_config_update():
             self.level_config_data = self.settings_tab.config_data
             self.save_app_config()
-            self.wealth_log_tab.update_level_config(self.level_config_data)
+            self.update_level_index()
             self.wealth_log_tab.refresh_table_and_emit_update()
 
         self.settings_tab.config_updated.connect(on_config_update)
@@ -589,39 +650,28 @@ class MainWindow(QMainWindow):
         if date_str_or_none is not None:
             self.style_config["show_countdown"] = True
         self.save_app_config()
-        self.refresh_main_display()
+        self.refresh_scheduler.mark_dirty(REFRESH_MAIN_TAB)
 
     def on_countdown_visibility_changed(self, visible):
         self.style_config["show_countdown"] = visible
         self.save_app_config()
-        self.refresh_main_display()
+        self.refresh_scheduler.mark_dirty(REFRESH_MAIN_TAB)
 
     def refresh_main_display(self, _=None):
-        if self._is_refreshing:
-            return
-        self._is_refreshing = True
+        """标记主界面全部需要刷新，实际刷新在下一轮事件循环中进行"""
+        self.refresh_scheduler.mark_dirty()
+
+    def update_main_tab_display(self):
+        total_wealth = self.wealth_log_tab.get_latest_wealth()
+        current_level_data, next_level_data, current_level_index = self.level_index.lookup(total_wealth)
+        self.main_tab.update_display(total_wealth, current_level_data, next_level_data, self.level_index.levels,
+                                     current_level_index, self.style_config, self.main_tab.comparison_level_data)
 
+    def update_reward_image_display(self):
         total_wealth = self.wealth_log_tab.get_latest_wealth()
-        level_config = self.settings_tab.config_data
-        sorted_config = sorted(level_config, key=lambda x: x.get('wealth_threshold', 0))
-        current_level_data, next_level_data = None, None
-        current_level_index = -1
-        for i, level in enumerate(sorted_config):
-            if total_wealth >= level['wealth_threshold']:
-                current_level_data = level;
-                current_level_index = i
-            else:
-                next_level_data = level;
-                break
-
-        comparison_level_data = self.main_tab.comparison_level_data
-        self.main_tab.update_display(total_wealth, current_level_data, next_level_data, sorted_config,
-                                     current_level_index, self.style_config, comparison_level_data)
-
-        self.update_external_reward_display(current_level_data, current_level_index, sorted_config,
-                                            comparison_level_data)
-
-        self._is_refreshing = False
+        current_level_data, _, current_level_index = self.level_index.lookup(total_wealth)
+        self.update_external_reward_display(current_level_data, current_level_index, self.level_index.levels,
+                                            self.main_tab.comparison_level_data)
 
     def update_external_reward_display(self, current_level_data, current_level_index, sorted_config,
                                        comparison_level_data=None):
@@ -638,13 +688,13 @@ class MainWindow(QMainWindow):
             elif img_mode == "next_available":
                 for i in range(current_level_index + 1, len(sorted_config)):
                     img_settings = sorted_config[i].get("reward_image", {})
-                    if img_settings.get("path") and os.path.exists(img_settings.get("path")):
+                    if self.image_cache.file_exists(img_settings.get("path")):
                         level_for_image = sorted_config[i];
                         break
 
         self.current_reward_level_data = level_for_image
         image_settings = level_for_image.get("reward_image") if level_for_image else None
-        has_image = bool(image_settings and image_settings.get("path") and os.path.exists(image_settings.get("path")))
+        has_image = bool(image_settings and self.image_cache.file_exists(image_settings.get("path")))
         should_show_elements = has_image and self.tabs.currentIndex() == 0
 
         self.toggle_button.setVisible(should_show_elements)
@@ -654,18 +704,36 @@ class MainWindow(QMainWindow):
             if auto_expand and not self.side_panel_container.isVisible():
                 self.set_panel_visibility(True)
 
+            self.side_panel_container.setFixedWidth(400)
             try:
-                pixmap = QPixmap(image_settings.get("path"))
-                if not pixmap.isNull():
-                    self.side_panel_container.setFixedWidth(400)
-                    self.reward_image_display.set_view(pixmap, image_settings)
+                # 只按侧边栏需要的分辨率解码，大照片不必整张解码
+                image_path = image_settings.get("path")
+                source_size = self.image_cache.image_size(image_path)
+                decode_size = None
+                if source_size.isValid():
+                    scale = self.reward_image_display.decode_scale(
+                        source_size, image_settings, self.reward_image_display.contentsRect().size())
+                    decode_size = QSize(max(1, int(source_size.width() * scale)),
+                                        max(1, int(source_size.height() * scale)))
+                pixmap = self.image_cache.pixmap(image_path, decode_size)
+                if pixmap is None:
+                    # 后台解码完成后会再次刷新；同一张图只是换分辨率时，先继续显示旧的
+                    if self._shown_reward_image != image_path:
+                        self._shown_reward_image = None
+                        self.reward_image_display.clear_view()
+                        self.reward_image_display.setText("图片加载中...")
+                elif not pixmap.isNull():
+                    self._shown_reward_image = image_path
+                    self.reward_image_display.set_view(pixmap, image_settings, source_size)
                 else:
                     raise ValueError("Loaded pixmap is null")
             except Exception as e:
                 logging.error(f"Error rendering image preview: {e}\n{traceback.format_exc()}")
+                self._shown_reward_image = None
                 self.reward_image_display.clear_view()
                 self.reward_image_display.setText("图片预览错误")
         else:
+            self._shown_reward_image = None
             self.reward_image_display.clear_view()
             self.reward_image_display.setText("没有图片")
             if self.side_panel_container.isVisible():
@@ -1,9 +1,11 @@
-import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDialog,
                              QMessageBox, QProgressBar, QFrame, QComboBox, QPushButton, QDateEdit, QScrollArea)
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt, pyqtSignal, QDate
 
+from image_cache import ImageCache
+from level_image_index import LevelImageIndex
+
 
 class ClickableLabel(QLabel):
     doubleClicked = pyqtSignal()
@@ -109,8 +111,12 @@ class MainTab(QWidget):
     countdown_date_changed = pyqtSignal(object)
     countdown_visibility_changed = pyqtSignal(bool)
 
-    def __init__(self, parent=None):
+    def __init__(self, image_cache=None, level_images=None, parent=None):
         super().__init__(parent)
+        # 由主窗口传入共用的图片缓存，图片解码完成后主窗口会再次刷新显示
+        self.image_cache = image_cache if image_cache is not None else ImageCache(parent=self)
+        # 等级图片文件夹的索引，由主窗口按设置切换文件夹
+        self.level_images = level_images if level_images is not None else LevelImageIndex(self)
         self.comparison_level_data = None
         self.level_config = []
         self.current_wealth = 0
@@ -280,7 +286,6 @@ class MainTab(QWidget):
             return
 
         term = self.style_config.get("term_display_mode", "财富")
-        level_image_folder = self.style_config.get("level_image_folder", "level")
         target_level = self.comparison_level_data
         target_name = target_level.get("level_name")
         target_wealth = target_level.get("wealth_threshold", 0)
@@ -288,16 +293,7 @@ class MainTab(QWidget):
 
         self.comp_name_label.setText(f"对比目标: {target_name}")
 
-        icon_path_jpg = os.path.join(level_image_folder, f"{target_num}.jpg")
-        icon_path_png = os.path.join(level_image_folder, f"{target_num}.png")
-        icon_path = icon_path_jpg if os.path.exists(icon_path_jpg) else (
-            icon_path_png if os.path.exists(icon_path_png) else None)
-        if icon_path:
-            self.comp_icon_label.setPixmap(
-                QPixmap(icon_path).scaled(self.comp_icon_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                                          Qt.TransformationMode.SmoothTransformation))
-        else:
-            self.comp_icon_label.setText("无图")
+        self.set_icon(self.comp_icon_label, self.level_images.path_for(target_num), "无图")
 
         progress_mode = self.style_config.get("progress_bar_mode", "percentage")
         self.comp_progress_bar.setFormat(f"%p%")
@@ -320,6 +316,16 @@ class MainTab(QWidget):
 
         self.comparison_card.setVisible(True)
 
+    def set_icon(self, label, icon_path, missing_text):
+        """显示缩放到标签大小的等级图标；图标还在后台解码时先清空"""
+        pixmap = self.image_cache.pixmap(icon_path, label.size()) if icon_path else QPixmap()
+        if pixmap is None:
+            label.clear()
+        elif pixmap.isNull():
+            label.setText(missing_text)
+        else:
+            label.setPixmap(pixmap)
+
     def update_display(self, total_wealth, current_level_data, next_level_data, sorted_config, current_level_index,
                        style_config, comparison_level_data=None):
         self.level_config = sorted_config
@@ -331,7 +337,6 @@ class MainTab(QWidget):
 
         self.update_comparison_display()
 
-        level_image_folder = self.style_config.get("level_image_folder", "level")
         progress_mode = self.style_config.get("progress_bar_mode", "percentage")
         self.progress_bar.setFormat(f"%p%")
 
@@ -340,17 +345,7 @@ class MainTab(QWidget):
             self.level_name_label.setText(current_level_data.get("level_name", f"等级 {current_level_data['level']}"))
             level_num = current_level_data['level']
 
-            icon_path_jpg = os.path.join(level_image_folder, f"{level_num}.jpg");
-            icon_path_png = os.path.join(level_image_folder, f"{level_num}.png")
-            icon_path = icon_path_jpg if os.path.exists(icon_path_jpg) else (
-                icon_path_png if os.path.exists(icon_path_png) else None)
-
-            if icon_path:
-                self.level_icon_label.setPixmap(
-                    QPixmap(icon_path).scaled(self.level_icon_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                                              Qt.TransformationMode.SmoothTransformation))
-            else:
-                self.level_icon_label.setText("无图")
+            self.set_icon(self.level_icon_label, self.level_images.path_for(level_num), "无图")
             if next_level_data:
                 prev_threshold = sorted_config[current_level_index]['wealth_threshold']
                 next_threshold = next_level_data['wealth_threshold']
@@ -372,17 +367,7 @@ class MainTab(QWidget):
         else:
             self.level_name_label.setText("未定级");
 
-            icon_path_jpg = os.path.join(level_image_folder, "0.jpg")
-            icon_path_png = os.path.join(level_image_folder, "0.png")
-            icon_path = icon_path_jpg if os.path.exists(icon_path_jpg) else (
-                icon_path_png if os.path.exists(icon_path_png) else None)
-
-            if icon_path:
-                self.level_icon_label.setPixmap(
-                    QPixmap(icon_path).scaled(self.level_icon_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                                              Qt.TransformationMode.SmoothTransformation))
-            else:
-                self.level_icon_label.setText("?")
+            self.set_icon(self.level_icon_label, self.level_images.path_for(0), "?")
 
             if sorted_config:
                 first_level_wealth = sorted_config[0]['wealth_threshold']
@@ -1,14 +1,5 @@
-import os
-import json
 import re
 
-# 此功能需要 openpyxl 库，请通过命令 "pip install openpyxl" 来安装
-try:
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    openpyxl = None
-
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
                              QTreeWidget, QTreeWidgetItem, QAbstractItemView, QHeaderView,
                              QGroupBox, QInputDialog, QMessageBox, QMenu, QFileDialog, QLineEdit,
@@ -16,7 +7,11 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 
-REWARDS_FILE = "qianqian_rewards.json"
+from achievement_db import AchievementDatabase, TREE_REWARDS_DAILY, TREE_REWARDS_CURRENT
+from tree_excel_io import openpyxl, split_indent, TreeExcelImport, TreeExcelExport
+
+# 条目在数据库中的 id 保存在第 0 列的这个角色里
+ITEM_ID_ROLE = Qt.ItemDataRole.UserRole
 
 
 class LargeEditorDelegate(QStyledItemDelegate):
@@ -36,10 +31,12 @@ class LargeEditorDelegate(QStyledItemDelegate):
 class RewardsTab(QWidget):
     rewards_updated = pyqtSignal(dict)
 
-    def __init__(self, parent=None):
+    def __init__(self, db=None, parent=None):
         super().__init__(parent)
+        self.db = db if db is not None else AchievementDatabase()
         self.daily_plan_tree = None
         self.current_plan_tree = None
+        self.excel_job = None  # 正在进行的 Excel 导入或导出
         self.init_ui()
 
     def init_ui(self):
@@ -150,7 +147,8 @@ class RewardsTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             (item_to_remove.parent() or tree.invisibleRootItem()).removeChild(item_to_remove)
-            self.save_data()
+            self.db.delete_tree_item(item_to_remove.data(0, ITEM_ID_ROLE))
+            self.notify_updated()
 
     def add_item(self, tree, as_child=False, parent_override=None):
         parent = tree.invisibleRootItem()
@@ -182,12 +180,17 @@ class RewardsTab(QWidget):
             if ok2 is not None:
                 new_item = QTreeWidgetItem(parent, [plan, reward])
                 new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
+                self.save_new_items(tree, [new_item])
                 if as_child:
                     parent.setExpanded(True)
-                self.save_data()
+                self.notify_updated()
 
     def handle_item_changed(self, item, column):
-        self.save_data()
+        item_id = item.data(0, ITEM_ID_ROLE)
+        if item_id is None:
+            return
+        self.db.update_tree_item(item_id, item.text(0), item.text(1), "")
+        self.notify_updated()
 
     def show_context_menu(self, position, tree):
         menu = QMenu()
@@ -230,7 +233,8 @@ class RewardsTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             tree.clear()
-            self.save_data()
+            self.db.clear_tree(self.tree_key(tree))
+            self.notify_updated()
 
     def expand_all_items(self, tree):
         tree.expandAll()
@@ -245,26 +249,32 @@ class RewardsTab(QWidget):
             "current": self.tree_to_dict(self.current_plan_tree)
         }
 
+    def tree_key(self, tree):
+        return TREE_REWARDS_DAILY if tree is self.daily_plan_tree else TREE_REWARDS_CURRENT
+
     def load_data(self):
-        data = {}
-        if not os.path.exists(REWARDS_FILE):
-            self.rewards_updated.emit(data)
-            return
+        self.dict_to_tree(self.db.load_tree(TREE_REWARDS_DAILY), self.daily_plan_tree)
+        self.dict_to_tree(self.db.load_tree(TREE_REWARDS_CURRENT), self.current_plan_tree)
+        self.notify_updated()
+
+    def notify_updated(self):
+        """数据已逐项写入数据库，这里只通知界面刷新"""
+        self.rewards_updated.emit(self.get_data())
+
+    def save_new_items(self, tree, items):
+        """把新建的条目（父项在前）在一个事务中写入数据库，并记下各自的 id"""
+        tree_key = self.tree_key(tree)
+        tree.blockSignals(True)
         try:
-            with open(REWARDS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.dict_to_tree(data.get("daily", []), self.daily_plan_tree)
-            self.dict_to_tree(data.get("current", []), self.current_plan_tree)
-        except (json.JSONDecodeError, FileNotFoundError):
-            data = {}
-            pass
-        self.rewards_updated.emit(data)
-
-    def save_data(self):
-        data = self.get_data()
-        with open(REWARDS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        self.rewards_updated.emit(data)
+            with self.db.batch():
+                for item in items:
+                    parent = item.parent()
+                    parent_id = parent.data(0, ITEM_ID_ROLE) if parent else None
+                    # "对应奖励"是文字，保存在 reward_text 列
+                    item_id = self.db.add_tree_item(tree_key, parent_id, item.text(0), item.text(1))
+                    item.setData(0, ITEM_ID_ROLE, item_id)
+        finally:
+            tree.blockSignals(False)
 
     def tree_to_dict(self, tree):
         def recurse(parent_item):
@@ -280,13 +290,16 @@ class RewardsTab(QWidget):
     def dict_to_tree(self, data, tree):
         def recurse(parent_item, children_data):
             for item_data in children_data:
-                child_item = QTreeWidgetItem(parent_item, [item_data["plan"], item_data["reward"]])
+                child_item = QTreeWidgetItem(parent_item, [item_data["plan"], item_data["reward_text"]])
                 child_item.setFlags(child_item.flags() | Qt.ItemFlag.ItemIsEditable)
+                child_item.setData(0, ITEM_ID_ROLE, item_data.get("id"))
                 recurse(child_item, item_data.get("children", []))
 
         if tree is None: return
+        tree.blockSignals(True)
         tree.clear()
         recurse(tree.invisibleRootItem(), data)
+        tree.blockSignals(False)
 
     def import_data(self):
         items = ["当天计划", "当前计划"]
@@ -313,7 +326,7 @@ class RewardsTab(QWidget):
                 lines = f.readlines()
 
             parent_item = tree.invisibleRootItem()
-            imported_count = 0
+            new_items = []
             time_pattern = re.compile(r"^\s*\d{2}:\d{2}\s*-\s*\d{2}:\d{2}\s+")
 
             for line in lines:
@@ -323,11 +336,12 @@ class RewardsTab(QWidget):
                     if plan_text:
                         new_item = QTreeWidgetItem(parent_item, [plan_text, ""])
                         new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
-                        imported_count += 1
+                        new_items.append(new_item)
 
-            if imported_count > 0:
-                self.save_data()
-                QMessageBox.information(self, "成功", f"成功从文本文件合并导入 {imported_count} 条计划到 {tree_name}。")
+            if new_items:
+                self.save_new_items(tree, new_items)
+                self.notify_updated()
+                QMessageBox.information(self, "成功", f"成功从文本文件合并导入 {len(new_items)} 条计划到 {tree_name}。")
             else:
                 QMessageBox.warning(self, "导入提示", "在文件中没有找到符合格式 '时间段 内容' 的有效数据行。")
 
@@ -338,51 +352,68 @@ class RewardsTab(QWidget):
         if not openpyxl:
             QMessageBox.critical(self, "缺少库", "导入功能需要 'openpyxl' 库。\n请通过命令 'pip install openpyxl' 安装。")
             return
-        try:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-
-            if sheet["A1"].value != "计划内容" or sheet["B1"].value != "对应奖励字":
-                QMessageBox.warning(self, "格式错误",
-                                    "导入的Excel文件格式不正确。\n第一行应为 '计划内容' 和 '对应奖励字'。")
-                return
-
-            # 不再清空 tree.clear()
-            parent_stack = [tree.invisibleRootItem()]
-
-            for row_index, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-                plan_text, reward_text = (str(row[0]) if row[0] is not None else ""), (
-                    str(row[1]) if row[1] is not None else "")
-                if not plan_text: continue
-
-                leading_spaces = len(plan_text) - len(plan_text.lstrip(' '))
-                level = leading_spaces // 2
-                clean_plan_text = plan_text.lstrip(' ')
-
-                while level < len(parent_stack) - 1:
-                    parent_stack.pop()
-
-                if level > len(parent_stack) - 1: level = len(parent_stack) - 1
-
-                parent = parent_stack[level]
-                new_item = QTreeWidgetItem(parent, [clean_plan_text, reward_text])
-                new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
+        if self.excel_job is not None:
+            QMessageBox.information(self, "请稍候", "上一次导入或导出还没有完成。")
+            return
 
-                if len(parent_stack) > level + 1:
-                    parent_stack[level + 1] = new_item
-                else:
-                    parent_stack.append(new_item)
+        # 不再清空 tree.clear()，导入的条目合并到现有列表之后
+        job = TreeExcelImport(tree, file_path, ("计划内容", "对应奖励字"), self.parse_excel_row,
+                              self.save_new_items, self)
 
-            self.save_data()
-            QMessageBox.information(self, "成功", f"数据已成功合并导入到 {tree_name}。")
+        def on_format_error():
+            self.finish_excel_job()
+            QMessageBox.warning(self, "格式错误",
+                                "导入的Excel文件格式不正确。\n第一行应为 '计划内容' 和 '对应奖励字'。")
 
-        except Exception as e:
-            QMessageBox.critical(self, "导入失败", f"导入过程中发生错误: {e}")
+        def on_finished(count, cancelled):
+            self.finish_excel_job()
+            self.notify_updated()
+            if cancelled:
+                QMessageBox.information(self, "已取消", f"导入已取消，已合并导入 {count} 条计划到 {tree_name}。")
+            else:
+                QMessageBox.information(self, "成功", f"数据已成功合并导入到 {tree_name}。")
+
+        def on_failed(message):
+            self.finish_excel_job()
+            if job.imported:
+                self.notify_updated()
+            QMessageBox.critical(self, "导入失败", message)
+
+        job.format_error.connect(on_format_error)
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self.excel_job = job
+        job.start()
+
+    @staticmethod
+    def parse_excel_row(row):
+        """在导入线程中把一行转换为 (层级, [计划内容, 对应奖励字])，无效行返回 None"""
+        # 只读模式下末尾的空单元格不会返回，补齐到两列
+        row = tuple(row) + (None,) * (2 - len(row))
+        plan_text, reward_text = (str(row[0]) if row[0] is not None else ""), (
+            str(row[1]) if row[1] is not None else "")
+        if not plan_text: return None
+
+        level, clean_plan_text = split_indent(plan_text)
+        return level, [clean_plan_text, reward_text]
+
+    @staticmethod
+    def excel_row(level, texts):
+        """在导出线程中生成一行，计划内容按层级缩进"""
+        plan_text, reward_text = texts
+        return ["  " * level + plan_text, reward_text]
+
+    def finish_excel_job(self):
+        self.excel_job.deleteLater()
+        self.excel_job = None
 
     def export_data(self):
         if not openpyxl:
             QMessageBox.critical(self, "缺少库", "导出功能需要 'openpyxl' 库。\n请通过命令 'pip install openpyxl' 安装。")
             return
+        if self.excel_job is not None:
+            QMessageBox.information(self, "请稍候", "上一次导入或导出还没有完成。")
+            return
 
         items = ["当天计划", "当前计划"]
         item, ok = QInputDialog.getItem(self, "选择导出", "您想从哪个列表导出计划？", items, 0, False)
@@ -397,32 +428,18 @@ class RewardsTab(QWidget):
         if not file_path:
             return
 
-        try:
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = default_name
-
-            sheet["A1"] = "计划内容"
-            sheet["B1"] = "对应奖励字"
-            sheet.column_dimensions[get_column_letter(1)].width = 50
-            sheet.column_dimensions[get_column_letter(2)].width = 30
-
-            def write_items_recursive(parent_item, current_row, level=0):
-                for i in range(parent_item.childCount()):
-                    item = parent_item.child(i)
-                    indent = "  " * level
-                    plan_text = f"{indent}{item.text(0)}"
-                    reward_text = item.text(1)
-                    sheet[f"A{current_row}"] = plan_text
-                    sheet[f"B{current_row}"] = reward_text
-                    current_row += 1
-                    current_row = write_items_recursive(item, current_row, level + 1)
-                return current_row
-
-            write_items_recursive(tree.invisibleRootItem(), 2)
-            workbook.save(file_path)
+        job = TreeExcelExport(tree, 2, file_path, default_name, ("计划内容", "对应奖励字"), (50, 30),
+                              self.excel_row, self)
+
+        def on_finished(count, cancelled):
+            self.finish_excel_job()
             QMessageBox.information(self, "成功", f"{default_name} 已成功导出到:\n{file_path}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "导出失败", f"导出过程中发生错误: {e}")
+        def on_failed(message):
+            self.finish_excel_job()
+            QMessageBox.critical(self, "导出失败", message)
 
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self.excel_job = job
+        job.start()
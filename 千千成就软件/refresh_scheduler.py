@@ -0,0 +1,34 @@
+from PyQt6.QtCore import QObject, QTimer
+
+
+class RefreshScheduler(QObject):
+    """
+    合并刷新请求：mark_dirty 只记下哪些部分需要刷新，到下一轮事件循环时每个部分只刷新一次。
+    同一轮里连续触发的多个信号（例如修改等级表 -> 重建表格 -> config_updated）只产生一次刷新。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._handlers = {}  # 部分名称 -> 刷新函数，按注册顺序执行
+        self._dirty = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def register(self, part, handler):
+        self._handlers[part] = handler
+
+    def mark_dirty(self, *parts):
+        """标记需要刷新的部分，不传参数时标记全部"""
+        self._dirty.update(parts or self._handlers)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """立即刷新所有已标记的部分；刷新过程中新标记的部分留到下一轮"""
+        self._timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        for part, handler in self._handlers.items():
+            if part in dirty:
+                handler()
@@ -11,7 +11,9 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
                              QMessageBox, QDialog, QGraphicsView, QGraphicsScene,
                              QGraphicsPixmapItem, QLineEdit, QStyledItemDelegate)
 from PyQt6.QtGui import QPixmap, QTransform, QPainter
-from PyQt6.QtCore import Qt, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer
+
+from image_loader import ImageLoader, read_image_size
 
 
 class LargerEditDelegate(QStyledItemDelegate):
@@ -44,38 +46,61 @@ class LargerEditDelegate(QStyledItemDelegate):
 
 
 class ImagePreviewDialog(QDialog):
-    def __init__(self, image_settings, parent=None, initial_size=None):
+    def __init__(self, image_settings, parent=None, initial_size=None, loader=None):
         super().__init__(parent)
         self.setWindowTitle("图片预览与设置")
         self.settings = image_settings.copy()
         self._initial_fit_done = False
+        self.pixmap = QPixmap()
 
-        self.pixmap = QPixmap(self.settings.get("path", ""))
-        if self.pixmap.isNull():
+        if initial_size:
+            self.resize(initial_size)
+        else:
+            self.setMinimumSize(800, 600)
+
+        self.init_ui()
+
+        # 原图在后台解码（编辑位置需要原始分辨率），完成前先显示占位文字
+        self.loader = loader if loader is not None else ImageLoader(self)
+        self.loader.image_loaded.connect(self.on_image_loaded)
+        self._request_id = self.loader.load(self.settings.get("path", ""))
+
+    def on_image_loaded(self, request_id, image):
+        if request_id != self._request_id:
+            return
+        if image.isNull():
             QMessageBox.warning(self, "错误", "无法加载图片。")
-            from PyQt6.QtCore import QTimer
             QTimer.singleShot(0, self.reject)
             return
 
+        self.pixmap = QPixmap.fromImage(image)
+        self.scene.removeItem(self.placeholder_item)
+        self.pixmap_item.setPixmap(self.pixmap)
+
         if self.settings.get("pos_x") is None or self.settings.get("pos_x") == 0:
             self.settings["pos_x"] = self.pixmap.width() / 2
         if self.settings.get("pos_y") is None or self.settings.get("pos_y") == 0:
             self.settings["pos_y"] = self.pixmap.height() / 2
 
-        if initial_size:
-            self.resize(initial_size)
-        else:
-            self.setMinimumSize(800, 600)
-
-        self.init_ui()
         self.apply_settings()
+        if self.isVisible():
+            self.initial_fit()
+
+    def done(self, result):
+        # loader 可能是主窗口共用的，关闭后不再接收它的结果
+        try:
+            self.loader.image_loaded.disconnect(self.on_image_loaded)
+        except TypeError:
+            pass
+        super().done(result)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
 
         self.scene = QGraphicsScene(self)
-        self.pixmap_item = QGraphicsPixmapItem(self.pixmap)
+        self.pixmap_item = QGraphicsPixmapItem()
         self.scene.addItem(self.pixmap_item)
+        self.placeholder_item = self.scene.addText("图片加载中...")
 
         self.view = QGraphicsView(self.scene)
         self.view.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
@@ -116,7 +141,11 @@ class ImagePreviewDialog(QDialog):
 
     def showEvent(self, event):
         super().showEvent(event)
-        if not self._initial_fit_done:
+        self.initial_fit()
+
+    def initial_fit(self):
+        """第一次显示且图片已加载时，未调整过的图片缩放到适合窗口"""
+        if not self._initial_fit_done and not self.pixmap.isNull():
             is_default = (
                     abs(self.settings.get("zoom", 1.0) - 1.0) < 1e-6 and
                     self.settings.get("rotation", 0) == 0 and
@@ -154,6 +183,10 @@ class ImagePreviewDialog(QDialog):
         self.fit_image_in_view()
 
     def accept(self):
+        if self.pixmap.isNull():
+            # 图片还没加载完，保持原来的设置
+            super().accept()
+            return
         self.settings["rotation"] = self.pixmap_item.rotation() % 360
         self.settings["zoom"] = self.view.transform().m11()
 
@@ -295,11 +328,12 @@ class SettingsTab(QWidget):
             path_label.setText(os.path.basename(file_path));
             path_label.setToolTip(file_path)
 
-            pixmap = QPixmap(file_path)
+            # 只需要尺寸，读取文件头即可，不必解码整张图片
+            image_size = read_image_size(file_path)
             new_settings = {
                 "path": file_path, "zoom": 1.0, "rotation": 0,
-                "pos_x": pixmap.width() / 2 if not pixmap.isNull() else 0,
-                "pos_y": pixmap.height() / 2 if not pixmap.isNull() else 0
+                "pos_x": image_size.width() / 2 if image_size.isValid() else 0,
+                "pos_y": image_size.height() / 2 if image_size.isValid() else 0
             }
             cell_widget.setProperty("image_settings", new_settings)
 
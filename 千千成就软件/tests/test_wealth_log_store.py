@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wealth_log_store import WealthLogStore
+
+
+def rows(store):
+    return [(store.date_text(row), store.seqs[row]) for row in range(len(store))]
+
+
+def make_store():
+    store = WealthLogStore()
+    store.load([
+        {"id": 1, "date": "2024-01-01", "wealth": 10},
+        {"id": 3, "date": "2024-01-02", "wealth": 30},
+        {"id": 2, "date": "2024-01-02", "wealth": 20, "description": "b"},
+        {"id": 4, "date": "bad date", "wealth": 40},
+    ])
+    return store
+
+
+def test_load_orders_newest_first_then_by_id():
+    store = make_store()
+    assert rows(store) == [("2024-01-02", 2), ("2024-01-02", 3), ("2024-01-01", 1), ("bad date", 4)]
+    assert store.latest_wealth() == 20
+    assert store.entry(0) == {"date": "2024-01-02", "wealth": 20, "description": "b"}
+
+
+def test_insert_goes_after_same_day_entries():
+    store = make_store()
+    assert store.insert_position("2024-01-02") == 2
+    row = store.insert("2024-01-02", 50)
+    assert row == 2
+    assert store.seqs[row] == 5
+    assert store.insert("2024-01-03", 60, seq=9) == 0
+
+
+def test_set_date_moves_row_to_target():
+    store = make_store()
+    ordinal = store.parse_date("2023-12-31")
+    target = store.target_row_for_date(0, ordinal)
+    assert store.set_date(0, ordinal) == target == 2
+    assert rows(store) == [("2024-01-02", 3), ("2024-01-01", 1), ("2023-12-31", 2), ("bad date", 4)]
+
+    ordinal = store.parse_date("2024-01-02")
+    target = store.target_row_for_date(2, ordinal)
+    assert store.set_date(2, ordinal) == target == 0
+    assert rows(store)[:2] == [("2024-01-02", 2), ("2024-01-02", 3)]
+
+
+def test_remove_and_shared_descriptions():
+    store = make_store()
+    store.set_description(1, "b")
+    assert store.desc_ids[0] == store.desc_ids[1]
+    store.remove(3)
+    assert len(store) == 3
+    assert all(store.date_text(row) != "bad date" for row in range(len(store)))
@@ -0,0 +1,248 @@
+from collections import OrderedDict
+
+# 此功能需要 openpyxl 库，请通过命令 "pip install openpyxl" 来安装
+try:
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    openpyxl = None
+
+from PyQt6.QtWidgets import QTreeWidgetItem, QProgressDialog
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+
+# 导入时每读满这么多行就交给界面线程挂到树上
+IMPORT_BATCH_SIZE = 500
+# 导出时每写这么多行报告一次进度
+EXPORT_PROGRESS_STEP = 1000
+
+
+def split_indent(text):
+    """Excel 中用每两个前导空格表示一层缩进，返回 (层级, 去掉缩进的文字)"""
+    clean_text = text.lstrip(' ')
+    return (len(text) - len(clean_text)) // 2, clean_text
+
+
+def tree_rows(tree, columns):
+    """按显示顺序把树展开为 [(层级, [各列文字])]，供导出线程使用"""
+    rows = []
+    stack = [(tree.invisibleRootItem(), -1)]
+    while stack:
+        parent, level = stack.pop()
+        children = [parent.child(i) for i in range(parent.childCount())]
+        for item in reversed(children):
+            stack.append((item, level + 1))
+        if level >= 0:
+            rows.append((level, [parent.text(column) for column in range(columns)]))
+    return rows
+
+
+class _JobSignals(QObject):
+    batch_ready = pyqtSignal(list)  # [(层级, [各列文字])]
+    progress = pyqtSignal(int, int)  # 已处理行数, 总行数（未知时为 0）
+    finished = pyqtSignal(int)  # 导入或导出的条数
+    format_error = pyqtSignal()  # 表头与预期不符
+    failed = pyqtSignal(str)
+
+
+class _ImportTask(QRunnable):
+    """以只读模式逐行读取工作表，解析后分批发回界面线程"""
+
+    def __init__(self, file_path, headers, parse_row, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.headers = headers
+        self.parse_row = parse_row
+        self.signals = signals
+        self.cancelled = False
+
+    def run(self):
+        try:
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        except Exception as e:
+            self.signals.failed.emit(f"导入过程中发生错误: {e}")
+            return
+        try:
+            sheet = workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            header = tuple(next(rows, ()))[:len(self.headers)]
+            if header != tuple(self.headers):
+                self.signals.format_error.emit()
+                return
+
+            total = max(0, (sheet.max_row or 0) - 1)
+            batch = []
+            count = done = 0
+            for row in rows:
+                if self.cancelled:
+                    break
+                done += 1
+                record = self.parse_row(row)
+                if record is not None:
+                    batch.append(record)
+                    count += 1
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self.signals.batch_ready.emit(batch)
+                    self.signals.progress.emit(done, total)
+                    batch = []
+            if batch:
+                self.signals.batch_ready.emit(batch)
+            self.signals.progress.emit(done, total)
+            self.signals.finished.emit(count)
+        except Exception as e:
+            self.signals.failed.emit(f"导入过程中发生错误: {e}")
+        finally:
+            workbook.close()
+
+
+class _ExportTask(QRunnable):
+    """以只写模式流式写出工作表，不在内存中保留整个表格"""
+
+    def __init__(self, file_path, sheet_title, headers, widths, rows, write_row, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.sheet_title = sheet_title
+        self.headers = headers
+        self.widths = widths
+        self.rows = rows
+        self.write_row = write_row
+        self.signals = signals
+        self.cancelled = False
+
+    def run(self):
+        try:
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet(self.sheet_title)
+            # 只写模式下列宽必须在写入任何行之前设置
+            for column, width in enumerate(self.widths, start=1):
+                sheet.column_dimensions[get_column_letter(column)].width = width
+            sheet.append(list(self.headers))
+
+            total = len(self.rows)
+            for done, (level, texts) in enumerate(self.rows, start=1):
+                if self.cancelled:
+                    self.signals.failed.emit("导出已取消。")
+                    return
+                sheet.append(self.write_row(level, texts))
+                if done % EXPORT_PROGRESS_STEP == 0:
+                    self.signals.progress.emit(done, total)
+            workbook.save(self.file_path)
+            self.signals.progress.emit(total, total)
+            self.signals.finished.emit(total)
+        except Exception as e:
+            self.signals.failed.emit(f"导出过程中发生错误: {e}")
+
+
+class _ExcelJob(QObject):
+    """一次后台导入或导出：持有任务和进度对话框，结束后通过 finished / failed 通知"""
+    finished = pyqtSignal(int, bool)  # 条数, 是否被取消
+    format_error = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, label, parent):
+        super().__init__(parent)
+        self.task = None
+        self.cancelled = False
+        self.signals = _JobSignals(self)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.format_error.connect(self._on_format_error)
+        self.signals.failed.connect(self._on_failed)
+
+        self.progress_dialog = QProgressDialog(label, "取消", 0, 0, parent)
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(300)
+        self.progress_dialog.canceled.connect(self.cancel)
+
+    def start(self):
+        self.progress_dialog.setValue(0)
+        QThreadPool.globalInstance().start(self.task)
+
+    def cancel(self):
+        self.cancelled = True
+        self.task.cancelled = True
+
+    def _on_progress(self, done, total):
+        if total and self.progress_dialog.maximum() != total:
+            self.progress_dialog.setMaximum(total)
+        self.progress_dialog.setValue(min(done, total) if total else 0)
+
+    def _close_dialog(self):
+        self.progress_dialog.canceled.disconnect(self.cancel)
+        self.progress_dialog.close()
+        self.progress_dialog.deleteLater()
+
+    def _on_finished(self, count):
+        self._close_dialog()
+        self.finished.emit(count, self.cancelled)
+
+    def _on_format_error(self):
+        self._close_dialog()
+        self.format_error.emit()
+
+    def _on_failed(self, message):
+        self._close_dialog()
+        self.failed.emit(message)
+
+
+class TreeExcelImport(_ExcelJob):
+    """
+    从 Excel 合并导入到一棵树。读取和解析在后台线程中进行，界面线程每次收到一批记录后
+    一次性挂到树上，再调用 save_items(tree, 新条目) 在一个事务中写入数据库。
+    parse_row(行) 在后台线程中调用，返回 (层级, [各列文字])，无效行返回 None。
+    中途失败或取消时，已经收到的批次会保留在树和数据库中，imported 记录其条数。
+    """
+
+    def __init__(self, tree, file_path, headers, parse_row, save_items, parent):
+        super().__init__(f"正在导入 {file_path} ...", parent)
+        self.tree = tree
+        self.save_items = save_items
+        self.imported = 0
+        self.parent_stack = [tree.invisibleRootItem()]  # 跨批次保留，子项可以接在上一批的条目下面
+        self.task = _ImportTask(file_path, headers, parse_row, self.signals)
+        self.signals.batch_ready.connect(self._on_batch)
+
+    def _on_batch(self, records):
+        new_items = []
+        created = set()  # 本批新建、还没挂到树上的条目
+        pending = OrderedDict()  # 已在树上的父项 -> 要追加的子项
+        stack = self.parent_stack
+        for level, texts in records:
+            while level < len(stack) - 1:
+                stack.pop()
+            if level > len(stack) - 1:
+                level = len(stack) - 1
+
+            parent = stack[level]
+            item = QTreeWidgetItem(texts)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
+            if id(parent) in created:
+                parent.addChild(item)
+            else:
+                pending.setdefault(id(parent), (parent, []))[1].append(item)
+            created.add(id(item))
+
+            if len(stack) > level + 1:
+                stack[level + 1] = item
+            else:
+                stack.append(item)
+            new_items.append(item)
+
+        # 每个已有父项只插入一次，视图不必逐行更新
+        self.tree.setUpdatesEnabled(False)
+        for parent, children in pending.values():
+            parent.addChildren(children)
+        self.tree.setUpdatesEnabled(True)
+        self.save_items(self.tree, new_items)
+        self.imported += len(new_items)
+
+
+class TreeExcelExport(_ExcelJob):
+    """
+    把一棵树导出为 Excel。树的内容先在界面线程中取出（很快），写文件在后台线程中进行。
+    write_row(层级, [各列文字]) 在后台线程中调用，返回写入工作表的一行。
+    """
+
+    def __init__(self, tree, columns, file_path, sheet_title, headers, widths, write_row, parent):
+        super().__init__(f"正在导出到 {file_path} ...", parent)
+        self.task = _ExportTask(file_path, sheet_title, headers, widths, tree_rows(tree, columns), write_row,
+                                self.signals)
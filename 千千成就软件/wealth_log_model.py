@@ -0,0 +1,152 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+
+COLUMN_DATE, COLUMN_LEVEL, COLUMN_WEALTH, COLUMN_TREND, COLUMN_DESCRIPTION = range(5)
+EDITABLE_COLUMNS = (COLUMN_DATE, COLUMN_WEALTH, COLUMN_DESCRIPTION)
+
+TREND_UP_COLOR = QColor("#D32F2F")
+TREND_DOWN_COLOR = QColor("#388E3C")
+
+
+class WealthLogModel(QAbstractTableModel):
+    """
+    财富日志的表格模型。视图只向模型请求可见行的数据，
+    等级和趋势两列不存储，在 data() 中按需计算。
+    """
+    # 用户在表格中修改了数据（需要保存），参数为修改后该记录所在的行
+    edited = pyqtSignal(int)
+
+    def __init__(self, store, level_index, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.level_index = level_index
+        self.term = "财富"
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 5
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ["日期", "当时等级", f"当前{self.term}值", "趋势", "说明"][section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() in EDITABLE_COLUMNS:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def _trend(self, row):
+        """与下一行（更早的记录）比较：1 上升，-1 下降，0 持平或没有更早的记录"""
+        if row + 1 >= len(self.store):
+            return 0
+        current_wealth, prev_wealth = self.store.wealths[row], self.store.wealths[row + 1]
+        return (current_wealth > prev_wealth) - (current_wealth < prev_wealth)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        store = self.store
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COLUMN_DATE:
+                return store.date_text(row)
+            if column == COLUMN_LEVEL:
+                return self.level_index.level_name_for(store.wealths[row])
+            if column == COLUMN_WEALTH:
+                return f"{store.wealths[row]:,}"
+            if column == COLUMN_TREND:
+                return {1: "↑", -1: "↓"}.get(self._trend(row), "")
+            return store.description(row)
+        if role == Qt.ItemDataRole.EditRole:
+            if column == COLUMN_WEALTH:
+                return str(store.wealths[row])
+            return self.data(index, Qt.ItemDataRole.DisplayRole)
+        if role == Qt.ItemDataRole.ForegroundRole and column == COLUMN_TREND:
+            return {1: TREND_UP_COLOR, -1: TREND_DOWN_COLOR}.get(self._trend(row))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == COLUMN_TREND:
+                return Qt.AlignmentFlag.AlignCenter
+            if column == COLUMN_WEALTH:
+                return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter  # 左对齐
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        row, column = index.row(), index.column()
+        try:
+            if column == COLUMN_DATE:
+                ordinal = self.store.parse_date(str(value).strip())
+                row = self._move_to_date(row, ordinal)
+            elif column == COLUMN_WEALTH:
+                wealth = int("".join(ch for ch in str(value) if ch.isdigit()))
+                self.store.set_wealth(row, wealth)
+                # 本行的等级和趋势，以及上一行（更新的记录）的趋势
+                self.dataChanged.emit(self.index(row, COLUMN_LEVEL), self.index(row, COLUMN_TREND))
+                self._trend_changed(row - 1)
+            elif column == COLUMN_DESCRIPTION:
+                self.store.set_description(row, str(value))
+                self.dataChanged.emit(index, index)
+            else:
+                return False
+        except (ValueError, TypeError):
+            # 格式错误时拒绝修改，视图会保留原值
+            return False
+        self.edited.emit(row)
+        return True
+
+    def _trend_changed(self, row):
+        if 0 <= row < len(self.store):
+            trend_index = self.index(row, COLUMN_TREND)
+            self.dataChanged.emit(trend_index, trend_index)
+
+    def _move_to_date(self, row, ordinal):
+        new_row = self.store.target_row_for_date(row, ordinal)
+        if new_row == row:
+            self.store.set_date(row, ordinal)
+            self.dataChanged.emit(self.index(row, COLUMN_DATE), self.index(row, COLUMN_DATE))
+            return row
+        # Qt 的目标位置按"移动前"的行号表示，向下移动时要多加一
+        destination = new_row + 1 if new_row > row else new_row
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        self.store.set_date(row, ordinal)
+        self.endMoveRows()
+        # 原位置上方的行和新位置上方的行都换了比较对象
+        old_above = row - 1 if new_row > row else row
+        self._trend_changed(old_above)
+        self.dataChanged.emit(self.index(new_row, COLUMN_DATE), self.index(new_row, COLUMN_DESCRIPTION))
+        self._trend_changed(new_row - 1)
+        return new_row
+
+    def add_entry(self, date_text, wealth, description="", seq=None):
+        row = self.store.insert_position(date_text, seq)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.insert(date_text, wealth, description, seq)
+        self.endInsertRows()
+        self._trend_changed(row - 1)
+        return row
+
+    def remove_entry(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.store.remove(row)
+        self.endRemoveRows()
+        self._trend_changed(row - 1)
+
+    def reload(self, entries):
+        self.beginResetModel()
+        self.store.load(entries)
+        self.endResetModel()
+
+    def set_term(self, term):
+        self.term = term
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, 4)
+
+    def level_config_changed(self):
+        """等级配置变化后只需让等级列重新取数"""
+        if len(self.store):
+            self.dataChanged.emit(self.index(0, COLUMN_LEVEL), self.index(len(self.store) - 1, COLUMN_LEVEL))
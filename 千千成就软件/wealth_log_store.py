@@ -0,0 +1,132 @@
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+class WealthLogStore:
+    """
+    紧凑的日志存储：按显示顺序（新日期在前，同一天按录入先后）保存的几个平行数组。
+    说明文字去重后只存编号；日期格式错误的记录序数为 0（排在最后），原文单独保存。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ordinals = array('l')
+        self.wealths = array('q')
+        self.seqs = array('q')      # 录入序号（即数据库中的 id），同一天的记录按它排列
+        self.desc_ids = array('l')
+        self.descriptions = [""]
+        self._desc_lookup = {"": 0}
+        self._raw_dates = {}        # 录入序号 -> 无法识别的日期原文
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self.seqs)
+
+    @staticmethod
+    def parse_date(text):
+        """日期文本 -> 序数，格式错误时抛出 ValueError"""
+        return datetime.strptime(text, DATE_FORMAT).toordinal()
+
+    def _intern(self, text):
+        text = text or ""
+        desc_id = self._desc_lookup.get(text)
+        if desc_id is None:
+            desc_id = len(self.descriptions)
+            self.descriptions.append(text)
+            self._desc_lookup[text] = desc_id
+        return desc_id
+
+    def _find_row(self, ordinal, seq):
+        key = (-ordinal, seq)
+        return bisect_right(range(len(self.seqs)), key, key=lambda i: (-self.ordinals[i], self.seqs[i]))
+
+    def load(self, entries):
+        """从 [{id, date, wealth, description}] 重新建立存储，没有 id 时按列表顺序编号"""
+        self.clear()
+        rows = []
+        for entry in entries:
+            rows.append(self._prepare(entry.get("date", "1970-01-01"), entry.get("wealth", 0),
+                                      entry.get("description", ""), entry.get("id")))
+        rows.sort(key=lambda r: (-r[0], r[1]))
+        self.ordinals = array('l', (r[0] for r in rows))
+        self.seqs = array('q', (r[1] for r in rows))
+        self.wealths = array('q', (r[2] for r in rows))
+        self.desc_ids = array('l', (r[3] for r in rows))
+
+    def _prepare(self, date_text, wealth, description, seq=None):
+        if seq is None:
+            seq = self._next_seq
+        self._next_seq = max(self._next_seq, seq + 1)
+        try:
+            ordinal = self.parse_date(date_text)
+        except (ValueError, TypeError):
+            ordinal = 0
+            self._raw_dates[seq] = str(date_text)
+        return ordinal, seq, int(wealth), self._intern(description)
+
+    def insert_position(self, date_text, seq=None):
+        """新记录插入后会处在的行"""
+        return self._find_row(self.parse_date(date_text), self._next_seq if seq is None else seq)
+
+    def insert(self, date_text, wealth, description="", seq=None):
+        """添加一条记录，返回它所在的行"""
+        ordinal, seq, wealth, desc_id = self._prepare(date_text, wealth, description, seq)
+        return self._insert_row(ordinal, seq, wealth, desc_id)
+
+    def _insert_row(self, ordinal, seq, wealth, desc_id):
+        row = self._find_row(ordinal, seq)
+        self.ordinals.insert(row, ordinal)
+        self.seqs.insert(row, seq)
+        self.wealths.insert(row, wealth)
+        self.desc_ids.insert(row, desc_id)
+        return row
+
+    def remove(self, row):
+        self._raw_dates.pop(self.seqs[row], None)
+        del self.ordinals[row]
+        del self.seqs[row]
+        del self.wealths[row]
+        del self.desc_ids[row]
+
+    def target_row_for_date(self, row, ordinal):
+        """把第 row 行的日期改为 ordinal 后，它应处的行号（按移除本行之后的位置计算）"""
+        key = (-ordinal, self.seqs[row])
+        lo = bisect_right(range(len(self.seqs)), key, key=lambda i: (-self.ordinals[i], self.seqs[i]))
+        return lo - 1 if lo > row else lo
+
+    def set_date(self, row, ordinal):
+        """修改日期并移动到新位置，返回新行号"""
+        seq, wealth, desc_id = self.seqs[row], self.wealths[row], self.desc_ids[row]
+        self._raw_dates.pop(seq, None)
+        self.remove(row)
+        return self._insert_row(ordinal, seq, wealth, desc_id)
+
+    def set_wealth(self, row, wealth):
+        self.wealths[row] = int(wealth)
+
+    def set_description(self, row, text):
+        self.desc_ids[row] = self._intern(text)
+
+    def date_text(self, row):
+        ordinal = self.ordinals[row]
+        if ordinal == 0:
+            return self._raw_dates.get(self.seqs[row], "")
+        return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+    def description(self, row):
+        return self.descriptions[self.desc_ids[row]]
+
+    def entry(self, row):
+        return {"date": self.date_text(row), "wealth": self.wealths[row], "description": self.description(row)}
+
+    def iter_display_entries(self):
+        for row in range(len(self)):
+            yield self.entry(row)
+
+    def latest_wealth(self):
+        return self.wealths[0] if len(self) else 0
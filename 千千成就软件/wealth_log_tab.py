@@ -1,7 +1,4 @@
-import json
-import os
 from datetime import datetime
-import re
 
 # 此功能需要 openpyxl 库，请通过命令 "pip install openpyxl" 来安装
 try:
@@ -10,18 +7,19 @@ except ImportError:
     openpyxl = None
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTableView, QHeaderView, QAbstractItemView,
                              QMessageBox, QDialog, QDateEdit, QLineEdit, QFileDialog, QStyledItemDelegate)
-from PyQt6.QtGui import QColor
 from PyQt6.QtCore import Qt, pyqtSignal, QDate
 
-# --- 常量 ---
-WEALTH_LOG_FILE = "wealth_log.json"
+from achievement_db import AchievementDatabase
+from level_index import LevelIndex
+from wealth_log_model import WealthLogModel, COLUMN_TREND
+from wealth_log_store import WealthLogStore
 
 
 class LargerEditDelegate(QStyledItemDelegate):
     """
-    自定义委托，用于在QTableWidget中创建一个更大的编辑器。
+    自定义委托，用于在表格中创建一个更大的编辑器。
     """
     def createEditor(self, parent, option, index):
         # 检查项目是否可编辑
@@ -50,19 +48,27 @@ class LargerEditDelegate(QStyledItemDelegate):
 class WealthLogTab(QWidget):
     wealth_updated = pyqtSignal(int)
 
-    def __init__(self, parent=None):
+    def __init__(self, db=None, level_index=None, parent=None):
         super().__init__(parent)
-        self.log_data = []
-        self.level_config = []
-        self._is_populating = False
+        self.db = db if db is not None else AchievementDatabase()
+        # 由主窗口传入共用的等级索引，这里只读取
+        self.level_index = level_index if level_index is not None else LevelIndex()
+        self.store = WealthLogStore()
+        self.model = WealthLogModel(self.store, self.level_index, self)
+        self.model.edited.connect(self.on_model_edited)
+        self._last_latest_wealth = 0
         self.current_term = "财富"
         self.init_ui()
         self.load_log()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        # 行高固定，视图无需逐行计算尺寸，上万行也能流畅滚动
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
@@ -76,8 +82,6 @@ class WealthLogTab(QWidget):
         delegate = LargerEditDelegate(self.table)
         self.table.setItemDelegate(delegate)
 
-        self.table.itemChanged.connect(self.handle_item_changed)
-
         button_layout = QHBoxLayout()
         add_button = QPushButton("➕ 添加记录")
         remove_button = QPushButton("➖ 删除选中行")
@@ -98,63 +102,25 @@ class WealthLogTab(QWidget):
         import_button.clicked.connect(self.import_data)
         export_button.clicked.connect(self.export_data)
 
-    def handle_item_changed(self, item):
-        if self._is_populating:
-            return
-
-        row = item.row()
-        col = item.column()
-
-        # 从第0列获取存储的原始数据索引
-        index_item = self.table.item(row, 0)
-        if not index_item: return
-        original_index = index_item.data(Qt.ItemDataRole.UserRole)
-
-        if original_index is None or original_index >= len(self.log_data):
-            return
-
-        try:
-            entry_to_update = self.log_data[original_index]
-
-            if col == 0:  # 日期
-                entry_to_update['date'] = item.text()
-            elif col == 2:  # 财富值
-                wealth_str = re.sub(r'[^\d]', '', item.text())
-                entry_to_update['wealth'] = int(wealth_str)
-            elif col == 4:  # 说明
-                entry_to_update['description'] = item.text()
-        except (ValueError, TypeError):
-            self.refresh_table_and_emit_update()  # 如果输入格式错误，则刷新表格以撤销更改
-            return
-
-        self.save_log()
+    def on_model_edited(self, row):
+        # 只更新被修改的这一条记录
+        entry = self.store.entry(row)
+        self.db.update_log_entry(self.store.seqs[row], entry["date"], entry["wealth"], entry["description"])
+        self._emit_if_latest_changed()
 
     def apply_settings(self, style_config):
         """应用显示设置，例如显示/隐藏趋势列"""
         show_trend = style_config.get("show_trend_column", False)
-        self.table.setColumnHidden(3, not show_trend)
+        self.table.setColumnHidden(COLUMN_TREND, not show_trend)
         self.current_term = style_config.get("term_display_mode", "财富")
-        self.table.setHorizontalHeaderLabels(["日期", "当时等级", f"当前{self.current_term}值", "趋势", "说明"])
-
-    def update_level_config(self, config_data):
-        self.level_config = config_data
+        self.model.set_term(self.current_term)
 
     def _get_level_data_for_wealth(self, wealth):
         """获取财富值对应的完整等级信息字典"""
-        current_level_data = None
-        sorted_config = sorted(self.level_config, key=lambda x: x['wealth_threshold'])
-        for level in sorted_config:
-            if wealth >= level['wealth_threshold']:
-                current_level_data = level
-            else:
-                break
-        return current_level_data
+        return self.level_index.level_for(wealth)
 
     def _get_level_for_wealth(self, wealth):
-        level_data = self._get_level_data_for_wealth(wealth)
-        if level_data:
-            return level_data.get("level_name", f"等级 {level_data['level']}")
-        return "未定级"
+        return self.level_index.level_name_for(wealth)
 
     def add_row_dialog(self):
         dialog = QDialog(self)
@@ -190,110 +156,41 @@ class WealthLogTab(QWidget):
                 date = date_edit.date().toString("yyyy-MM-dd")
                 current_wealth = int(wealth_edit.text())
                 description = desc_edit.text()
-                new_entry = {"date": date, "wealth": current_wealth, "description": description}
-                self.log_data.append(new_entry)
-                self.save_log()
+                entry_id = self.db.add_log_entry(date, current_wealth, description)
+                self.model.add_entry(date, current_wealth, description, seq=entry_id)
+                self._emit_if_latest_changed()
             except ValueError:
                 QMessageBox.warning(self, "输入错误", f"当前{self.current_term}值必须是一个整数。")
 
     def remove_row(self):
-        current_row = self.table.currentRow()
-        if current_row < 0: return
-
-        index_item = self.table.item(current_row, 0)
-        if not index_item: return
-        original_index = index_item.data(Qt.ItemDataRole.UserRole)
+        current_row = self.table.currentIndex().row()
+        if current_row < 0 or current_row >= len(self.store): return
 
-        if original_index is not None and original_index < len(self.log_data):
-            del self.log_data[original_index]
-            self.save_log()
+        entry_id = self.store.seqs[current_row]
+        self.model.remove_entry(current_row)
+        self.db.delete_log_entry(entry_id)
+        self._emit_if_latest_changed()
 
     def load_log(self):
-        if os.path.exists(WEALTH_LOG_FILE):
-            try:
-                with open(WEALTH_LOG_FILE, 'r', encoding='utf-8') as f:
-                    self.log_data = json.load(f)
-            except json.JSONDecodeError:
-                self.log_data = []
+        self.model.reload(self.db.load_log())
         self.refresh_table_and_emit_update()
 
-    def _get_log_for_display(self):
-        # 创建带原始索引的数据副本
-        indexed_log = list(enumerate(self.log_data))
-        try:
-            # 根据日期排序
-            sorted_indexed_log = sorted(
-                indexed_log,
-                key=lambda x: datetime.strptime(x[1].get('date', '1970-01-01'), '%Y-%m-%d'),
-                reverse=True
-            )
-            return sorted_indexed_log
-        except ValueError:
-            return indexed_log  # 如果日期格式错误，返回原始顺序
-
     def refresh_table_and_emit_update(self):
-        self._is_populating = True
-        self.table.setRowCount(0)
-        display_log_with_indices = self._get_log_for_display()
-
-        for i, (original_index, entry) in enumerate(display_log_with_indices):
-            row_count = self.table.rowCount()
-            self.table.insertRow(row_count)
-
-            # 日期 (可编辑), 并存储原始索引
-            date_item = QTableWidgetItem(entry.get("date", ""))
-            date_item.setData(Qt.ItemDataRole.UserRole, original_index)
-            self.table.setItem(row_count, 0, date_item)
-
-            # 当时等级 (不可编辑)
-            level_name = self._get_level_for_wealth(entry.get('wealth', 0))
-            level_item = QTableWidgetItem(level_name)
-            level_item.setFlags(level_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_count, 1, level_item)
-
-            # 当前财富值 (可编辑)
-            current_wealth = entry.get('wealth', 0)
-            wealth_item = QTableWidgetItem(f"{current_wealth:,}")
-            wealth_item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)  # 左对齐
-            self.table.setItem(row_count, 2, wealth_item)
-
-            # 趋势 (不可编辑)
-            trend_item = QTableWidgetItem("")
-            trend_item.setFlags(trend_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            trend_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            prev_original_index, prev_entry = display_log_with_indices[i + 1] if i + 1 < len(
-                display_log_with_indices) else (None, None)
-            if prev_entry:
-                prev_wealth = prev_entry.get('wealth', 0)
-                if current_wealth > prev_wealth:
-                    trend_item.setText("↑")
-                    trend_item.setForeground(QColor("#D32F2F"))
-                elif current_wealth < prev_wealth:
-                    trend_item.setText("↓")
-                    trend_item.setForeground(QColor("#388E3C"))
-            self.table.setItem(row_count, 3, trend_item)
-
-            # 说明 (可编辑)
-            self.table.setItem(row_count, 4, QTableWidgetItem(entry.get("description", "")))
-
-        self._is_populating = False
-        self.wealth_updated.emit(self.get_latest_wealth())
-
-    def save_log(self):
-        with open(WEALTH_LOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.log_data, f, ensure_ascii=False, indent=4)
-        self.refresh_table_and_emit_update()
+        """等级配置变化等情况下使用：让等级列重新取数，并通知主界面刷新"""
+        self.model.level_config_changed()
+        self._last_latest_wealth = self.get_latest_wealth()
+        self.wealth_updated.emit(self._last_latest_wealth)
+
+    def _emit_if_latest_changed(self):
+        # 主界面只关心最新一条记录的数值，没变就不必整体刷新
+        latest_wealth = self.get_latest_wealth()
+        if latest_wealth != self._last_latest_wealth:
+            self._last_latest_wealth = latest_wealth
+            self.wealth_updated.emit(latest_wealth)
 
     def get_latest_wealth(self):
-        if not self.log_data: return 0
-        try:
-            latest_entry = max(self.log_data, key=lambda e: datetime.strptime(e.get('date', '1970-01-01'), '%Y-%m-%d'))
-            return latest_entry.get('wealth', 0)
-        except (ValueError, TypeError, KeyError):
-            if self.log_data:
-                return self.log_data[-1].get('wealth', 0)
-            return 0
+        """最新一条记录（表格第一行）的数值"""
+        return self.store.latest_wealth()
 
     def export_data(self):
         if not openpyxl:
@@ -314,10 +211,7 @@ class WealthLogTab(QWidget):
             sheet["C1"] = f"当前{self.current_term}值"
             sheet["D1"] = "说明"
 
-            # 获取带索引的排序后日志，但只使用其中的字典
-            display_log = [item for _, item in self._get_log_for_display()]
-
-            for row_index, entry in enumerate(display_log, start=2):
+            for row_index, entry in enumerate(self.store.iter_display_entries(), start=2):
                 sheet[f"A{row_index}"] = entry.get("date", "")
                 level_name = self._get_level_for_wealth(entry.get('wealth', 0))
                 sheet[f"B{row_index}"] = level_name
@@ -373,8 +267,8 @@ class WealthLogTab(QWidget):
                 QMessageBox.warning(self, "导入提示", "在文件中没有找到有效的数据行。")
                 return
 
-            self.log_data.extend(imported_logs)
-            self.save_log()
+            self.db.add_log_entries(imported_logs)
+            self.load_log()
             QMessageBox.information(self, "成功", f"成功导入 {len(imported_logs)} 条{self.current_term}记录。")
 
         except Exception as e:
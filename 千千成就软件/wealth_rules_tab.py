@@ -1,14 +1,5 @@
-import os
-import json
 import re
 
-# 此功能需要 openpyxl 库，请通过命令 "pip install openpyxl" 来安装
-try:
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    openpyxl = None
-
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
                              QTreeWidget, QTreeWidgetItem, QAbstractItemView, QHeaderView,
                              QGroupBox, QInputDialog, QMessageBox, QMenu, QFileDialog, QLineEdit,
@@ -16,7 +7,11 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
 from PyQt6.QtGui import QIcon, QAction, QIntValidator
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 
-RULES_FILE = "rules.json"
+from achievement_db import AchievementDatabase, TREE_RULES_NORMAL, TREE_RULES_SPECIAL
+from tree_excel_io import openpyxl, split_indent, TreeExcelImport, TreeExcelExport
+
+# 条目在数据库中的 id 保存在第 0 列的这个角色里
+ITEM_ID_ROLE = Qt.ItemDataRole.UserRole
 
 
 class LargeEditorDelegate(QStyledItemDelegate):
@@ -39,11 +34,13 @@ class LargeEditorDelegate(QStyledItemDelegate):
 class WealthRulesTab(QWidget):
     rules_updated = pyqtSignal(dict)
 
-    def __init__(self, parent=None):
+    def __init__(self, db=None, parent=None):
         super().__init__(parent)
+        self.db = db if db is not None else AchievementDatabase()
         self.normal_rules_tree = None
         self.special_rules_tree = None
         self.term = "财富"
+        self.excel_job = None  # 正在进行的 Excel 导入或导出
         self.init_ui()
 
     def init_ui(self):
@@ -164,7 +161,8 @@ class WealthRulesTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             (item_to_remove.parent() or tree.invisibleRootItem()).removeChild(item_to_remove)
-            self.save_data()
+            self.db.delete_tree_item(item_to_remove.data(0, ITEM_ID_ROLE))
+            self.notify_updated()
 
     def add_item(self, tree, as_child=False, parent_override=None):
         parent = tree.invisibleRootItem()
@@ -192,12 +190,17 @@ class WealthRulesTab(QWidget):
 
         new_item = QTreeWidgetItem(parent, [plan, reward_text, str(reward_value)])
         new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
+        self.save_new_items(tree, [new_item])
         if as_child:
             parent.setExpanded(True)
-        self.save_data()
+        self.notify_updated()
 
     def handle_item_changed(self, item, column):
-        self.save_data()
+        item_id = item.data(0, ITEM_ID_ROLE)
+        if item_id is None:
+            return
+        self.db.update_tree_item(item_id, item.text(0), item.text(1), item.text(2))
+        self.notify_updated()
 
     def show_context_menu(self, position, tree):
         menu = QMenu()
@@ -240,7 +243,8 @@ class WealthRulesTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             tree.clear()
-            self.save_data()
+            self.db.clear_tree(self.tree_key(tree))
+            self.notify_updated()
 
     def expand_all_items(self, tree):
         tree.expandAll()
@@ -254,9 +258,12 @@ class WealthRulesTab(QWidget):
             "special": self.tree_to_dict(self.special_rules_tree)
         }
 
+    def tree_key(self, tree):
+        return TREE_RULES_NORMAL if tree is self.normal_rules_tree else TREE_RULES_SPECIAL
+
     def load_data(self):
-        if not os.path.exists(RULES_FILE):
-            # If the file does not exist, create and load default data
+        if not self.db.get_meta("rules_initialized"):
+            # 第一次运行时写入默认规则
             default_data = {
                 "normal": [
                     {"plan": "读书1个小时", "reward_text": "", "reward": "10", "children": []}
@@ -265,29 +272,32 @@ class WealthRulesTab(QWidget):
                     {"plan": "考过四/六级", "reward_text": "奖励新手机", "reward": "300", "children": []}
                 ]
             }
-            self.dict_to_tree(default_data.get("normal", []), self.normal_rules_tree)
-            self.dict_to_tree(default_data.get("special", []), self.special_rules_tree)
-            self.save_data()  # This will save the file and emit the signal
-            return
-
-        # If the file exists, load it
-        data = {}
+            with self.db.batch():
+                self.db.add_tree_items(TREE_RULES_NORMAL, default_data["normal"])
+                self.db.add_tree_items(TREE_RULES_SPECIAL, default_data["special"])
+                self.db.set_meta("rules_initialized", 1)
+
+        self.dict_to_tree(self.db.load_tree(TREE_RULES_NORMAL), self.normal_rules_tree)
+        self.dict_to_tree(self.db.load_tree(TREE_RULES_SPECIAL), self.special_rules_tree)
+        self.notify_updated()
+
+    def notify_updated(self):
+        """数据已逐项写入数据库，这里只通知界面刷新"""
+        self.rules_updated.emit(self.get_data())
+
+    def save_new_items(self, tree, items):
+        """把新建的条目（父项在前）在一个事务中写入数据库，并记下各自的 id"""
+        tree_key = self.tree_key(tree)
+        tree.blockSignals(True)
         try:
-            with open(RULES_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.dict_to_tree(data.get("normal", []), self.normal_rules_tree)
-            self.dict_to_tree(data.get("special", []), self.special_rules_tree)
-        except (json.JSONDecodeError, FileNotFoundError):
-            # In case of corruption or other errors, data remains {}
-            pass
-
-        self.rules_updated.emit(data)
-
-    def save_data(self):
-        data = self.get_data()
-        with open(RULES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        self.rules_updated.emit(data)
+            with self.db.batch():
+                for item in items:
+                    parent = item.parent()
+                    parent_id = parent.data(0, ITEM_ID_ROLE) if parent else None
+                    item_id = self.db.add_tree_item(tree_key, parent_id, item.text(0), item.text(1), item.text(2))
+                    item.setData(0, ITEM_ID_ROLE, item_id)
+        finally:
+            tree.blockSignals(False)
 
     def tree_to_dict(self, tree):
         def recurse(parent_item):
@@ -310,11 +320,14 @@ class WealthRulesTab(QWidget):
                     str(item_data.get("reward", "0"))
                 ])
                 child_item.setFlags(child_item.flags() | Qt.ItemFlag.ItemIsEditable)
+                child_item.setData(0, ITEM_ID_ROLE, item_data.get("id"))
                 recurse(child_item, item_data.get("children", []))
 
         if tree is None: return
+        tree.blockSignals(True)
         tree.clear()
         recurse(tree.invisibleRootItem(), data)
+        tree.blockSignals(False)
 
     def import_data(self):
         items = [f"普通({self.term})奖励", f"特殊({self.term})奖励"]
@@ -339,70 +352,78 @@ class WealthRulesTab(QWidget):
         if not openpyxl:
             QMessageBox.critical(self, "缺少库", "导入功能需要 'openpyxl' 库。\n请通过命令 'pip install openpyxl' 安装。")
             return
-        try:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-
-            expected_header1 = "规则内容"
-            expected_header2 = "对应奖励"
-            expected_header3 = f"对应{self.term}"
-
-            if (sheet["A1"].value != expected_header1 or
-                    sheet["B1"].value != expected_header2 or
-                    sheet["C1"].value != expected_header3):
-                QMessageBox.warning(self, "格式错误",
-                                    f"导入的Excel文件格式不正确。\n第一行应为 '{expected_header1}', '{expected_header2}' 和 '{expected_header3}'。")
-                return
+        if self.excel_job is not None:
+            QMessageBox.information(self, "请稍候", "上一次导入或导出还没有完成。")
+            return
 
-            parent_stack = [tree.invisibleRootItem()]
-            imported_count = 0
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if len(row) < 3: continue
-
-                plan_text, reward_text, reward_val = (
-                    str(row[0]) if row[0] is not None else "",
-                    str(row[1]) if row[1] is not None else "",
-                    row[2]
-                )
-                if not plan_text: continue
-
-                try:
-                    reward_int = int(reward_val) if reward_val is not None else 0
-                except (ValueError, TypeError):
-                    continue
-
-                leading_spaces = len(plan_text) - len(plan_text.lstrip(' '))
-                level = leading_spaces // 2
-                clean_plan_text = plan_text.lstrip(' ')
-
-                while level < len(parent_stack) - 1:
-                    parent_stack.pop()
-                if level > len(parent_stack) - 1:
-                    level = len(parent_stack) - 1
-
-                parent = parent_stack[level]
-                new_item = QTreeWidgetItem(parent, [clean_plan_text, reward_text, str(reward_int)])
-                new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
-
-                if len(parent_stack) > level + 1:
-                    parent_stack[level + 1] = new_item
-                else:
-                    parent_stack.append(new_item)
-                imported_count += 1
-
-            if imported_count > 0:
-                self.save_data()
-                QMessageBox.information(self, "成功", f"成功合并导入 {imported_count} 条规则到 {tree_name}。")
+        headers = ("规则内容", "对应奖励", f"对应{self.term}")
+        job = TreeExcelImport(tree, file_path, headers, self.parse_excel_row, self.save_new_items, self)
+
+        def on_format_error():
+            self.finish_excel_job()
+            QMessageBox.warning(self, "格式错误",
+                                f"导入的Excel文件格式不正确。\n第一行应为 '{headers[0]}', '{headers[1]}' 和 '{headers[2]}'。")
+
+        def on_finished(count, cancelled):
+            self.finish_excel_job()
+            if count:
+                self.notify_updated()
+            if cancelled:
+                QMessageBox.information(self, "已取消", f"导入已取消，已合并导入 {count} 条规则到 {tree_name}。")
+            elif count:
+                QMessageBox.information(self, "成功", f"成功合并导入 {count} 条规则到 {tree_name}。")
             else:
                 QMessageBox.warning(self, "导入提示", "在文件中没有找到有效的数据行。")
 
-        except Exception as e:
-            QMessageBox.critical(self, "导入失败", f"导入过程中发生错误: {e}")
+        def on_failed(message):
+            self.finish_excel_job()
+            if job.imported:
+                self.notify_updated()
+            QMessageBox.critical(self, "导入失败", message)
+
+        job.format_error.connect(on_format_error)
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self.excel_job = job
+        job.start()
+
+    @staticmethod
+    def parse_excel_row(row):
+        """在导入线程中把一行转换为 (层级, [规则内容, 对应奖励, 对应值])，无效行返回 None"""
+        # 只读模式下末尾的空单元格不会返回，补齐到三列
+        row = tuple(row) + (None,) * (3 - len(row))
+        plan_text = str(row[0]) if row[0] is not None else ""
+        if not plan_text: return None
+
+        try:
+            reward_int = int(row[2]) if row[2] is not None else 0
+        except (ValueError, TypeError):
+            return None
+
+        level, clean_plan_text = split_indent(plan_text)
+        return level, [clean_plan_text, str(row[1]) if row[1] is not None else "", str(reward_int)]
+
+    @staticmethod
+    def excel_row(level, texts):
+        """在导出线程中生成一行，对应值能转换为整数时按数字写入"""
+        plan_text, reward_text, reward_val_str = texts
+        try:
+            reward_val = int(reward_val_str)
+        except (ValueError, TypeError):
+            reward_val = reward_val_str
+        return ["  " * level + plan_text, reward_text, reward_val]
+
+    def finish_excel_job(self):
+        self.excel_job.deleteLater()
+        self.excel_job = None
 
     def export_data(self):
         if not openpyxl:
             QMessageBox.critical(self, "缺少库", "导出功能需要 'openpyxl' 库。\n请通过命令 'pip install openpyxl' 安装。")
             return
+        if self.excel_job is not None:
+            QMessageBox.information(self, "请稍候", "上一次导入或导出还没有完成。")
+            return
 
         items = [f"普通({self.term})奖励", f"特殊({self.term})奖励"]
         item, ok = QInputDialog.getItem(self, "选择导出", "您想从哪个列表导出规则？", items, 0, False)
@@ -417,41 +438,18 @@ class WealthRulesTab(QWidget):
         if not file_path:
             return
 
-        try:
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = default_name
-
-            sheet["A1"] = "规则内容"
-            sheet["B1"] = "对应奖励"
-            sheet["C1"] = f"对应{self.term}"
-            sheet.column_dimensions[get_column_letter(1)].width = 50
-            sheet.column_dimensions[get_column_letter(2)].width = 30
-            sheet.column_dimensions[get_column_letter(3)].width = 15
-
-            def write_items_recursive(parent_item, current_row, level=0):
-                for i in range(parent_item.childCount()):
-                    item = parent_item.child(i)
-                    indent = "  " * level
-                    plan_text = f"{indent}{item.text(0)}"
-                    reward_text = item.text(1)
-                    reward_val_str = item.text(2)
-
-                    sheet[f"A{current_row}"] = plan_text
-                    sheet[f"B{current_row}"] = reward_text
-                    try:
-                        sheet[f"C{current_row}"] = int(reward_val_str)
-                    except (ValueError, TypeError):
-                        sheet[f"C{current_row}"] = reward_val_str
-
-                    current_row += 1
-                    current_row = write_items_recursive(item, current_row, level + 1)
-                return current_row
-
-            write_items_recursive(tree.invisibleRootItem(), 2)
-            workbook.save(file_path)
+        job = TreeExcelExport(tree, 3, file_path, default_name, ("规则内容", "对应奖励", f"对应{self.term}"),
+                              (50, 30, 15), self.excel_row, self)
+
+        def on_finished(count, cancelled):
+            self.finish_excel_job()
             QMessageBox.information(self, "成功", f"{default_name} 已成功导出到:\n{file_path}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "导出失败", f"导出过程中发生错误: {e}")
+        def on_failed(message):
+            self.finish_excel_job()
+            QMessageBox.critical(self, "导出失败", message)
 
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self.excel_job = job
+        job.start()
@@ -1,7 +1,13 @@
 # config.py
+import atexit
 import json
+import os
+import threading
+from contextlib import contextmanager
 
 CONFIG_FILE = "config.json"
+# 修改后延迟多久写盘；这段时间内的连续修改会合并成一次写入
+FLUSH_DELAY_SEC = 0.5
 
 
 class ConfigManager:
@@ -54,6 +60,8 @@ class ConfigManager:
 
             "developer_debug_mode": False,
             "auto_cycle_enabled": False,
+            # 当前任务标签，完成的番茄会记在该任务下（为空则不归属任务）
+            "current_task": "",
 
             # **新增**: UI 元素显隐开关
             "show_custom_text": True,
@@ -63,7 +71,24 @@ class ConfigManager:
             "compact_mode_enabled": False
         }
         self.settings = self.defaults.copy()
+
+        # 写盘相关：脏标记 + 防抖定时器，真正的写入在后台线程完成
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer = None
+        # 后台定时器和退出/同步写盘可能同时写文件：用单独的锁串行化，
+        # 并给每个快照编号，比已写入的更旧的快照直接丢弃
+        self._write_lock = threading.Lock()
+        self._snapshot_version = 0
+        self._written_version = 0
+
+        # 批量修改与按键通知
+        self._batch_depth = 0
+        self._batch_changes = set()
+        self._listeners = []
+
         self.load_settings()
+        atexit.register(self.flush)
 
     def load_settings(self):
         try:
@@ -77,18 +102,90 @@ class ConfigManager:
             self.save_settings()
 
     def save_settings(self):
-        try:
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=4)
-        except IOError as e:
-            print(f"Error saving settings: {e}")
+        """立即同步写盘"""
+        with self._lock:
+            snapshot = self._take_snapshot()
+        self._write(*snapshot)
+
+    def _take_snapshot(self):
+        """在 _lock 内调用：复制当前设置并编号"""
+        self._dirty = False
+        self._snapshot_version += 1
+        return dict(self.settings), self._snapshot_version
+
+    def _write(self, snapshot, version):
+        with self._write_lock:
+            if version <= self._written_version:
+                return
+            # 先写临时文件再替换，避免写到一半时程序退出导致配置损坏
+            tmp_file = CONFIG_FILE + ".tmp"
+            try:
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_file, CONFIG_FILE)
+                self._written_version = version
+            except IOError as e:
+                print(f"Error saving settings: {e}")
+
+    def _schedule_flush(self):
+        """标记为脏并（重新）启动防抖定时器"""
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(FLUSH_DELAY_SEC, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """如果有未写入的修改，立即写盘（程序退出时也会自动调用）"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            snapshot = self._take_snapshot()
+        self._write(*snapshot)
 
     def get(self, key):
         return self.settings.get(key, self.defaults.get(key))
 
     def set(self, key, value):
-        self.settings[key] = value
-        self.save_settings()
+        if key in self.settings and self.settings[key] == value:
+            return
+        with self._lock:
+            self.settings[key] = value
+        if self._batch_depth:
+            self._batch_changes.add(key)
+            return
+        self._schedule_flush()
+        self._notify({key})
+
+    @contextmanager
+    def batch(self):
+        """
+        批量修改：with config.batch() as changed: ...
+        期间的 set 只记录，退出时统一安排一次写盘并发出一次通知；changed 为实际变化的键。
+        """
+        self._batch_depth += 1
+        try:
+            yield self._batch_changes
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_changes:
+                # 换成新的集合而不是清空，with 块之后 changed 仍然是本次变化的键
+                changed, self._batch_changes = self._batch_changes, set()
+                self._schedule_flush()
+                self._notify(changed)
+
+    def subscribe(self, callback):
+        """注册修改通知，callback 接收本次变化的键集合"""
+        self._listeners.append(callback)
+
+    def _notify(self, changed_keys):
+        for callback in list(self._listeners):
+            callback(changed_keys)
 
 
 config = ConfigManager()
\ No newline at end of file
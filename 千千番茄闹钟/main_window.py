@@ -1,20 +1,23 @@
 # main_window.py
 import sys
 import os
-import random
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QFrame, QApplication, QMessageBox,
+    QLabel, QPushButton, QFrame, QApplication,
     QSizePolicy
 )
-from PyQt6.QtCore import Qt, QSize, QUrl, QTimer
+from PyQt6.QtCore import Qt, QSize, QTimer, QEvent
 from PyQt6.QtGui import QFont, QColor, QIcon
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 
 import qtawesome as qta
 
 from timer_engine import TimerEngine, TimerState, PomodoroPhase
 from settings_dialog import SettingsDialog
+from stats_dialog import StatsDialog
+from session_log import SessionLog
+from sound_cache import SoundCache
+from sound_library import SoundLibrary
+from notification import NotificationToast
 from config import config
 
 
@@ -34,11 +37,9 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.settings_dialog = None
-        self.work_player = None
-        self.break_player = None
-        self.long_break_player = None
-        self.random_player = None
-        self.random_sound_list = []
+        self.notification_toast = None
+        self.sound_cache = None
+        self.sound_library = None
         self.has_run_once = False
         self.drag_position = None
 
@@ -47,7 +48,9 @@ class MainWindow(QMainWindow):
         self.init_sound()
 
         # 首次加载，执行一次全部刷新
-        self.apply_settings(full_reload=True)
+        self.apply_settings()
+        # 之后只根据实际变化的配置项刷新
+        config.subscribe(self.on_config_changed)
 
     def init_ui(self):
         self.setWindowTitle("番茄计时器")
@@ -115,14 +118,17 @@ class MainWindow(QMainWindow):
         self.app_title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.settings_button = QPushButton(qta.icon("fa5s.cog", color="gray"), "")
         self.settings_button.setObjectName("iconButton")
+        self.stats_button = QPushButton(qta.icon("fa5s.chart-bar", color="gray"), "")
+        self.stats_button.setObjectName("iconButton")
 
-        for btn in [self.exit_button, self.settings_button]:
+        for btn in [self.exit_button, self.stats_button, self.settings_button]:
             btn.setFixedSize(26, 26)
 
         bottom_layout.addWidget(self.exit_button, 0, Qt.AlignmentFlag.AlignLeft)
         bottom_layout.addStretch(1)
         bottom_layout.addWidget(self.app_title_label)
         bottom_layout.addStretch(1)
+        bottom_layout.addWidget(self.stats_button, 0, Qt.AlignmentFlag.AlignRight)
         bottom_layout.addWidget(self.settings_button, 0, Qt.AlignmentFlag.AlignRight)
 
         self.main_layout.addWidget(self.timer_label)
@@ -132,6 +138,7 @@ class MainWindow(QMainWindow):
 
         self.exit_button.clicked.connect(QApplication.instance().quit)
         self.settings_button.clicked.connect(self.open_settings)
+        self.stats_button.clicked.connect(self.open_stats)
 
     def init_timer_logic(self):
         self.timer_engine = TimerEngine()
@@ -140,37 +147,69 @@ class MainWindow(QMainWindow):
         self.timer_engine.cycle_finished.connect(self.handle_cycle_finish)
         self.timer_engine.state_changed.connect(self.update_button_states)
 
+        # 每次开始、暂停、完成、重置都写入本地会话日志
+        self.session_log = SessionLog()
+        self.timer_engine.session_event.connect(
+            lambda event, phase, elapsed: self.session_log.record(
+                event, phase.name, elapsed, task=config.get("current_task")))
+
         self.start_button.clicked.connect(self.handle_start_click)
         self.pause_button.clicked.connect(self.handle_pause_click)
         self.reset_button.clicked.connect(self.handle_reset_click)
 
     def init_sound(self):
-        self.work_player = self._create_player()
-        self.break_player = self._create_player()
-        self.long_break_player = self._create_player()
-        self.random_player = self._create_player()
-
-    def _create_player(self):
-        player = QMediaPlayer()
-        audio_output = QAudioOutput()
-        player.setAudioOutput(audio_output)
-        return player, audio_output
-
-    # --- 修改: 为 apply_settings 添加 full_reload 参数 ---
-    def apply_settings(self, full_reload=False):
+        # 提示音提前加载到缓存中，阶段结束时直接播放
+        self.sound_cache = SoundCache(parent=self)
+        # 随机提示音库：带缓存的索引，文件夹变化时自动增量更新
+        self.sound_library = SoundLibrary(parent=self)
+        self.sound_library.changed.connect(self.preload_random_sounds)
+
+    def preload_random_sounds(self):
+        """只预加载洗牌顺序里接下来的几首，留一个位置给正在播放的那首"""
+        self.sound_cache.preload(self.sound_library.upcoming(self.sound_cache.max_sounds - 1))
+
+    # 每个配置项影响的子系统；没有列出的配置项（通知文字、自动循环等）在使用时才读取，无需刷新
+    SETTING_SUBSYSTEMS = {
+        "timer": {"work_minutes", "break_minutes", "long_break_minutes", "pomodoros_per_cycle",
+                  "developer_debug_mode"},
+        "work_sound": {"work_sound_path"},
+        "break_sound": {"break_sound_path"},
+        "long_break_sound": {"long_break_sound_path"},
+        "random_sound": {"random_sound_enabled", "random_sound_folder_path"},
+        "text": {"custom_text"},
+        "style": {"work_color", "break_color", "long_break_color", "timer_text_color",
+                  "custom_text_color", "custom_text_font_family", "custom_text_font_size",
+                  "compact_mode_enabled"},
+        "layout": {"show_custom_text", "show_app_title", "compact_mode_enabled"},
+        "window": {"always_on_top"},
+    }
+
+    def on_config_changed(self, changed_keys):
+        self.apply_settings(changed_keys)
+
+    def _affected_subsystems(self, changed_keys):
+        if changed_keys is None:
+            return set(self.SETTING_SUBSYSTEMS)
+        return {name for name, keys in self.SETTING_SUBSYSTEMS.items() if keys & changed_keys}
+
+    def apply_settings(self, changed_keys=None):
         """
-        应用设置。
-        :param full_reload: True 表示重新加载所有设置（包括声音），False 表示仅更新UI。
+        应用设置，只重建受影响的部分。
+        :param changed_keys: 本次变化的配置项集合；None 表示全部重新应用（首次加载）。
         """
-        is_on_top = config.get("always_on_top")
-        self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, is_on_top)
+        subsystems = self._affected_subsystems(changed_keys)
 
-        self.update_ui_visibility()
+        if "window" in subsystems:
+            is_on_top = config.get("always_on_top")
+            if bool(self.windowFlags() & Qt.WindowType.WindowStaysOnTopHint) != is_on_top:
+                self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, is_on_top)
+                # 修改窗口标志会隐藏窗口，需要重新显示
+                self.show()
 
-        self.show()
+        if "layout" in subsystems:
+            self.update_ui_visibility()
 
-        # 只有在需要完全重新加载时，才更新计时器和声音配置
-        if full_reload:
+        if "timer" in subsystems:
             self.timer_engine.set_durations(
                 work_mins=config.get("work_minutes"),
                 break_mins=config.get("break_minutes"),
@@ -179,22 +218,37 @@ class MainWindow(QMainWindow):
                 is_debug=config.get("developer_debug_mode")
             )
 
+        if "text" in subsystems:
             self.custom_text_label.setText(config.get("custom_text"))
 
-            self._configure_player(self.work_player, config.get("work_sound_path"), config.get("work_sound_volume"))
-            self._configure_player(self.break_player, config.get("break_sound_path"), config.get("break_sound_volume"))
-            self._configure_player(self.long_break_player, config.get("long_break_sound_path"),
-                                   config.get("long_break_sound_volume"))
+        # 音量在播放时读取，只有文件路径变化才需要重新加载
+        for name in ("work_sound", "break_sound", "long_break_sound"):
+            if name in subsystems:
+                self.sound_cache.pin(name, config.get(f"{name}_path"))
 
+        if "random_sound" in subsystems:
             self.load_random_sounds()
 
-        # 每次都更新样式和按钮状态
-        self.update_styles()
-        self.update_button_states(self.timer_engine.state)
-        self.update_timer_display(self.timer_engine.get_formatted_time())
-
-        if not config.get("compact_mode_enabled"):
-            QTimer.singleShot(1, self.adjustSize)
+        if "style" in subsystems:
+            self.update_styles()
+        if "timer" in subsystems:
+            self.update_button_states(self.timer_engine.state)
+            self.update_timer_display(self.timer_engine.get_formatted_time())
+
+        if "layout" in subsystems:
+            if not config.get("compact_mode_enabled"):
+                QTimer.singleShot(1, self.adjustSize)
+            self.update_tick_granularity()
+
+    def update_tick_granularity(self):
+        """根据窗口是否可见、是否为精简模式，决定计时器多久醒来一次"""
+        if not self.isVisible() or self.isMinimized():
+            granularity = None
+        elif config.get("compact_mode_enabled") and not self.isActiveWindow():
+            granularity = 60
+        else:
+            granularity = 1
+        self.timer_engine.set_tick_granularity(granularity)
 
     def update_ui_visibility(self):
         is_compact = config.get("compact_mode_enabled")
@@ -221,24 +275,9 @@ class MainWindow(QMainWindow):
             self.main_layout.setContentsMargins(20, 20, 20, 20)
             self.main_layout.setSpacing(15)
 
-    def _configure_player(self, player_tuple, path, volume):
-        player, audio_output = player_tuple
-        if path and os.path.exists(path):
-            player.setSource(QUrl.fromLocalFile(path))
-        else:
-            player.setSource(QUrl())
-
-        safe_volume = volume if volume is not None else 80
-        audio_output.setVolume(safe_volume / 100.0)
-
     def load_random_sounds(self):
-        self.random_sound_list = []
         folder_path = config.get("random_sound_folder_path")
-        if config.get("random_sound_enabled") and folder_path and os.path.isdir(folder_path):
-            supported_formats = ('.mp3', '.wav', '.ogg', '.flac')
-            for filename in os.listdir(folder_path):
-                if filename.lower().endswith(supported_formats):
-                    self.random_sound_list.append(os.path.join(folder_path, filename))
+        self.sound_library.set_folder(folder_path if config.get("random_sound_enabled") else None)
 
     def update_styles(self):
         phase_colors = {
@@ -294,27 +333,13 @@ class MainWindow(QMainWindow):
         self.timer_label.setText(time_str)
 
     def show_notification(self, title, text):
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle(title)
-        msg_box.setText(text)
-        msg_box.setIcon(QMessageBox.Icon.Information)
-        msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-        screen = QApplication.primaryScreen()
-        if screen:
-            center_point = screen.geometry().center()
-            hint_size = msg_box.sizeHint()
-            msg_box.move(int(center_point.x() - hint_size.width() / 2), int(center_point.y() - hint_size.height() / 2))
-
-        msg_box.exec()
-
-        if config.get("auto_cycle_enabled"):
-            QTimer.singleShot(500, self.start_button.click)
+        # 非模态提醒，不会挡住事件循环，自动循环不必等它关闭
+        if self.notification_toast is None:
+            self.notification_toast = NotificationToast(parent=self)
+        self.notification_toast.show_message(title, text)
 
     def stop_all_sounds(self):
-        self.work_player[0].stop()
-        self.break_player[0].stop()
-        self.long_break_player[0].stop()
-        self.random_player[0].stop()
+        self.sound_cache.stop_all()
 
     def play_notification_sound(self, phase):
         if not config.get("sound_notification"):
@@ -322,29 +347,26 @@ class MainWindow(QMainWindow):
 
         self.stop_all_sounds()
 
-        if config.get("random_sound_enabled") and self.random_sound_list:
-            player_to_play, audio_output = self.random_player
-            random_sound_path = random.choice(self.random_sound_list)
-            player_to_play.setSource(QUrl.fromLocalFile(random_sound_path))
-            random_volume = config.get("random_sound_volume")
-            safe_random_volume = random_volume if random_volume is not None else 80
-            audio_output.setVolume(safe_random_volume / 100.0)
-            player_to_play.play()
+        if config.get("random_sound_enabled") and len(self.sound_library):
+            random_sound_path = self.sound_library.choose()
+            self.sound_cache.play(random_sound_path, config.get("random_sound_volume"))
+            self.preload_random_sounds()
         else:
-            player_tuple_to_play = None
-            if phase == PomodoroPhase.WORK:
-                player_tuple_to_play = self.work_player
-            elif phase == PomodoroPhase.BREAK:
-                player_tuple_to_play = self.break_player
-            elif phase == PomodoroPhase.LONG_BREAK:
-                player_tuple_to_play = self.long_break_player
-
-            if player_tuple_to_play:
-                player, _ = player_tuple_to_play
-                if not player.source().isEmpty():
-                    player.play()
+            sound_names = {
+                PomodoroPhase.WORK: "work_sound",
+                PomodoroPhase.BREAK: "break_sound",
+                PomodoroPhase.LONG_BREAK: "long_break_sound",
+            }
+            name = sound_names.get(phase)
+            if name:
+                self.sound_cache.play_pinned(name, config.get(f"{name}_volume"))
 
     def handle_phase_finish(self, phase):
+        # 自动循环：从上一阶段的截止时刻接着计时，不受提醒和声音的影响
+        if config.get("auto_cycle_enabled"):
+            self.has_run_once = True
+            self.timer_engine.start_timer(at=self.timer_engine.last_deadline)
+
         self.play_notification_sound(phase)
 
         if config.get("desktop_notification"):
@@ -360,8 +382,6 @@ class MainWindow(QMainWindow):
             title = title_map.get(phase)
             if text and title:
                 self.show_notification(title, text)
-        elif config.get("auto_cycle_enabled"):
-            QTimer.singleShot(500, self.start_button.click)
 
     def handle_cycle_finish(self):
         self.play_notification_sound(PomodoroPhase.LONG_BREAK)
@@ -370,8 +390,6 @@ class MainWindow(QMainWindow):
             title = "一轮完成！"
             text = config.get("long_break_finish_text")
             self.show_notification(title, text)
-        elif config.get("auto_cycle_enabled"):
-            pass
 
     def update_button_states(self, state):
         is_pristine_state = not self.has_run_once
@@ -397,12 +415,14 @@ class MainWindow(QMainWindow):
     # --- 修改: 修改 open_settings ---
     def open_settings(self):
         if self.settings_dialog is None:
+            # 设置保存后由 config 的修改通知触发刷新（见 on_config_changed）
             self.settings_dialog = SettingsDialog(self)
-            # 当设置改变时，执行一次“全部刷新”
-            self.settings_dialog.settings_changed.connect(lambda: self.apply_settings(full_reload=True))
         self.settings_dialog.load_settings()
         self.settings_dialog.exec()
 
+    def open_stats(self):
+        StatsDialog(self.session_log, self).exec()
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.drag_position = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
@@ -422,16 +442,26 @@ class MainWindow(QMainWindow):
         is_compact = config.get("compact_mode_enabled")
 
         if not is_compact and self.timer_label.underMouse():
+            # 修改通知会触发 on_config_changed，只刷新UI，不重新加载声音等配置
             config.set("compact_mode_enabled", True)
-            # 只刷新UI，不重新加载声音等配置
-            self.apply_settings(full_reload=False)
         elif is_compact:
             config.set("compact_mode_enabled", False)
-            # 只刷新UI，不重新加载声音等配置
-            self.apply_settings(full_reload=False)
 
         super().mouseDoubleClickEvent(event)
 
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.ActivationChange):
+            self.update_tick_granularity()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_tick_granularity()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_tick_granularity()
+
     def resizeEvent(self, event):
         if config.get("compact_mode_enabled"):
             font_size = max(12, int(min(self.width(), self.height()) / 2.2))
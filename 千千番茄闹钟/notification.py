@@ -0,0 +1,58 @@
+# notification.py
+# 非模态的阶段提醒：在屏幕右下角弹出一个不抢焦点的小窗口，几秒后自动消失，点击可提前关闭。
+# 它不会阻塞事件循环，计时器和自动循环在提醒显示期间照常运行。
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QApplication
+from PyQt6.QtCore import Qt, QTimer
+
+# 提醒显示多久后自动关闭
+TOAST_DURATION_MS = 10000
+# 与屏幕边缘的距离
+TOAST_MARGIN = 24
+
+
+class NotificationToast(QWidget):
+    def __init__(self, duration_ms=TOAST_DURATION_MS, parent=None):
+        # 独立的顶层小窗口：无边框、总在最前、不出现在任务栏
+        super().__init__(parent, Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint
+                         | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setObjectName("notificationToast")
+        self.setStyleSheet("""
+            #notificationToast { background-color: white; border: 1px solid #E0E0E0; border-radius: 8px; }
+            #toastTitle { font-size: 15px; font-weight: bold; color: black; }
+            #toastText { font-size: 13px; color: #444444; }
+        """)
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 12, 16, 12)
+        self.title_label = QLabel()
+        self.title_label.setObjectName("toastTitle")
+        self.text_label = QLabel()
+        self.text_label.setObjectName("toastText")
+        self.text_label.setWordWrap(True)
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.text_label)
+        self.setFixedWidth(300)
+
+        self._hide_timer = QTimer(self)
+        self._hide_timer.setSingleShot(True)
+        self._hide_timer.setInterval(duration_ms)
+        self._hide_timer.timeout.connect(self.hide)
+
+    def show_message(self, title, text):
+        """显示（或替换为）新的提醒，并重新开始计时自动关闭"""
+        self.title_label.setText(title)
+        self.text_label.setText(text)
+        self.adjustSize()
+        screen = QApplication.primaryScreen()
+        if screen:
+            area = screen.availableGeometry()
+            self.move(area.right() - self.width() - TOAST_MARGIN, area.bottom() - self.height() - TOAST_MARGIN)
+        self.show()
+        self.raise_()
+        self._hide_timer.start()
+
+    def mousePressEvent(self, event):
+        self._hide_timer.stop()
+        self.hide()
@@ -0,0 +1,230 @@
+# pomodoro_core.py
+# 番茄钟的纯 Python 核心：状态机 + 单调时钟上的截止时间，不依赖 Qt。
+# 时钟可以注入（默认 time.monotonic），测试时用 VirtualClock 直接快进，不必打开调试模式的 1 秒阶段。
+# 核心自己不会"醒来"，由驱动方（Qt 的 TimerEngine 或无界面的 pomodoro_daemon）
+# 在 next_deadline() 到达时调用 advance()，状态变化通过 subscribe 注册的回调通知出去。
+import math
+import time
+from enum import Enum, auto
+
+# 回调收到的事件名
+EVENT_TIME_CHANGED = "time_changed"        # 剩余时间发生跳变（切换阶段、重置）
+EVENT_STATE_CHANGED = "state_changed"      # (TimerState)
+EVENT_TIMER_STARTED = "timer_started"
+EVENT_PHASE_FINISHED = "phase_finished"    # (PomodoroPhase)
+EVENT_CYCLE_FINISHED = "cycle_finished"
+EVENT_SESSION = "session_event"            # (start/pause/finish/reset, PomodoroPhase, 秒数)
+
+# start(at=...) 的起点最多比现在早多少秒（一个刷新周期）；更早说明中间睡眠或卡住了，
+# 这时从现在开始计时，错过的阶段不补触发也不记录
+MAX_START_LAG_SEC = 1.0
+
+
+class TimerState(Enum):
+    STOPPED = auto()
+    RUNNING = auto()
+    PAUSED = auto()
+
+
+class PomodoroPhase(Enum):
+    WORK = auto()
+    BREAK = auto()
+    LONG_BREAK = auto()
+
+
+class VirtualClock:
+    """可手动快进的时钟，用来代替 time.monotonic 做测试或脚本演示"""
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+        return self.now
+
+
+class PomodoroCore:
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._listeners = []
+
+        self._work_duration_sec = 25 * 60
+        self._break_duration_sec = 5 * 60
+        self._long_break_duration_sec = 15 * 60
+        self._pomodoros_per_cycle = 4
+
+        self._pomodoros_completed = 0
+        # 未运行时保存剩余秒数；运行时以时钟上的截止时间为准，剩余时间由它推算
+        self._remaining_sec = self._work_duration_sec
+        self._deadline = None
+        self._last_deadline = None
+        self._segment_start = None
+        self._state = TimerState.STOPPED
+        self._phase = PomodoroPhase.WORK
+
+    # --- 通知 ---
+    def subscribe(self, callback):
+        """注册回调 callback(event, *args)"""
+        self._listeners.append(callback)
+
+    def _emit(self, event, *args):
+        for callback in list(self._listeners):
+            callback(event, *args)
+
+    # --- 查询 ---
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def phase(self):
+        return self._phase
+
+    @property
+    def pomodoros_completed(self):
+        return self._pomodoros_completed
+
+    def now(self):
+        return self._clock()
+
+    @property
+    def last_deadline(self):
+        """最近一次结束的阶段的截止时间，自动循环时用作下一阶段的起点"""
+        return self._last_deadline
+
+    def next_deadline(self):
+        """运行中返回当前阶段结束的时钟时间，否则返回 None"""
+        return self._deadline
+
+    def remaining_seconds(self):
+        """当前阶段的精确剩余时间（秒，浮点数）"""
+        if self._deadline is not None:
+            return max(0.0, self._deadline - self._clock())
+        return self._remaining_sec
+
+    def format_remaining(self, granularity=1):
+        # 向上取整：刚开始时显示完整时长，归零的那一刻正好是阶段结束
+        remaining = self.remaining_seconds()
+        if granularity == 60:
+            # 每分钟才刷新一次时只显示分钟，避免停在过时的秒数上
+            return f"{math.ceil(remaining / 60):02d}分"
+        total_seconds = math.ceil(remaining)
+        minutes = total_seconds // 60
+        seconds = total_seconds % 60
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def snapshot(self):
+        """当前状态的简单字典，供控制接口返回"""
+        return {
+            "state": self._state.name,
+            "phase": self._phase.name,
+            "remaining_sec": round(self.remaining_seconds(), 3),
+            "display": self.format_remaining(),
+            "pomodoros_completed": self._pomodoros_completed,
+            "pomodoros_per_cycle": self._pomodoros_per_cycle,
+        }
+
+    # --- 驱动 ---
+    def advance(self):
+        """检查当前阶段是否已经到点；到点则结束该阶段并返回 True"""
+        if self._deadline is None or self._clock() < self._deadline:
+            return False
+
+        # 以截止时间而不是实际醒来的时间计算本段时长，迟到的唤醒不影响统计
+        elapsed = self._deadline - self._segment_start
+        self._last_deadline = self._deadline
+        self._deadline = None
+        self._segment_start = None
+        current_phase = self._phase
+        self._emit(EVENT_SESSION, "finish", current_phase, elapsed)
+
+        if current_phase == PomodoroPhase.WORK:
+            self._pomodoros_completed += 1
+
+        if current_phase == PomodoroPhase.LONG_BREAK:
+            self._emit(EVENT_CYCLE_FINISHED)
+            self.reset()
+        else:
+            self._switch_phase()
+            self._set_state(TimerState.STOPPED)
+            self._emit(EVENT_PHASE_FINISHED, current_phase)
+        return True
+
+    def _switch_phase(self):
+        if self._phase == PomodoroPhase.WORK:
+            if self._pomodoros_completed >= self._pomodoros_per_cycle:
+                self._phase = PomodoroPhase.LONG_BREAK
+                self._remaining_sec = self._long_break_duration_sec
+            else:
+                self._phase = PomodoroPhase.BREAK
+                self._remaining_sec = self._break_duration_sec
+        else:
+            self._phase = PomodoroPhase.WORK
+            self._remaining_sec = self._work_duration_sec
+
+        self._emit(EVENT_TIME_CHANGED)
+
+    # --- 控制 ---
+    def start(self, at=None):
+        """
+        开始或从暂停恢复计时。
+        :param at: 本段计时的起点（时钟时间），默认为现在；自动循环时传入上一阶段的截止时间，
+                   这样下一阶段严格从边界开始，处理提醒花掉的时间不会累积到后面。
+                   起点比现在早超过 MAX_START_LAG_SEC 时改为从现在开始。
+        """
+        if self._state != TimerState.RUNNING:
+            now = self._clock()
+            self._segment_start = now if at is None or now - at > MAX_START_LAG_SEC else at
+            self._deadline = self._segment_start + self._remaining_sec
+            self._emit(EVENT_SESSION, "start", self._phase, 0.0)
+            self._set_state(TimerState.RUNNING)
+            self._emit(EVENT_TIMER_STARTED)
+
+    def pause(self):
+        if self._state == TimerState.RUNNING:
+            self._remaining_sec = self.remaining_seconds()
+            self._deadline = None
+            self._emit(EVENT_SESSION, "pause", self._phase, self._take_segment())
+            self._set_state(TimerState.PAUSED)
+
+    def _take_segment(self):
+        """结束当前连续计时段，返回它的时长（未在计时则为 0）"""
+        if self._segment_start is None:
+            return 0.0
+        elapsed = self._clock() - self._segment_start
+        self._segment_start = None
+        return elapsed
+
+    def reset(self):
+        # 只有正在计时或已暂停的阶段被重置才算一次中断；阶段结束后的自动重置不记录
+        if self._deadline is not None or self._state == TimerState.PAUSED:
+            self._emit(EVENT_SESSION, "reset", self._phase, self._take_segment())
+        self._deadline = None
+        self._pomodoros_completed = 0
+        self._phase = PomodoroPhase.WORK
+        self._remaining_sec = self._work_duration_sec
+        self._set_state(TimerState.STOPPED)
+        self._emit(EVENT_TIME_CHANGED)
+
+    def set_durations(self, work_mins, break_mins, long_break_mins, pomos_per_cycle, is_debug=False):
+        self._pomodoros_per_cycle = pomos_per_cycle
+
+        if is_debug:
+            self._work_duration_sec = 1
+            self._break_duration_sec = 1
+            self._long_break_duration_sec = 1
+        else:
+            self._work_duration_sec = work_mins * 60
+            self._break_duration_sec = break_mins * 60
+            self._long_break_duration_sec = long_break_mins * 60
+
+        if self._state == TimerState.STOPPED:
+            self.reset()
+
+    def _set_state(self, new_state):
+        if self._state != new_state:
+            self._state = new_state
+            self._emit(EVENT_STATE_CHANGED, new_state)
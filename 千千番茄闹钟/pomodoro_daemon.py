@@ -0,0 +1,234 @@
+# pomodoro_daemon.py
+# 无界面运行番茄钟，并在本机 HTTP 端口上提供控制接口；同一个文件也是命令行客户端。
+#   python pomodoro_daemon.py serve          # 启动后台计时（读取 config.json 中的时长设置）
+#   python pomodoro_daemon.py status         # 查询状态
+#   python pomodoro_daemon.py start|pause|reset|stop
+#   python pomodoro_daemon.py add --timer 英语 --task 英语        # 再加一个带任务标签的番茄钟
+#   python pomodoro_daemon.py add --timer 喝水 --kind interval --minutes 45
+#   python pomodoro_daemon.py list / remove --timer 喝水
+# 接口：GET /state 返回默认计时器的状态，GET /timers 返回全部计时器；
+#       POST /start、/pause、/reset 操作默认计时器，POST /stop 退出服务；
+#       POST /timers/<名称>（JSON: kind、minutes、task）添加计时器，
+#       POST /timers/<名称>/start|pause|reset|remove 操作指定计时器。
+# 服务端是单线程的：请求处理和所有计时器的到点都在同一个循环里，不需要加锁。
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from config import config
+from pomodoro_core import EVENT_SESSION, EVENT_PHASE_FINISHED
+from pomodoro_scheduler import TimerScheduler, KINDS, KIND_POMODORO, KIND_INTERVAL, EVENT_TIMER_FIRED
+from session_log import SessionLog
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TIMER = "main"
+# 空闲时最多等待多久检查一次退出（Windows 下阻塞的 select 收不到 Ctrl+C）
+POLL_INTERVAL_SEC = 1.0
+
+COMMANDS = ("start", "pause", "reset", "stop")
+TIMER_COMMANDS = ("start", "pause", "reset", "remove")
+PHASE_NAMES = {"WORK": "工作", "BREAK": "休息", "LONG_BREAK": "长休息"}
+STATE_NAMES = {"STOPPED": "已停止", "RUNNING": "计时中", "PAUSED": "已暂停"}
+
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    # 请求在计时循环里处理：连上却不发数据的客户端最多占用这么久，不会卡住计时器
+    timeout = 2
+
+    def do_GET(self):
+        pomodoro = self.server.pomodoro
+        if self.path == "/state":
+            self._reply(200, pomodoro.scheduler.snapshot(DEFAULT_TIMER))
+        elif self.path == "/timers":
+            self._reply(200, pomodoro.scheduler.snapshots())
+        else:
+            self._reply(404, {"error": "unknown path"})
+
+    def do_POST(self):
+        parts = [urllib.parse.unquote(part) for part in self.path.strip("/").split("/")]
+        try:
+            if len(parts) == 1 and parts[0] in COMMANDS:
+                self._reply(200, self.server.pomodoro.handle_command(parts[0]))
+            elif len(parts) == 2 and parts[0] == "timers":
+                length = int(self.headers.get("Content-Length") or 0)
+                options = json.loads(self.rfile.read(length) or b"{}")
+                self._reply(200, self.server.pomodoro.add_timer(parts[1], **options))
+            elif len(parts) == 3 and parts[0] == "timers" and parts[2] in TIMER_COMMANDS:
+                self._reply(200, self.server.pomodoro.handle_command(parts[2], parts[1]))
+            else:
+                self._reply(404, {"error": "unknown command"})
+        except (KeyError, ValueError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 不在控制台打印每个请求
+        pass
+
+
+class PomodoroDaemon:
+    def __init__(self, port=DEFAULT_PORT, scheduler=None, session_log=None):
+        self.scheduler = scheduler or TimerScheduler()
+        self.session_log = session_log if session_log is not None else SessionLog()
+        self.scheduler.subscribe(self._on_timer_event)
+        if DEFAULT_TIMER not in self.scheduler:
+            self.add_timer(DEFAULT_TIMER)
+        self.server = HTTPServer((HOST, port), _ControlHandler)
+        self.server.pomodoro = self
+        self._stopping = False
+
+    def add_timer(self, name, kind=KIND_POMODORO, minutes=None, task=None):
+        if kind not in KINDS:
+            raise ValueError(f"未知的计时器类型: {kind}")
+        if kind == KIND_POMODORO:
+            core = self.scheduler.add_pomodoro(name, task=task)
+            core.set_durations(
+                work_mins=config.get("work_minutes"),
+                break_mins=config.get("break_minutes"),
+                long_break_mins=config.get("long_break_minutes"),
+                pomos_per_cycle=config.get("pomodoros_per_cycle"),
+                is_debug=config.get("developer_debug_mode")
+            )
+        else:
+            if not minutes or float(minutes) <= 0:
+                raise ValueError("倒计时和间隔提醒需要指定分钟数")
+            self.scheduler.add_countdown(name, float(minutes) * 60, task=task, repeat=kind == KIND_INTERVAL)
+        return self.scheduler.snapshot(name)
+
+    def _on_timer_event(self, name, task, event, *args):
+        if event == EVENT_SESSION:
+            session_event, phase, elapsed = args
+            self.session_log.record(session_event, phase.name, elapsed, task=task)
+        elif event == EVENT_PHASE_FINISHED and config.get("auto_cycle_enabled"):
+            # 没有弹窗要等，直接在边界上开始下一阶段
+            timer = self.scheduler.get(name)
+            timer.start(at=timer.last_deadline)
+        elif event == EVENT_TIMER_FIRED:
+            print(f"[{name}] 时间到" + (f"（{task}）" if task else ""), flush=True)
+
+    def handle_command(self, command, name=DEFAULT_TIMER):
+        if command == "stop":
+            self._stopping = True
+            return self.scheduler.snapshot(DEFAULT_TIMER)
+        if command == "remove":
+            if name == DEFAULT_TIMER:
+                raise ValueError("默认计时器不能删除")
+            snapshot = self.scheduler.snapshot(name)
+            self.scheduler.remove(name)
+            return snapshot
+        timer = self.scheduler.get(name)
+        if timer is None:
+            raise KeyError(f"没有名为 {name} 的计时器")
+        getattr(timer, command)()
+        return self.scheduler.snapshot(name)
+
+    def serve_forever(self):
+        try:
+            while not self._stopping:
+                # 睡到下一个请求或最早的计时器到点，二者取先到者
+                timeout = POLL_INTERVAL_SEC
+                deadline = self.scheduler.next_deadline()
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - self.scheduler.now()))
+                self.server.timeout = timeout
+                self.server.handle_request()
+                self.scheduler.advance()
+        finally:
+            self.server.server_close()
+            self.session_log.close()
+
+
+def send_command(command, port=DEFAULT_PORT, timer=DEFAULT_TIMER, options=None, timeout=3.0):
+    """客户端：向本机的守护进程发送命令，返回状态字典（list 返回列表）"""
+    base = f"http://{HOST}:{port}/"
+    data = None
+    if command == "status":
+        url, method = base + ("state" if timer == DEFAULT_TIMER else "timers"), "GET"
+    elif command == "list":
+        url, method = base + "timers", "GET"
+    elif command == "add":
+        url, method = base + "timers/" + urllib.parse.quote(timer), "POST"
+        data = json.dumps(options or {}).encode("utf-8")
+    elif timer == DEFAULT_TIMER and command in COMMANDS:
+        url, method = base + command, "POST"
+    else:
+        url, method = base + f"timers/{urllib.parse.quote(timer)}/{command}", "POST"
+    request = urllib.request.Request(url, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        result = json.loads(response.read().decode("utf-8"))
+    if command == "status" and timer != DEFAULT_TIMER:
+        matches = [info for info in result if info["name"] == timer]
+        if not matches:
+            raise KeyError(f"没有名为 {timer} 的计时器")
+        result = matches[0]
+    return result
+
+
+def format_snapshot(snapshot):
+    state = STATE_NAMES.get(snapshot['state'], snapshot['state'])
+    prefix = f"[{snapshot['name']}] " if snapshot.get("name") else ""
+    task = f" 任务: {snapshot['task']}" if snapshot.get("task") else ""
+    if "phase" not in snapshot:
+        return f"{prefix}{state} {snapshot['display']}{task}"
+    return (f"{prefix}{PHASE_NAMES.get(snapshot['phase'], snapshot['phase'])} {state} {snapshot['display']} "
+            f"(本轮已完成 {snapshot['pomodoros_completed']}/{snapshot['pomodoros_per_cycle']}){task}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面番茄钟及其命令行控制")
+    parser.add_argument("command", choices=("serve", "status", "list", "add", "remove") + COMMANDS)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--timer", default=DEFAULT_TIMER, help="计时器名称")
+    parser.add_argument("--kind", choices=KINDS, default=KIND_POMODORO, help="add 时的计时器类型")
+    parser.add_argument("--minutes", type=float, help="倒计时 / 间隔提醒的分钟数")
+    parser.add_argument("--task", help="任务标签，完成的番茄会记在该任务下")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出状态")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        daemon = PomodoroDaemon(port=args.port)
+        print(f"番茄钟已在 http://{HOST}:{args.port} 上运行，按 Ctrl+C 退出")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    options = {"kind": args.kind, "minutes": args.minutes, "task": args.task}
+    try:
+        result = send_command(args.command, port=args.port, timer=args.timer, options=options)
+    except urllib.error.HTTPError as e:
+        print(json.loads(e.read().decode("utf-8")).get("error", str(e)), file=sys.stderr)
+        return 1
+    except (urllib.error.URLError, OSError) as e:
+        print(f"无法连接到番茄钟服务: {e}", file=sys.stderr)
+        return 1
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    elif isinstance(result, list):
+        for snapshot in result:
+            print(format_snapshot(snapshot))
+    else:
+        print(format_snapshot(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# pomodoro_scheduler.py
+# 多个具名计时器（带任务标签的番茄钟、倒计时、间隔提醒）共用一个按截止时间排序的小顶堆，
+# 驱动方只需要一个唤醒源：睡到 next_deadline()，醒来调用 advance()。
+# 计时器的截止时间变化时（开始、暂停、重置、自动开始下一阶段）才入堆，
+# 过期的堆项在弹出时按"截止时间是否仍然一致"惰性丢弃，不需要在堆中查找删除。
+import heapq
+import itertools
+import math
+import time
+
+from pomodoro_core import (
+    PomodoroCore, TimerState,
+    EVENT_STATE_CHANGED, EVENT_TIMER_STARTED, EVENT_TIME_CHANGED,
+)
+
+KIND_POMODORO = "pomodoro"
+KIND_COUNTDOWN = "countdown"
+KIND_INTERVAL = "interval"
+KINDS = (KIND_POMODORO, KIND_COUNTDOWN, KIND_INTERVAL)
+
+# 倒计时 / 间隔提醒到点时发出的事件
+EVENT_TIMER_FIRED = "timer_fired"
+
+
+class CountdownTimer:
+    """简单倒计时；repeat=True 时为间隔提醒，到点后自动开始下一轮"""
+
+    def __init__(self, seconds, clock=time.monotonic, repeat=False):
+        self._clock = clock
+        self._listeners = []
+        self.seconds = float(seconds)
+        self.repeat = repeat
+        self._remaining_sec = self.seconds
+        self._deadline = None
+        self._state = TimerState.STOPPED
+        self._fired = 0
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _emit(self, event, *args):
+        for callback in list(self._listeners):
+            callback(event, *args)
+
+    @property
+    def state(self):
+        return self._state
+
+    def now(self):
+        return self._clock()
+
+    def next_deadline(self):
+        return self._deadline
+
+    def remaining_seconds(self):
+        if self._deadline is not None:
+            return max(0.0, self._deadline - self._clock())
+        return self._remaining_sec
+
+    def format_remaining(self, granularity=1):
+        total_seconds = math.ceil(self.remaining_seconds())
+        return f"{total_seconds // 60:02d}:{total_seconds % 60:02d}"
+
+    def snapshot(self):
+        return {
+            "state": self._state.name,
+            "remaining_sec": round(self.remaining_seconds(), 3),
+            "display": self.format_remaining(),
+            "fired": self._fired,
+        }
+
+    def advance(self):
+        now = self._clock()
+        if self._deadline is None or now < self._deadline:
+            return False
+        self._fired += 1
+        if self.repeat:
+            # 从上一个截止时间接着排，醒得晚也不会让提醒逐渐漂移；
+            # 睡眠或时钟跳变错过多轮时直接跳到下一个未来的整轮，只提醒一次
+            missed = math.floor((now - self._deadline) / self.seconds) + 1
+            self._deadline += missed * self.seconds
+            self._emit(EVENT_TIMER_FIRED, self._fired)
+            self._emit(EVENT_TIME_CHANGED)
+        else:
+            self._deadline = None
+            self._remaining_sec = self.seconds
+            self._set_state(TimerState.STOPPED)
+            self._emit(EVENT_TIMER_FIRED, self._fired)
+        return True
+
+    def start(self):
+        if self._state != TimerState.RUNNING:
+            self._deadline = self._clock() + self._remaining_sec
+            self._set_state(TimerState.RUNNING)
+            self._emit(EVENT_TIMER_STARTED)
+
+    def pause(self):
+        if self._state == TimerState.RUNNING:
+            self._remaining_sec = self.remaining_seconds()
+            self._deadline = None
+            self._set_state(TimerState.PAUSED)
+
+    def reset(self):
+        self._deadline = None
+        self._remaining_sec = self.seconds
+        self._set_state(TimerState.STOPPED)
+        self._emit(EVENT_TIME_CHANGED)
+
+    def _set_state(self, new_state):
+        if self._state != new_state:
+            self._state = new_state
+            self._emit(EVENT_STATE_CHANGED, new_state)
+
+
+class TimerScheduler:
+    """
+    管理多个具名计时器。
+    subscribe 的回调形如 callback(name, task, event, *args)，其中 event/args 与单个计时器的事件相同。
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._listeners = []
+        self._timers = {}    # 名称 -> 计时器对象
+        self._kinds = {}     # 名称 -> 类型
+        self._tasks = {}     # 名称 -> 任务标签
+        self._heap = []      # (截止时间, 序号, 名称)
+        self._queued = {}    # 名称 -> 最近一次入堆的截止时间
+        self._seq = itertools.count()
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def now(self):
+        return self._clock()
+
+    # --- 增删 ---
+    def add_pomodoro(self, name, task=None):
+        return self._add(name, KIND_POMODORO, PomodoroCore(self._clock), task)
+
+    def add_countdown(self, name, seconds, task=None, repeat=False):
+        kind = KIND_INTERVAL if repeat else KIND_COUNTDOWN
+        return self._add(name, kind, CountdownTimer(seconds, self._clock, repeat), task)
+
+    def _add(self, name, kind, timer, task):
+        if name in self._timers:
+            raise ValueError(f"计时器 {name} 已存在")
+        self._timers[name] = timer
+        self._kinds[name] = kind
+        self._tasks[name] = task
+        timer.subscribe(lambda event, *args: self._on_timer_event(name, event, *args))
+        return timer
+
+    def remove(self, name):
+        """删除计时器；它留在堆里的项会在弹出时被丢弃"""
+        self._timers.pop(name)
+        self._kinds.pop(name, None)
+        self._tasks.pop(name, None)
+        self._queued.pop(name, None)
+
+    def get(self, name):
+        return self._timers.get(name)
+
+    def __contains__(self, name):
+        return name in self._timers
+
+    def names(self):
+        return list(self._timers)
+
+    def task_of(self, name):
+        return self._tasks.get(name)
+
+    def set_task(self, name, task):
+        self._tasks[name] = task
+
+    # --- 调度 ---
+    def _on_timer_event(self, name, event, *args):
+        if event in (EVENT_STATE_CHANGED, EVENT_TIMER_STARTED, EVENT_TIME_CHANGED):
+            self._enqueue(name)
+        for callback in list(self._listeners):
+            callback(name, self._tasks.get(name), event, *args)
+
+    def _enqueue(self, name):
+        deadline = self._timers[name].next_deadline()
+        if deadline is None:
+            self._queued.pop(name, None)
+            return
+        if self._queued.get(name) == deadline:
+            return
+        self._queued[name] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._seq), name))
+        # 频繁暂停/恢复会留下很多过期项，超过有效项数量很多时整体重建一次
+        if len(self._heap) > 2 * len(self._queued) + 32:
+            self._heap = [(d, next(self._seq), n) for n, d in self._queued.items()]
+            heapq.heapify(self._heap)
+
+    def _discard_stale(self):
+        while self._heap:
+            deadline, _, name = self._heap[0]
+            if self._queued.get(name) == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self):
+        """所有运行中的计时器里最早的截止时间；没有运行中的计时器时返回 None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def advance(self):
+        """处理所有已经到点的计时器，返回本次到点的计时器名称列表"""
+        fired = []
+        now = self._clock()
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, name = heapq.heappop(self._heap)
+            del self._queued[name]
+            # 计时器在 advance 中如果重新开始（间隔提醒、自动循环），会通过事件再次入堆
+            if self._timers[name].advance():
+                fired.append(name)
+            else:
+                self._enqueue(name)
+        return fired
+
+    def snapshot(self, name):
+        info = self._timers[name].snapshot()
+        info.update(name=name, kind=self._kinds[name], task=self._tasks[name])
+        return info
+
+    def snapshots(self):
+        return [self.snapshot(name) for name in self._timers]
@@ -0,0 +1,173 @@
+# session_log.py
+# 番茄钟会话日志：把每次开始、暂停、完成、重置追加记录到本地 SQLite，
+# 同时按天维护预先汇总好的统计，打开统计面板时无需扫描全部事件。
+# 带任务标签的会话另外按 (任务, 天) 汇总，用于按任务统计。
+
+import sqlite3
+from datetime import date, datetime, timedelta
+
+DB_FILE = "pomodoro_sessions.db"
+
+EVENT_START = "start"
+EVENT_PAUSE = "pause"
+EVENT_FINISH = "finish"
+EVENT_RESET = "reset"
+
+
+class SessionLog:
+    """
+    管理会话日志数据库。
+    events 表只追加不修改；daily_stats 表在每次写入事件时同步累加。
+    """
+
+    def __init__(self, db_name=DB_FILE):
+        self.conn = sqlite3.connect(db_name)
+        self.cursor = self.conn.cursor()
+        self.create_tables()
+
+    def create_tables(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                day TEXT NOT NULL,
+                event TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                elapsed_sec REAL NOT NULL DEFAULT 0,
+                task TEXT
+            )
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_day ON events(day)")
+        # 旧版本创建的 events 表没有 task 列
+        self.cursor.execute("PRAGMA table_info(events)")
+        if "task" not in {row[1] for row in self.cursor.fetchall()}:
+            self.cursor.execute("ALTER TABLE events ADD COLUMN task TEXT")
+
+        # 每天的汇总，focus_sec 只统计工作阶段实际计时的秒数
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                day TEXT PRIMARY KEY,
+                pomodoros INTEGER NOT NULL DEFAULT 0,
+                focus_sec REAL NOT NULL DEFAULT 0,
+                work_starts INTEGER NOT NULL DEFAULT 0,
+                interruptions INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_stats (
+                task TEXT NOT NULL,
+                day TEXT NOT NULL,
+                pomodoros INTEGER NOT NULL DEFAULT 0,
+                focus_sec REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (task, day)
+            )
+        """)
+        self.conn.commit()
+
+    def record(self, event, phase, elapsed_sec=0.0, when=None, task=None):
+        """
+        记录一个事件。
+        :param event: EVENT_START / EVENT_PAUSE / EVENT_FINISH / EVENT_RESET
+        :param phase: 阶段名称，例如 "WORK"、"BREAK"、"LONG_BREAK"
+        :param elapsed_sec: 本次连续计时的秒数（暂停、完成、重置时有意义）
+        :param task: 任务标签，为空表示不归属任何任务
+        """
+        task = task or None
+        when = when or datetime.now()
+        day = when.strftime("%Y-%m-%d")
+        self.cursor.execute(
+            "INSERT INTO events (ts, day, event, phase, elapsed_sec, task) VALUES (?, ?, ?, ?, ?, ?)",
+            (when.strftime("%Y-%m-%d %H:%M:%S"), day, event, phase, elapsed_sec, task))
+
+        if phase == "WORK":
+            is_work_finish = event == EVENT_FINISH
+            is_interruption = event in (EVENT_PAUSE, EVENT_RESET) and elapsed_sec > 0
+            self.cursor.execute("""
+                INSERT INTO daily_stats (day, pomodoros, focus_sec, work_starts, interruptions)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(day) DO UPDATE SET
+                    pomodoros = pomodoros + excluded.pomodoros,
+                    focus_sec = focus_sec + excluded.focus_sec,
+                    work_starts = work_starts + excluded.work_starts,
+                    interruptions = interruptions + excluded.interruptions
+            """, (day, int(is_work_finish), elapsed_sec if event != EVENT_START else 0.0,
+                  int(event == EVENT_START), int(is_interruption)))
+            if task is not None and event != EVENT_START:
+                self.cursor.execute("""
+                    INSERT INTO task_stats (task, day, pomodoros, focus_sec) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(task, day) DO UPDATE SET
+                        pomodoros = pomodoros + excluded.pomodoros,
+                        focus_sec = focus_sec + excluded.focus_sec
+                """, (task, day, int(is_work_finish), elapsed_sec))
+        self.conn.commit()
+
+    # --- 统计查询（只读 daily_stats） ---
+    def pomodoros_per_day(self, days=14, today=None):
+        """最近 days 天每天完成的番茄数，返回 [(日期字符串, 数量)]，没有记录的日期为 0"""
+        today = today or date.today()
+        start = today - timedelta(days=days - 1)
+        self.cursor.execute("SELECT day, pomodoros FROM daily_stats WHERE day >= ? ORDER BY day",
+                            (start.isoformat(),))
+        counts = dict(self.cursor.fetchall())
+        result = []
+        for i in range(days):
+            day = (start + timedelta(days=i)).isoformat()
+            result.append((day, counts.get(day, 0)))
+        return result
+
+    def focus_minutes_per_week(self, weeks=8, today=None):
+        """最近 weeks 周（周一为一周开始）每周的专注分钟数，返回 [(周一日期, 分钟)]"""
+        today = today or date.today()
+        this_monday = today - timedelta(days=today.weekday())
+        start = this_monday - timedelta(weeks=weeks - 1)
+        self.cursor.execute("SELECT day, focus_sec FROM daily_stats WHERE day >= ?", (start.isoformat(),))
+        minutes = {}
+        for day, focus_sec in self.cursor.fetchall():
+            day = date.fromisoformat(day)
+            monday = (day - timedelta(days=day.weekday())).isoformat()
+            minutes[monday] = minutes.get(monday, 0) + focus_sec / 60
+        return [((start + timedelta(weeks=i)).isoformat(),
+                 round(minutes.get((start + timedelta(weeks=i)).isoformat(), 0)))
+                for i in range(weeks)]
+
+    def interruption_rate(self, days=30, today=None):
+        """最近 days 天工作阶段被暂停或重置的比例（中断次数 / (中断次数 + 完成数)）"""
+        today = today or date.today()
+        start = today - timedelta(days=days - 1)
+        self.cursor.execute(
+            "SELECT COALESCE(SUM(interruptions), 0), COALESCE(SUM(pomodoros), 0) FROM daily_stats WHERE day >= ?",
+            (start.isoformat(),))
+        interruptions, pomodoros = self.cursor.fetchone()
+        total = interruptions + pomodoros
+        return interruptions / total if total else 0.0
+
+    def streaks(self, today=None):
+        """返回 (当前连续天数, 历史最长连续天数)；今天还没完成时，从昨天开始算当前连续"""
+        today = today or date.today()
+        self.cursor.execute("SELECT day FROM daily_stats WHERE pomodoros > 0 ORDER BY day")
+        days = [date.fromisoformat(row[0]) for row in self.cursor.fetchall()]
+
+        longest = run = 0
+        previous = None
+        for day in days:
+            run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+
+        current = 0
+        if days and today - days[-1] <= timedelta(days=1):
+            current = run
+        return current, longest
+
+    def focus_by_task(self, days=30, today=None):
+        """最近 days 天各任务的完成番茄数和专注分钟，返回 [(任务, 番茄数, 分钟)]，按分钟从多到少"""
+        today = today or date.today()
+        start = today - timedelta(days=days - 1)
+        self.cursor.execute("""
+            SELECT task, SUM(pomodoros), SUM(focus_sec) FROM task_stats
+            WHERE day >= ? GROUP BY task ORDER BY SUM(focus_sec) DESC
+        """, (start.isoformat(),))
+        return [(task, pomodoros, round(focus_sec / 60)) for task, pomodoros, focus_sec in self.cursor.fetchall()]
+
+    def close(self):
+        self.conn.close()
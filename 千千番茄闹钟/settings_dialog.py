@@ -191,6 +191,12 @@ class SettingsDialog(QDialog):
         self.auto_cycle_checkbox = QCheckBox("时间自动循环")
         general_layout.addWidget(self.always_on_top_checkbox)
         general_layout.addWidget(self.auto_cycle_checkbox)
+        task_layout = QHBoxLayout()
+        self.current_task_input = QLineEdit()
+        self.current_task_input.setPlaceholderText("留空则不按任务统计")
+        task_layout.addWidget(QLabel("当前任务:"))
+        task_layout.addWidget(self.current_task_input)
+        general_layout.addLayout(task_layout)
 
         debug_group = QGroupBox("开发者选项")
         debug_layout = QVBoxLayout(debug_group)
@@ -320,6 +326,7 @@ class SettingsDialog(QDialog):
         self.compact_mode_checkbox.setChecked(config.get("compact_mode_enabled"))
         self.always_on_top_checkbox.setChecked(config.get("always_on_top"))
         self.auto_cycle_checkbox.setChecked(config.get("auto_cycle_enabled"))
+        self.current_task_input.setText(config.get("current_task"))
         self.debug_mode_checkbox.setChecked(config.get("developer_debug_mode"))
 
     def _load_sound_control(self, controls, name, is_folder=False):
@@ -334,40 +341,43 @@ class SettingsDialog(QDialog):
         controls["slider"].setValue(volume if volume is not None else 80)
 
     def save_and_close(self):
-        # Basic
-        config.set("work_minutes", self.work_minutes_spinbox.value())
-        config.set("break_minutes", self.break_minutes_spinbox.value())
-        config.set("long_break_minutes", self.long_break_minutes_spinbox.value())
-        config.set("pomodoros_per_cycle", self.pomodoros_per_cycle_spinbox.value())
-
-        # Notifications
-        config.set("desktop_notification", self.desktop_notify_checkbox.isChecked())
-        config.set("sound_notification", self.sound_notify_checkbox.isChecked())
-        config.set("work_finish_text", self.work_finish_text_input.text())
-        config.set("break_finish_text", self.break_finish_text_input.text())
-        config.set("long_break_finish_text", self.long_break_finish_text_input.text())
-
-        # Sounds
-        self._save_sound_control(self.work_sound_controls, "work_sound")
-        self._save_sound_control(self.break_sound_controls, "break_sound")
-        self._save_sound_control(self.long_break_sound_controls, "long_break_sound")
-        self._save_sound_control(self.random_sound_controls, "random_sound", is_folder=True)
-        config.set("random_sound_enabled", self.random_sound_group.isChecked())
-
-        # Theme
-        config.set("show_custom_text", self.show_custom_text_checkbox.isChecked())
-        config.set("show_app_title", self.show_app_title_checkbox.isChecked())
-        config.set("custom_text", self.custom_text_input.text())
-        config.set("custom_text_font_family", self.custom_text_font_combo.currentFont().family())
-        config.set("custom_text_font_size", self.custom_text_font_size_spinbox.value())
-        for key in ['custom_text_color', 'work_color', 'break_color', 'long_break_color', 'timer_text_color']:
-            config.set(key, getattr(self, f"_{key}_hex"))
-
-        # Advanced
-        config.set("compact_mode_enabled", self.compact_mode_checkbox.isChecked())
-        config.set("always_on_top", self.always_on_top_checkbox.isChecked())
-        config.set("auto_cycle_enabled", self.auto_cycle_checkbox.isChecked())
-        config.set("developer_debug_mode", self.debug_mode_checkbox.isChecked())
+        # 批量修改：所有设置只写一次盘，只通知一次
+        with config.batch():
+            # Basic
+            config.set("work_minutes", self.work_minutes_spinbox.value())
+            config.set("break_minutes", self.break_minutes_spinbox.value())
+            config.set("long_break_minutes", self.long_break_minutes_spinbox.value())
+            config.set("pomodoros_per_cycle", self.pomodoros_per_cycle_spinbox.value())
+
+            # Notifications
+            config.set("desktop_notification", self.desktop_notify_checkbox.isChecked())
+            config.set("sound_notification", self.sound_notify_checkbox.isChecked())
+            config.set("work_finish_text", self.work_finish_text_input.text())
+            config.set("break_finish_text", self.break_finish_text_input.text())
+            config.set("long_break_finish_text", self.long_break_finish_text_input.text())
+
+            # Sounds
+            self._save_sound_control(self.work_sound_controls, "work_sound")
+            self._save_sound_control(self.break_sound_controls, "break_sound")
+            self._save_sound_control(self.long_break_sound_controls, "long_break_sound")
+            self._save_sound_control(self.random_sound_controls, "random_sound", is_folder=True)
+            config.set("random_sound_enabled", self.random_sound_group.isChecked())
+
+            # Theme
+            config.set("show_custom_text", self.show_custom_text_checkbox.isChecked())
+            config.set("show_app_title", self.show_app_title_checkbox.isChecked())
+            config.set("custom_text", self.custom_text_input.text())
+            config.set("custom_text_font_family", self.custom_text_font_combo.currentFont().family())
+            config.set("custom_text_font_size", self.custom_text_font_size_spinbox.value())
+            for key in ['custom_text_color', 'work_color', 'break_color', 'long_break_color', 'timer_text_color']:
+                config.set(key, getattr(self, f"_{key}_hex"))
+
+            # Advanced
+            config.set("compact_mode_enabled", self.compact_mode_checkbox.isChecked())
+            config.set("always_on_top", self.always_on_top_checkbox.isChecked())
+            config.set("auto_cycle_enabled", self.auto_cycle_checkbox.isChecked())
+            config.set("current_task", self.current_task_input.text().strip())
+            config.set("developer_debug_mode", self.debug_mode_checkbox.isChecked())
 
         self.settings_changed.emit()
         self.accept()
@@ -0,0 +1,143 @@
+# sound_cache.py
+# 提示音缓存：提前把提示音加载好，阶段结束时只需调用 play，避免临时读盘解码造成的延迟。
+# WAV 文件用 QSoundEffect（解码为 PCM 常驻内存，延迟最低）；
+# 其它格式（mp3/ogg/flac）用预先 setSource 好的 QMediaPlayer（只是打开好的播放器，不解码到内存）。
+# 每个缓存项都占用一个播放器和音频输出，所以随机提示音同时按文件大小和个数限制，
+# 超出时淘汰最久未使用的；阶段提示音固定常驻。
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QUrl
+from PyQt6.QtMultimedia import QSoundEffect, QMediaPlayer, QAudioOutput
+
+# 随机提示音的缓存上限（按文件大小估算）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 随机提示音最多缓存几个（只需要覆盖接下来要抽到的几首）
+DEFAULT_MAX_SOUNDS = 4
+
+
+class _CachedSound:
+    """一个已预加载的提示音"""
+
+    def __init__(self, path, parent):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.is_effect = path.lower().endswith(".wav")
+        if self.is_effect:
+            self.effect = QSoundEffect(parent)
+            self.effect.setSource(QUrl.fromLocalFile(path))
+        else:
+            self.player = QMediaPlayer(parent)
+            self.audio_output = QAudioOutput(parent)
+            self.player.setAudioOutput(self.audio_output)
+            self.player.setSource(QUrl.fromLocalFile(path))
+
+    def play(self, volume):
+        safe_volume = (volume if volume is not None else 80) / 100.0
+        if self.is_effect:
+            self.effect.setVolume(safe_volume)
+            self.effect.play()
+        else:
+            self.audio_output.setVolume(safe_volume)
+            # 重播时先回到开头，避免上次播放停在中间
+            self.player.setPosition(0)
+            self.player.play()
+
+    def stop(self):
+        if self.is_effect:
+            self.effect.stop()
+        else:
+            self.player.stop()
+
+    def release(self):
+        self.stop()
+        if self.is_effect:
+            self.effect.deleteLater()
+        else:
+            self.player.deleteLater()
+            self.audio_output.deleteLater()
+
+
+class SoundCache(QObject):
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_sounds=DEFAULT_MAX_SOUNDS, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.max_sounds = max_sounds
+        self._sounds = OrderedDict()  # path -> _CachedSound，按最近使用排序
+        self._pinned = {}  # 名称 -> path，阶段提示音，不参与淘汰
+        self._bytes = 0
+
+    def _get(self, path):
+        sound = self._sounds.get(path)
+        if sound is not None:
+            self._sounds.move_to_end(path)
+            return sound
+        if not path or not os.path.isfile(path):
+            return None
+        sound = _CachedSound(path, self)
+        self._sounds[path] = sound
+        self._bytes += sound.size
+        self._evict()
+        return sound
+
+    def _unpinned_count(self):
+        pinned_paths = set(self._pinned.values())
+        return sum(1 for path in self._sounds if path not in pinned_paths)
+
+    def _evict(self):
+        pinned_paths = set(self._pinned.values())
+        # 最后一个是刚加载、马上要用的，不淘汰
+        for path in list(self._sounds)[:-1]:
+            if self._bytes <= self.max_bytes and self._unpinned_count() <= self.max_sounds:
+                break
+            if path in pinned_paths:
+                continue
+            sound = self._sounds.pop(path)
+            self._bytes -= sound.size
+            sound.release()
+
+    def pin(self, name, path):
+        """设置一个常驻的提示音（例如 work_sound），替换同名的旧文件"""
+        old_path = self._pinned.pop(name, None)
+        if path and os.path.isfile(path):
+            self._pinned[name] = path
+            self._get(path)
+        if old_path and old_path != path and old_path not in self._pinned.values():
+            self.discard(old_path)
+
+    def preload(self, paths):
+        """
+        预加载接下来要用的几个文件（不超过 max_sounds 个），已缓存的标记为最近使用。
+        超出个数上限时淘汰最久未使用的；超出大小上限时停止。
+        """
+        for path in paths:
+            if path in self._sounds:
+                self._sounds.move_to_end(path)
+                continue
+            if not os.path.isfile(path):
+                continue
+            if self._bytes + os.path.getsize(path) > self.max_bytes:
+                break
+            self._get(path)
+
+    def discard(self, path):
+        sound = self._sounds.pop(path, None)
+        if sound is not None:
+            self._bytes -= sound.size
+            sound.release()
+
+    def play_pinned(self, name, volume):
+        path = self._pinned.get(name)
+        return self.play(path, volume) if path else False
+
+    def play(self, path, volume):
+        """播放提示音；未缓存时现在加载（并计入缓存）。返回是否成功开始播放"""
+        sound = self._get(path)
+        if sound is None:
+            return False
+        sound.play(volume)
+        return True
+
+    def stop_all(self):
+        for sound in self._sounds.values():
+            sound.stop()
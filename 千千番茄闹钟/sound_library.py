@@ -0,0 +1,173 @@
+# sound_library.py
+# 随机提示音库：为文件夹中的音频建立索引（大小、修改时间、时长、权重），并缓存到本地文件。
+# 启动时如果文件夹的修改时间没变，直接使用缓存，不再扫描；
+# 之后通过 QFileSystemWatcher 监听文件夹，只更新有变化的文件。
+# 抽取采用"洗牌袋"方式：一轮之内不重复，并按权重决定先后，新一轮的第一首不会和上一首相同。
+import json
+import os
+import random
+import wave
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+CACHE_FILE = "sound_library.json"
+SUPPORTED_FORMATS = ('.mp3', '.wav', '.ogg', '.flac')
+# 文件夹变化后等待多久再更新（复制大量文件时会连续触发很多次）
+RESCAN_DELAY_MS = 300
+
+
+def _probe_duration(path):
+    """读取时长（秒）。WAV 直接读文件头；其它格式需要解码，暂记为 None"""
+    if not path.lower().endswith(".wav"):
+        return None
+    try:
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / float(f.getframerate())
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+class SoundLibrary(QObject):
+    changed = pyqtSignal()
+
+    def __init__(self, cache_file=CACHE_FILE, parent=None):
+        super().__init__(parent)
+        self.cache_file = cache_file
+        self.folder = None
+        self.entries = {}  # 文件名 -> {"size", "mtime", "duration", "weight"}
+        self._bag = []
+        self._last_played = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_rescan)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self.rescan)
+
+    # --- 文件夹与索引 ---
+    def set_folder(self, folder):
+        """切换到新的文件夹（None 表示停用）；与当前相同时什么也不做"""
+        folder = folder if folder and os.path.isdir(folder) else None
+        if folder == self.folder:
+            return
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        self.folder = folder
+        self.entries = {}
+        self._reset_bag()
+        if folder is None:
+            self.changed.emit()
+            return
+
+        self._watcher.addPath(folder)
+        cached = self._load_cache().get(folder)
+        if cached and cached.get("folder_mtime") == os.stat(folder).st_mtime:
+            # 文件夹没有增删改名，直接使用缓存的索引
+            self.entries = cached["entries"]
+            self.changed.emit()
+        else:
+            if cached:
+                self.entries = cached["entries"]
+            self.rescan()
+
+    def _schedule_rescan(self, _path=None):
+        self._rescan_timer.start()
+
+    def rescan(self):
+        """对比目录内容与索引，只为新增或修改过的文件重新读取元数据"""
+        if self.folder is None:
+            return
+        try:
+            scanned = {}
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.lower().endswith(SUPPORTED_FORMATS):
+                        stat = entry.stat()
+                        scanned[entry.name] = (entry.path, stat.st_size, stat.st_mtime)
+            folder_mtime = os.stat(self.folder).st_mtime
+        except OSError:
+            return
+
+        modified = False
+        for name in list(self.entries):
+            if name not in scanned:
+                del self.entries[name]
+                modified = True
+        for name, (path, size, mtime) in scanned.items():
+            old = self.entries.get(name)
+            if old and old["size"] == size and old["mtime"] == mtime:
+                continue
+            self.entries[name] = {
+                "size": size,
+                "mtime": mtime,
+                "duration": _probe_duration(path),
+                "weight": old["weight"] if old else 1.0,
+            }
+            modified = True
+
+        self._save_cache(folder_mtime)
+        if modified:
+            self._reset_bag()
+            self.changed.emit()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, folder_mtime):
+        cache = self._load_cache()
+        cache[self.folder] = {"folder_mtime": folder_mtime, "entries": self.entries}
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=4)
+        except IOError as e:
+            print(f"Error saving sound library: {e}")
+
+    # --- 查询与抽取 ---
+    def paths(self):
+        if self.folder is None:
+            return []
+        return [os.path.join(self.folder, name) for name in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set_weight(self, name, weight):
+        """调整某个文件被优先抽到的权重（默认 1.0）"""
+        if name in self.entries:
+            self.entries[name]["weight"] = max(0.0, float(weight))
+            self._reset_bag()
+
+    def _reset_bag(self):
+        self._bag = []
+
+    def _refill_bag(self):
+        # 按权重做不放回的加权随机排列：key = random() ** (1 / weight)，从大到小排
+        names = [name for name, info in self.entries.items() if info.get("weight", 1.0) > 0]
+        keyed = [(random.random() ** (1.0 / self.entries[name].get("weight", 1.0)), name) for name in names]
+        keyed.sort()
+        self._bag = [name for _, name in keyed]  # 末尾为下一个要抽的
+        if len(self._bag) > 1 and self._bag[-1] == self._last_played:
+            self._bag[-1], self._bag[0] = self._bag[0], self._bag[-1]
+
+    def upcoming(self, count):
+        """接下来 count 次 choose() 会抽到的文件路径（按顺序），用于只预加载这几首"""
+        if count <= 0:
+            return []
+        if not self._bag:
+            self._refill_bag()
+        return [os.path.join(self.folder, name) for name in reversed(self._bag[-count:])]
+
+    def choose(self):
+        """抽取下一首的完整路径；库为空时返回 None"""
+        if not self._bag:
+            self._refill_bag()
+        if not self._bag:
+            return None
+        name = self._bag.pop()
+        self._last_played = name
+        return os.path.join(self.folder, name)
@@ -0,0 +1,89 @@
+# stats_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QGroupBox,
+    QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+
+class StatsDialog(QDialog):
+    """专注统计面板，数据全部来自 SessionLog 的按天汇总表"""
+
+    def __init__(self, session_log, parent=None):
+        super().__init__(parent)
+        self.session_log = session_log
+        self.setWindowTitle("专注统计")
+        self.setMinimumSize(420, 640)
+        self.init_ui()
+        self.load_stats()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        summary_group = QGroupBox("概览")
+        summary_layout = QFormLayout(summary_group)
+        self.today_label = QLabel()
+        self.week_label = QLabel()
+        self.interruption_label = QLabel()
+        self.streak_label = QLabel()
+        summary_layout.addRow("今日完成番茄:", self.today_label)
+        summary_layout.addRow("本周专注时长:", self.week_label)
+        summary_layout.addRow("近30天中断率:", self.interruption_label)
+        summary_layout.addRow("连续打卡:", self.streak_label)
+        main_layout.addWidget(summary_group)
+
+        daily_group = QGroupBox("最近14天")
+        daily_layout = QVBoxLayout(daily_group)
+        self.daily_table = self._create_table(["日期", "番茄数"])
+        daily_layout.addWidget(self.daily_table)
+        main_layout.addWidget(daily_group)
+
+        weekly_group = QGroupBox("最近8周")
+        weekly_layout = QVBoxLayout(weekly_group)
+        self.weekly_table = self._create_table(["周 (周一)", "专注分钟"])
+        weekly_layout.addWidget(self.weekly_table)
+        main_layout.addWidget(weekly_group)
+
+        task_group = QGroupBox("按任务 (近30天)")
+        task_layout = QVBoxLayout(task_group)
+        self.task_table = self._create_table(["任务", "番茄数", "专注分钟"])
+        task_layout.addWidget(self.task_table)
+        main_layout.addWidget(task_group)
+
+        button_layout = QHBoxLayout()
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.accept)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        main_layout.addLayout(button_layout)
+
+    def _create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        return table
+
+    def _fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                table.setItem(row, column, item)
+
+    def load_stats(self):
+        daily = self.session_log.pomodoros_per_day(14)
+        weekly = self.session_log.focus_minutes_per_week(8)
+        current_streak, longest_streak = self.session_log.streaks()
+
+        self.today_label.setText(f"{daily[-1][1]} 个")
+        self.week_label.setText(f"{weekly[-1][1]} 分钟")
+        self.interruption_label.setText(f"{self.session_log.interruption_rate(30):.0%}")
+        self.streak_label.setText(f"当前 {current_streak} 天 / 最长 {longest_streak} 天")
+
+        # 最新的排在最上面
+        self._fill_table(self.daily_table, list(reversed(daily)))
+        self._fill_table(self.weekly_table, list(reversed(weekly)))
+        self._fill_table(self.task_table, self.session_log.focus_by_task(30))
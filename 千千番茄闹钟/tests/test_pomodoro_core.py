@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro_core import VirtualClock, PomodoroPhase, EVENT_PHASE_FINISHED, EVENT_SESSION
+from pomodoro_scheduler import TimerScheduler
+
+
+def make_auto_cycle(clock):
+    """与守护进程相同的自动循环：阶段结束时从上一阶段的截止时间开始下一阶段"""
+    scheduler = TimerScheduler(clock)
+    finished = []
+
+    def on_event(name, task, event, *args):
+        if event == EVENT_SESSION and args[0] == "finish":
+            finished.append(args[1])
+        elif event == EVENT_PHASE_FINISHED:
+            timer = scheduler.get(name)
+            timer.start(at=timer.last_deadline)
+
+    scheduler.subscribe(on_event)
+    core = scheduler.add_pomodoro("a")
+    return scheduler, core, finished
+
+
+def test_auto_cycle_continues_from_boundary():
+    clock = VirtualClock()
+    scheduler, core, finished = make_auto_cycle(clock)
+    core.start()
+
+    clock.advance(25 * 60 + 0.5)
+    assert scheduler.advance() == ["a"]
+    assert finished == [PomodoroPhase.WORK]
+    # 迟到的半秒不累积到休息阶段
+    assert core.next_deadline() == 30 * 60
+
+
+def test_auto_cycle_after_sleep_fires_once():
+    clock = VirtualClock()
+    scheduler, core, finished = make_auto_cycle(clock)
+    core.start()
+
+    clock.advance(5 * 3600)
+    assert scheduler.advance() == ["a"]
+    assert finished == [PomodoroPhase.WORK]
+    assert core.phase == PomodoroPhase.BREAK
+    assert core.next_deadline() == clock.now + 5 * 60
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro_core import VirtualClock, TimerState
+from pomodoro_scheduler import TimerScheduler, EVENT_TIMER_FIRED
+
+
+def make_scheduler():
+    clock = VirtualClock()
+    scheduler = TimerScheduler(clock)
+    fired = []
+    scheduler.subscribe(lambda name, task, event, *args: event == EVENT_TIMER_FIRED and fired.append(name))
+    return clock, scheduler, fired
+
+
+def test_timers_fire_in_deadline_order():
+    clock, scheduler, fired = make_scheduler()
+    scheduler.add_countdown("long", 60).start()
+    scheduler.add_countdown("short", 10).start()
+    assert scheduler.next_deadline() == 10
+
+    clock.advance(10)
+    assert scheduler.advance() == ["short"]
+    assert scheduler.next_deadline() == 60
+    clock.advance(100)
+    assert scheduler.advance() == ["long"]
+    assert scheduler.next_deadline() is None
+    assert scheduler.get("long").state == TimerState.STOPPED
+
+
+def test_pause_and_resume_reschedules():
+    clock, scheduler, fired = make_scheduler()
+    timer = scheduler.add_countdown("a", 30)
+    timer.start()
+    clock.advance(10)
+    timer.pause()
+    assert scheduler.next_deadline() is None
+
+    clock.advance(100)
+    assert scheduler.advance() == []
+    timer.start()
+    assert scheduler.next_deadline() == clock.now + 20
+
+
+def test_interval_stays_on_grid():
+    clock, scheduler, fired = make_scheduler()
+    scheduler.add_countdown("water", 45, repeat=True).start()
+    clock.advance(46)
+    assert scheduler.advance() == ["water"]
+    # 醒得晚也不漂移：下一次仍在 90 秒
+    assert scheduler.next_deadline() == 90
+
+
+def test_interval_after_clock_jump_fires_once():
+    clock, scheduler, fired = make_scheduler()
+    timer = scheduler.add_countdown("water", 42, repeat=True)
+    timer.start()
+    clock.advance(3600)
+    assert scheduler.advance() == ["water"]
+    assert fired == ["water"]
+    assert scheduler.advance() == []
+    assert 3600 < timer.next_deadline() <= 3600 + 42
+    assert timer.next_deadline() % 42 == 0
+
+
+def test_removed_timer_does_not_fire():
+    clock, scheduler, fired = make_scheduler()
+    scheduler.add_countdown("a", 10).start()
+    scheduler.remove("a")
+    clock.advance(20)
+    assert scheduler.advance() == []
+    assert scheduler.next_deadline() is None
@@ -1,18 +1,19 @@
 # timer_engine.py
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
-from enum import Enum, auto
+# Qt 适配层：计时逻辑都在 pomodoro_core.PomodoroCore 里，这里只负责用 QTimer 按时唤醒核心，
+# 并把核心的事件转换成 Qt 信号，供界面连接。
+import math
+import time
 
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
 
-class TimerState(Enum):
-    STOPPED = auto()
-    RUNNING = auto()
-    PAUSED = auto()
+from pomodoro_core import (
+    PomodoroCore, TimerState, PomodoroPhase,
+    EVENT_TIME_CHANGED, EVENT_STATE_CHANGED, EVENT_TIMER_STARTED,
+    EVENT_PHASE_FINISHED, EVENT_CYCLE_FINISHED, EVENT_SESSION,
+)
 
-
-class PomodoroPhase(Enum):
-    WORK = auto()
-    BREAK = auto()
-    LONG_BREAK = auto()
+# 在整秒边界之后再多等几毫秒，确保醒来时显示的秒数已经变化
+_BOUNDARY_SLACK_MS = 5
 
 
 class TimerEngine(QObject):
@@ -22,107 +23,103 @@ class TimerEngine(QObject):
     state_changed = pyqtSignal(TimerState)
     # **新增**: 当计时器启动时发出此信号
     timer_started = pyqtSignal()
+    # 会话事件：(事件名 start/pause/finish/reset, 阶段, 本次连续计时的秒数)，用于写入会话日志
+    session_event = pyqtSignal(str, PomodoroPhase, float)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, clock=time.monotonic):
         super().__init__(parent)
+        self._core = PomodoroCore(clock)
+        self._core.subscribe(self._on_core_event)
 
-        self._work_duration_sec = 25 * 60
-        self._break_duration_sec = 5 * 60
-        self._long_break_duration_sec = 15 * 60
-        self._pomodoros_per_cycle = 4
-
-        self._pomodoros_completed = 0
-        self._remaining_sec = self._work_duration_sec
-        self._state = TimerState.STOPPED
-        self._phase = PomodoroPhase.WORK
-
+        # 单次定时器，每次都对齐到下一个整秒边界重新安排，迟到的 tick 不会累积误差
         self._timer = QTimer(self)
-        self._timer.setInterval(1000)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
         self._timer.timeout.connect(self._tick)
 
-    def _tick(self):
-        if self._remaining_sec > 0:
-            self._remaining_sec -= 1
-            self.time_updated.emit(self.get_formatted_time())
-        else:
-            self._timer.stop()
-            current_phase = self._phase
+        # 刷新粒度：1 表示每秒刷新；60 表示每分钟刷新（精简模式且没有在看时）；
+        # None 表示界面不可见，只在阶段结束时醒来
+        self._tick_granularity = 1
 
-            if current_phase == PomodoroPhase.WORK:
-                self._pomodoros_completed += 1
+    @property
+    def core(self):
+        return self._core
 
-            if current_phase == PomodoroPhase.LONG_BREAK:
-                self.cycle_finished.emit()
-                self.reset_timer()
-            else:
-                self._switch_phase()
-                self.set_state(TimerState.STOPPED)
-                self.phase_finished.emit(current_phase)
-
-    def _switch_phase(self):
-        if self._phase == PomodoroPhase.WORK:
-            if self._pomodoros_completed >= self._pomodoros_per_cycle:
-                self._phase = PomodoroPhase.LONG_BREAK
-                self._remaining_sec = self._long_break_duration_sec
+    def _on_core_event(self, event, *args):
+        if event == EVENT_TIME_CHANGED:
+            self.time_updated.emit(self.get_formatted_time())
+        elif event == EVENT_STATE_CHANGED:
+            # 只有运行中才需要定时唤醒
+            if args[0] == TimerState.RUNNING:
+                self._schedule_next_tick(self._core.remaining_seconds())
             else:
-                self._phase = PomodoroPhase.BREAK
-                self._remaining_sec = self._break_duration_sec
+                self._timer.stop()
+            self.state_changed.emit(args[0])
+        elif event == EVENT_TIMER_STARTED:
+            self.timer_started.emit()
+        elif event == EVENT_PHASE_FINISHED:
+            self.phase_finished.emit(args[0])
+        elif event == EVENT_CYCLE_FINISHED:
+            self.cycle_finished.emit()
+        elif event == EVENT_SESSION:
+            self.session_event.emit(*args)
+
+    def remaining_seconds(self):
+        """当前阶段的精确剩余时间（秒，浮点数）"""
+        return self._core.remaining_seconds()
+
+    def set_tick_granularity(self, granularity):
+        """切换刷新粒度（1 / 60 / None），运行中会立即按新的粒度刷新并重新安排"""
+        if granularity == self._tick_granularity:
+            return
+        self._tick_granularity = granularity
+        if self._core.next_deadline() is not None:
+            self._timer.stop()
+            self._tick()
         else:
-            self._phase = PomodoroPhase.WORK
-            self._remaining_sec = self._work_duration_sec
+            self.time_updated.emit(self.get_formatted_time())
 
+    def _schedule_next_tick(self, remaining):
+        step = self._tick_granularity
+        if step is None:
+            # 没有需要逐秒刷新的界面，直接睡到阶段结束
+            until_boundary = remaining
+        else:
+            # 距离显示内容下一次变化还有多久（剩余时间对刷新粒度取余）
+            until_boundary = remaining - math.floor(remaining / step) * step or step
+        self._timer.start(int(until_boundary * 1000) + _BOUNDARY_SLACK_MS)
+
+    def _tick(self):
+        # 到点时由核心结束阶段，后续的信号都在 _on_core_event 中发出
+        if self._core.advance():
+            return
         self.time_updated.emit(self.get_formatted_time())
+        self._schedule_next_tick(self._core.remaining_seconds())
 
-    def start_timer(self):
-        """开始或从暂停恢复计时。"""
-        if self._state != TimerState.RUNNING:
-            self._timer.start()
-            self.set_state(TimerState.RUNNING)
-            # **新增**: 发出计时器已启动的信号
-            self.timer_started.emit()
+    def start_timer(self, at=None):
+        """开始或从暂停恢复计时；at 见 PomodoroCore.start"""
+        self._core.start(at)
 
     def pause_timer(self):
-        if self._state == TimerState.RUNNING:
-            self._timer.stop()
-            self.set_state(TimerState.PAUSED)
+        self._core.pause()
 
     def reset_timer(self):
-        self._timer.stop()
-        self._pomodoros_completed = 0
-        self._phase = PomodoroPhase.WORK
-        self._remaining_sec = self._work_duration_sec
-        self.set_state(TimerState.STOPPED)
-        self.time_updated.emit(self.get_formatted_time())
+        self._core.reset()
 
     def set_durations(self, work_mins, break_mins, long_break_mins, pomos_per_cycle, is_debug=False):
-        self._pomodoros_per_cycle = pomos_per_cycle
-
-        if is_debug:
-            self._work_duration_sec = 1
-            self._break_duration_sec = 1
-            self._long_break_duration_sec = 1
-        else:
-            self._work_duration_sec = work_mins * 60
-            self._break_duration_sec = break_mins * 60
-            self._long_break_duration_sec = long_break_mins * 60
-
-        if self._state == TimerState.STOPPED:
-            self.reset_timer()
+        self._core.set_durations(work_mins, break_mins, long_break_mins, pomos_per_cycle, is_debug)
 
     def get_formatted_time(self):
-        minutes = self._remaining_sec // 60
-        seconds = self._remaining_sec % 60
-        return f"{minutes:02d}:{seconds:02d}"
-
-    def set_state(self, new_state):
-        if self._state != new_state:
-            self._state = new_state
-            self.state_changed.emit(new_state)
+        return self._core.format_remaining(self._tick_granularity)
 
     @property
     def state(self):
-        return self._state
+        return self._core.state
 
     @property
     def phase(self):
-        return self._phase
+        return self._core.phase
+
+    @property
+    def last_deadline(self):
+        return self._core.last_deadline